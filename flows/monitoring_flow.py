@@ -1,32 +1,193 @@
 from __future__ import annotations
 
+import hashlib
+import json
 import os
-import subprocess
+from datetime import timedelta
+from typing import Any, Optional
+
+import pandas as pd
 from prefect import flow, task
 
+from src.features.cache import file_sha256
+from src.modeling.retrain import RetrainConfig, champion_version, retrain_if_needed
+from src.modeling.schema import CHURN_SPEC
+from src.monitoring.alerting import evaluate_drift_alert, notify_drift_alert
+from src.monitoring.metrics import (
+    count_predictions,
+    db_watermark,
+    drift_metrics,
+    load_feedback,
+    load_recent_requests,
+    materialize_snapshot,
+    performance_metrics,
+    segment_metrics,
+)
+from src.monitoring.rollup import refresh_hourly_rollups
+from src.utils.io import write_json
+
+
+def _by_run_key(context: Any, parameters: dict[str, Any]) -> Optional[str]:
+    # DataFrames are identified by the DB watermark + baseline hash (the `key` parameter)
+    # rather than hashed, so a flow retry on unchanged data resumes after the last
+    # completed task instead of recomputing or re-inserting metric rows. Every other
+    # parameter (thresholds, output paths, model version, retrain config) is part of
+    # the key, so a re-run with different settings does not reuse a stale result.
+    params = {k: v for k, v in parameters.items() if not isinstance(v, pd.DataFrame)}
+    blob = json.dumps(params, sort_keys=True, default=repr)
+    return f"{context.task.name}-{hashlib.sha256(blob.encode()).hexdigest()[:16]}"
+
+
+cached_task = task(
+    cache_key_fn=_by_run_key,
+    cache_expiration=timedelta(days=1),
+    persist_result=True,
+    retries=2,
+    retry_delay_seconds=10,
+)
+# Loaders return the full feedback/request frames; they are re-read on a retry instead of
+# being pickled into the result store on every run.
+load_task = task(retries=2, retry_delay_seconds=10, persist_result=False)
+
 
 @task(retries=2, retry_delay_seconds=10)
-def run_cmd(cmd: list[str]) -> None:
-    print("Running:", " ".join(cmd))
-    subprocess.check_call(cmd)
+def watermark(db: str) -> str:
+    return db_watermark(db)
+
+
+@load_task
+def feedback_rows(db: str) -> pd.DataFrame:
+    return load_feedback(db)
+
+
+@load_task
+def recent_requests(db: str, recent_n: int) -> pd.DataFrame:
+    return load_recent_requests(db, recent_n)
+
+
+@load_task
+def baseline_numeric(path: str) -> pd.DataFrame:
+    return pd.read_parquet(path, columns=list(CHURN_SPEC.numeric))
+
+
+@cached_task
+def prediction_counts(db: str, key: str) -> tuple[int, int]:
+    return count_predictions(db)
+
+
+@cached_task
+def performance(feedback: pd.DataFrame, key: str) -> dict[str, Any]:
+    return performance_metrics(feedback)
+
+
+@cached_task
+def drift(baseline: pd.DataFrame, current: pd.DataFrame, key: str) -> dict[str, Any]:
+    return drift_metrics(baseline, current)
+
+
+@cached_task
+def segments(feedback: pd.DataFrame, min_seg_n: int, key: str) -> dict[str, Any]:
+    return segment_metrics(feedback, min_seg_n)
+
+
+@cached_task
+def materialize(
+    db: str,
+    counts: tuple[int, int],
+    perf: dict[str, Any],
+    drift_report: dict[str, Any],
+    segs: dict[str, Any],
+    out: str,
+    key: str,
+) -> dict[str, Any]:
+    snapshot = materialize_snapshot(db, counts, perf, drift_report, segs)
+    write_json(out, snapshot)
+    return snapshot
+
+
+@cached_task
+def drift_alert(snapshot: dict[str, Any], threshold: float, model_version: str, out: str, key: str) -> dict[str, Any]:
+    alert = evaluate_drift_alert(snapshot, threshold=threshold)
+    write_json(out, alert)
+    # only queued (and suppressed per feature and model version); scripts/deliver_alerts.py delivers
+    msg = notify_drift_alert(alert, email=True, slack=True, model_version=model_version)
+    if msg:
+        print("ALERT:", msg)
+    else:
+        print(f"No drift alert. Worst PSI={alert['worst_psi']:.3f} (threshold {threshold}).")
+    return alert
+
+
+@cached_task
+def retrain(snapshot: dict[str, Any], cfg: RetrainConfig, key: str) -> dict[str, Any]:
+    return retrain_if_needed(cfg, drift=snapshot, perf=snapshot)
 
 
 @flow(name="model-monitoring-daily")
-def monitoring_daily() -> None:
+def monitoring_daily(
+    baseline: str = "data/processed/train.parquet",
+    recent_n: int = 10000,
+    min_seg_n: int = 200,
+    drift_threshold: float = 0.25,
+    model_name: str = "xgb_churn",
+    alias: str = "champion",
+    snapshot_out: str = "reports/monitoring_snapshot.json",
+) -> dict[str, Any]:
     db = os.getenv("MONITORING_DB_URL", "")
     if not db:
         raise RuntimeError("MONITORING_DB_URL not set")
 
-    baseline = "data/processed/train.parquet"
+    key = hashlib.sha256(
+        f"{watermark(db)}|{file_sha256(baseline)}|{recent_n}|{min_seg_n}".encode()
+    ).hexdigest()[:16]
+
+    # 1) Load each input once; the three metric groups below share it and run concurrently
+    fb = feedback_rows.submit(db)
+    recent = recent_requests.submit(db, recent_n)
+    base = baseline_numeric.submit(baseline)
+    counts = prediction_counts.submit(db, key)
+
+    perf = performance.submit(fb, key)
+    drift_report = drift.submit(base, recent, key)
+    segs = segments.submit(fb, min_seg_n, key)
+
+    # 2) Materialize daily KPIs + segment metrics into monitoring DB (Grafana reads these tables)
+    snapshot = materialize(db, counts.result(), perf.result(), drift_report.result(), segs.result(), snapshot_out, key)
 
-    # 1) Materialize daily KPIs + segment metrics into monitoring DB (Grafana reads these tables)
-    run_cmd(["python", "scripts/materialize_metrics.py", "--db", db, "--baseline", baseline, "--out", "reports/monitoring_snapshot.json"])
+    tracking_uri = os.getenv("MLFLOW_TRACKING_URI", "")
+    if tracking_uri:
+        import mlflow
+        mlflow.set_tracking_uri(tracking_uri)
+    model_version = (champion_version(model_name, alias) or "") if tracking_uri else ""
 
-    # 2) Drift alert (Slack + Email are optional; require env vars)
-    run_cmd(["python", "scripts/drift_alert.py", "--drift", "reports/monitoring_snapshot.json", "--threshold", "0.25", "--email", "--slack"])
+    # 3) Drift alert (Slack + Email are optional; require env vars)
+    drift_alert(snapshot, drift_threshold, model_version, "reports/drift_alert.json", key)
+
+    # 4) Retrain & promote if needed
+    cfg = RetrainConfig(
+        model_name=model_name,
+        alias=alias,
+        drift_threshold=drift_threshold,
+        drift_report=snapshot_out,
+        perf_report=snapshot_out,
+        db=db,
+    )
+    return retrain(snapshot, cfg, key)
+
+
+@task(retries=2, retry_delay_seconds=10)
+def hourly_rollups(db: str, lookback_hours: int) -> dict[str, Any]:
+    return refresh_hourly_rollups(db, lookback_hours=lookback_hours)
+
+
+@flow(name="model-monitoring-hourly")
+def monitoring_hourly(lookback_hours: int = 48) -> dict[str, Any]:
+    db = os.getenv("MONITORING_DB_URL", "")
+    if not db:
+        raise RuntimeError("MONITORING_DB_URL not set")
 
-    # 3) Retrain & promote if needed
-    run_cmd(["python", "scripts/retrain_if_needed.py", "--processed", "data/processed", "--model-name", "xgb_churn", "--alias", "champion", "--drift-report", "reports/monitoring_snapshot.json", "--perf-report", "reports/monitoring_snapshot.json"])
+    # Incremental hourly rollups (Grafana near-real-time panels read these tables)
+    return hourly_rollups(db, lookback_hours)
 
 
 if __name__ == "__main__":
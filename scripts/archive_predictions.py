@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import argparse
+import json
+from datetime import datetime, timedelta, timezone
+
+from src.monitoring.archive import archive_predictions
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--db", required=True, help="SQLAlchemy DB URL (monitoring db)")
+    ap.add_argument("--archive-dir", default="data/archive/predictions")
+    ap.add_argument("--older-than-days", type=float, default=90, help="Archive predictions older than this")
+    ap.add_argument("--batch-size", type=int, default=50000)
+    ap.add_argument("--dry-run", action="store_true", help="Count rows that would be archived; write/delete nothing")
+    args = ap.parse_args()
+
+    cutoff = datetime.now(timezone.utc) - timedelta(days=args.older_than_days)
+    summary = archive_predictions(
+        args.db, args.archive_dir, cutoff=cutoff, batch_size=args.batch_size, dry_run=args.dry_run
+    )
+    print(json.dumps({k: v for k, v in summary.items() if k != "files"} | {"n_files": len(summary["files"])}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import argparse
+import io
+import multiprocessing as mp
+import resource
+import time
+from pathlib import Path
+from typing import Any
+
+import joblib
+import pandas as pd
+import yaml
+from sklearn.metrics import roc_auc_score
+
+from src.modeling.train import ENCODINGS, fit_model
+from src.utils.io import write_json
+
+
+def _bench_one(data_path: str, model_params: dict[str, Any], encoding: str, queue: mp.Queue) -> None:
+    # Runs in a fresh process so ru_maxrss is this mode's peak alone
+    df = pd.read_parquet(data_path)
+    rss_loaded = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    t0 = time.perf_counter()
+    pipe, encoded = fit_model(df, model_params, encoding=encoding)
+    fit_s = time.perf_counter() - t0
+
+    X_val_raw = df.drop(columns=["churn"]).iloc[:1000]
+    t0 = time.perf_counter()
+    pipe.predict_proba(X_val_raw)
+    predict_ms = (time.perf_counter() - t0) * 1e3
+
+    buf = io.BytesIO()
+    joblib.dump(pipe, buf)
+    proba = pipe.named_steps["model"].predict_proba(encoded.X_val)[:, 1]
+    queue.put(
+        {
+            "encoding": encoding,
+            "n_rows": int(len(df)),
+            "n_model_features": int(encoded.X_train.shape[1]),
+            "fit_seconds": fit_s,
+            "predict_1k_ms": predict_ms,
+            "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+            "peak_rss_over_data_mb": (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024 - rss_loaded) / 1024**2,
+            "model_bytes": buf.getbuffer().nbytes,
+            "val_roc_auc": float(roc_auc_score(encoded.y_val, proba)),
+        }
+    )
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--data", default="data/processed/train.parquet")
+    ap.add_argument("--out", default="reports/bench_encoding.json")
+    args = ap.parse_args()
+
+    model_params = yaml.safe_load(Path("params.yaml").read_text(encoding="utf-8"))["model"]
+
+    ctx = mp.get_context("spawn")
+    results = []
+    for encoding in ENCODINGS:
+        q = ctx.Queue()
+        p = ctx.Process(target=_bench_one, args=(args.data, model_params, encoding, q))
+        p.start()
+        results.append(q.get())
+        p.join()
+
+    write_json(args.out, results)
+    print("| encoding | features | fit s | predict 1k ms | peak RSS MB | model KB | val ROC-AUC |")
+    print("|---|---|---|---|---|---|---|")
+    for r in results:
+        print(
+            f"| {r['encoding']} | {r['n_model_features']} | {r['fit_seconds']:.2f} | {r['predict_1k_ms']:.1f} "
+            f"| {r['peak_rss_mb']:.0f} | {r['model_bytes'] / 1024:.0f} | {r['val_roc_auc']:.4f} |"
+        )
+    print(f"Wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
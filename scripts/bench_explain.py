@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import argparse
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+
+from src.modeling.artifact import ServingModel
+from src.modeling.explain import Explainer
+from src.utils.io import write_json
+
+
+def _timed(fn: Callable[[], Any], repeats: int) -> dict[str, float]:
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    return {"p50_ms": float(np.percentile(times, 50)), "p95_ms": float(np.percentile(times, 95))}
+
+
+def bench_size(model: ServingModel, rows: list[dict[str, Any]], repeats: int, top_k: int) -> dict[str, Any]:
+    def cold():
+        Explainer(model, cache_size=0).explain(rows, top_k=top_k)
+
+    warm_ex = Explainer(model, cache_size=len(rows))
+    warm_ex.explain(rows, top_k=top_k)
+
+    return {
+        "batch": len(rows),
+        "explain_cold": _timed(cold, repeats),
+        "explain_cached": _timed(lambda: warm_ex.explain(rows, top_k=top_k), repeats),
+        "predict_only": _timed(lambda: model.predict_proba(rows), repeats),
+    }
+
+
+def markdown_report(results: list[dict[str, Any]]) -> str:
+    lines = [
+        "| batch | explain (cold) p50 / p95 ms | explain (cached) p50 / p95 ms | predict only p50 ms | cold per row µs |",
+        "|---|---|---|---|---|",
+    ]
+    for r in results:
+        c, w, p = r["explain_cold"], r["explain_cached"], r["predict_only"]
+        lines.append(
+            f"| {r['batch']:,} | {c['p50_ms']:.2f} / {c['p95_ms']:.2f} | {w['p50_ms']:.2f} / {w['p95_ms']:.2f} | "
+            f"{p['p50_ms']:.2f} | {c['p50_ms'] * 1000 / r['batch']:.1f} |"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--serving-dir", default="models/serving")
+    ap.add_argument("--data", default="data/processed/val.parquet", help="Rows to explain")
+    ap.add_argument("--sizes", default="1,100,10000")
+    ap.add_argument("--repeats", type=int, default=20)
+    ap.add_argument("--top-k", type=int, default=3)
+    ap.add_argument("--out", default="reports/bench_explain.json")
+    ap.add_argument("--md-out", default="reports/bench_explain.md")
+    args = ap.parse_args()
+
+    model = ServingModel(args.serving_dir)
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    df = pd.read_parquet(args.data).drop(columns=[model.spec.target], errors="ignore")
+    df = pd.concat([df] * (max(sizes) // len(df) + 1), ignore_index=True) if len(df) < max(sizes) else df
+    records = df.head(max(sizes)).to_dict(orient="records")
+
+    results = []
+    for n in sizes:
+        print(f"Benchmarking explain on batches of {n:,} ...")
+        results.append(bench_size(model, records[:n], max(3, args.repeats if n < 10_000 else args.repeats // 4), args.top_k))
+
+    write_json(args.out, results)
+    md = markdown_report(results)
+    Path(args.md_out).parent.mkdir(parents=True, exist_ok=True)
+    Path(args.md_out).write_text(md, encoding="utf-8")
+    print(md)
+    print(f"Wrote {args.out} and {args.md_out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import argparse
+import http.client
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from src.api.prefork import WARMUP_ROW
+from src.utils.io import write_json
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_ready(port: int, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1).read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise TimeoutError(f"server on port {port} not ready after {timeout}s")
+
+
+def _client(port: int, path: str, body: bytes, stop: threading.Event, out: list[float]) -> None:
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=120)
+    headers = {"Content-Type": "application/json"}
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        conn.request("POST", path, body=body, headers=headers)
+        resp = conn.getresponse()
+        resp.read()
+        if resp.status == 200:
+            out.append((time.perf_counter() - t0) * 1000)
+    conn.close()
+
+
+def _pct(xs: list[float], q: float) -> float:
+    return float(np.percentile(xs, q)) if xs else float("nan")
+
+
+def bench_one(executor: str, workers: int, small_clients: int, batch_clients: int, batch_rows: int, seconds: float, timeout: float) -> dict[str, Any]:
+    port = _free_port()
+    env = {**os.environ, "INFERENCE_EXECUTOR": executor, "INFERENCE_WORKERS": str(workers)}
+    cmd = [sys.executable, "-m", "uvicorn", "src.api.main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"]
+    proc = subprocess.Popen(cmd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    small: list[float] = []
+    batch: list[float] = []
+    try:
+        _wait_ready(port, timeout)
+        row = json.dumps(WARMUP_ROW).encode()
+        rows = json.dumps({"rows": [WARMUP_ROW] * batch_rows}).encode()
+        warm = threading.Event()
+        warm.set()
+        _client(port, "/predict", row, warm, [])  # first call loads the model / workers
+
+        stop = threading.Event()
+        threads = [threading.Thread(target=_client, args=(port, "/predict", row, stop, small)) for _ in range(small_clients)]
+        threads += [threading.Thread(target=_client, args=(port, "/predict/batch", rows, stop, batch)) for _ in range(batch_clients)]
+        for t in threads:
+            t.start()
+        time.sleep(seconds)
+        stop.set()
+        for t in threads:
+            t.join(timeout)
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        try:
+            proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+    return {
+        "executor": executor,
+        "workers": workers if executor == "process" else 0,
+        "batch_clients": batch_clients,
+        "batch_rows": batch_rows,
+        "small_requests": len(small),
+        "small_rps": len(small) / seconds,
+        "small_p50_ms": _pct(small, 50),
+        "small_p95_ms": _pct(small, 95),
+        "small_p99_ms": _pct(small, 99),
+        "batch_requests": len(batch),
+        "batch_rows_per_s": len(batch) * batch_rows / seconds,
+        "batch_p50_ms": _pct(batch, 50),
+    }
+
+
+def markdown_report(results: list[dict[str, Any]]) -> str:
+    lines = [
+        "| executor | batch load | /predict rps | p50 ms | p95 ms | p99 ms | batch rows/s | batch p50 ms |",
+        "|---|---|---|---|---|---|---|---|",
+    ]
+    for r in results:
+        name = r["executor"] + (f" ({r['workers']} workers)" if r["workers"] else "")
+        load = f"{r['batch_clients']} x {r['batch_rows']:,} rows" if r["batch_clients"] else "none"
+        lines.append(
+            f"| {name} | {load} | {r['small_rps']:.0f} | {r['small_p50_ms']:.1f} | {r['small_p95_ms']:.1f} | "
+            f"{r['small_p99_ms']:.1f} | {r['batch_rows_per_s']:,.0f} | "
+            + (f"{r['batch_p50_ms']:.0f} |" if r["batch_requests"] else "- |")
+        )
+    return "\n".join(lines) + "\n"
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--workers", type=int, default=2, help="INFERENCE_WORKERS for the process executor")
+    ap.add_argument("--small-clients", type=int, default=4, help="Concurrent single-row /predict clients")
+    ap.add_argument("--batch-clients", type=int, default=1, help="Concurrent /predict/batch clients in the loaded runs")
+    ap.add_argument("--batch-rows", type=int, default=5000)
+    ap.add_argument("--seconds", type=float, default=20.0)
+    ap.add_argument("--timeout", type=float, default=120.0)
+    ap.add_argument("--out", default="reports/bench_inference.json")
+    ap.add_argument("--md-out", default="reports/bench_inference.md")
+    args = ap.parse_args()
+    os.environ.setdefault("PYTHONPATH", os.getcwd())
+    os.environ.pop("MONITORING_DB_URL", None)  # measure inference, not prediction logging
+
+    results = []
+    for executor in ("inprocess", "process"):
+        for batch_clients in (0, args.batch_clients):
+            print(f"Benchmarking {executor} executor, {batch_clients} batch clients ...")
+            results.append(
+                bench_one(executor, args.workers, args.small_clients, batch_clients, args.batch_rows, args.seconds, args.timeout)
+            )
+
+    write_json(args.out, results)
+    md = markdown_report(results)
+    Path(args.md_out).parent.mkdir(parents=True, exist_ok=True)
+    Path(args.md_out).write_text(md, encoding="utf-8")
+    print(md)
+    print(f"Wrote {args.out} and {args.md_out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import multiprocessing as mp
+import platform
+import queue
+import runpy
+import sys
+import tempfile
+import time
+import traceback
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Optional
+
+import numpy as np
+import sqlalchemy
+from sqlalchemy import inspect, text
+
+from src.data.synthetic import generate_churn
+from src.monitoring.bench import QueryTimer, SyntheticTraffic, populate_predictions
+from src.monitoring.db import Base, get_engine
+from src.utils.io import read_json, write_json
+from src.utils.profiling import StageTimer
+
+# job name -> (script, argv); {db}, {baseline} and {out} are filled in per run
+JOBS: dict[str, tuple[str, list[str]]] = {
+    "materialize_metrics": ("scripts/materialize_metrics.py", ["--db", "{db}", "--baseline", "{baseline}", "--out", "{out}"]),
+    "compute_drift": ("scripts/compute_drift.py", ["--db", "{db}", "--baseline", "{baseline}", "--out", "{out}"]),
+    "compute_drift_7d": (
+        "scripts/compute_drift.py",
+        ["--db", "{db}", "--baseline", "{baseline}", "--out", "{out}", "--window-days", "7"],
+    ),
+    "compute_performance": ("scripts/compute_performance.py", ["--db", "{db}", "--out", "{out}"]),
+    "rollup_hourly": ("scripts/rollup_hourly.py", ["--db", "{db}", "--lookback-hours", "48"]),
+}
+
+
+def _run_job(script: str, argv: list[str], queue: mp.Queue) -> None:
+    # Fresh process per job so peak RSS is the job's own. Libraries are imported
+    # before the clock starts; the script's own module body runs inside it.
+    import src.monitoring.archive  # noqa: F401
+    import src.monitoring.metrics  # noqa: F401
+    import src.monitoring.rollup  # noqa: F401
+
+    timer, queries = StageTimer(), QueryTimer()
+    sys.argv = [script, *argv]
+    try:
+        with queries.active(), contextlib.redirect_stdout(io.StringIO()), timer.stage("job"):
+            runpy.run_path(script, run_name="__main__")
+    except BaseException:
+        queue.put({"error": traceback.format_exc(limit=3)})
+        return
+    s = timer.stages[0]
+    queue.put(
+        {
+            "wall_seconds": s.wall_seconds,
+            "cpu_seconds": s.cpu_seconds,
+            "peak_rss_mb": s.peak_rss_mb,
+            "n_queries": sum(q.calls for q in queries.stats.values()),
+            "query_seconds": queries.total_seconds,
+            "queries": queries.to_list(),
+        }
+    )
+
+
+def _collect(p: mp.process.BaseProcess, q: mp.Queue, timeout: float) -> dict[str, Any]:
+    """The job's result, or an error entry if it died without one (OOM kill, segfault) or timed out."""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return q.get(timeout=1.0)
+        except queue.Empty:
+            pass
+        if not p.is_alive():
+            try:  # it may have put the result just before exiting
+                return q.get(timeout=1.0)
+            except queue.Empty:
+                p.join()
+                return {"error": f"job process exited with code {p.exitcode} without a result", "exitcode": p.exitcode}
+        if time.monotonic() > deadline:
+            p.kill()
+            p.join()
+            return {"error": f"timed out after {timeout:.0f}s", "exitcode": p.exitcode}
+
+
+def _db_size_mb(db_url: str) -> Optional[float]:
+    engine = get_engine(db_url)
+    if engine.dialect.name == "sqlite" and engine.url.database:
+        return Path(engine.url.database).stat().st_size / 1024**2
+    if engine.dialect.name == "postgresql":
+        with engine.connect() as conn:
+            return conn.execute(text("SELECT pg_total_relation_size('predictions')")).scalar() / 1024**2
+    return None
+
+
+def _prepare_db(db_url: str, reset: bool) -> None:
+    engine = get_engine(db_url)
+    if inspect(engine).has_table("predictions"):
+        with engine.connect() as conn:
+            n = conn.execute(text("SELECT COUNT(*) FROM predictions")).scalar()
+        if n and not reset:
+            raise SystemExit(f"{engine.url!r} already has {n:,} predictions; pass --reset to drop the monitoring tables")
+    Base.metadata.drop_all(engine)
+
+
+def bench_size(
+    n: int,
+    db_url: str,
+    jobs: list[str],
+    traffic: SyntheticTraffic,
+    baseline: str,
+    work_dir: Path,
+    seed: int,
+    chunk_rows: int,
+    job_timeout: float,
+) -> dict[str, Any]:
+    print(f"Populating {n:,} predictions ...")
+    populate = populate_predictions(
+        db_url,
+        n,
+        traffic,
+        chunk_rows=chunk_rows,
+        seed=seed,
+        progress=lambda done: print(f"  {done:,} / {n:,}", end="\r", flush=True),
+    )
+    print()
+    result: dict[str, Any] = {
+        "n_predictions": n,
+        "dialect": get_engine(db_url).dialect.name,
+        "populate": populate,
+        "db_mb": _db_size_mb(db_url),
+        "jobs": {},
+    }
+
+    ctx = mp.get_context("spawn")
+    for name in jobs:
+        script, argv = JOBS[name]
+        argv = [a.format(db=db_url, baseline=baseline, out=work_dir / f"{name}.json") for a in argv]
+        print(f"  {name} ...")
+        q = ctx.Queue()
+        p = ctx.Process(target=_run_job, args=(script, argv, q))
+        p.start()
+        out = _collect(p, q, job_timeout)
+        p.join()
+        if "error" in out:
+            print(out["error"])
+        result["jobs"][name] = {"script": script, "args": argv, **out}
+    return result
+
+
+def _delta(cur: float, prev: Optional[float]) -> str:
+    if not prev:
+        return "-"
+    return f"{(cur - prev) / prev * 100:+.0f}%"
+
+
+def markdown_report(report: dict[str, Any], previous: Optional[dict[str, Any]] = None) -> str:
+    runs = report["runs"]
+    jobs = list(dict.fromkeys(j for r in runs for j in r["jobs"]))
+    prev = {(r["n_predictions"], j): v for r in (previous or {}).get("runs", []) for j, v in r["jobs"].items()}
+
+    lines = ["Wall s / SQL execute s / peak RSS MB per job", ""]
+    lines.append("| job | " + " | ".join(f"{r['n_predictions']:,} rows" for r in runs) + " |")
+    lines.append("|---|" + "---|" * len(runs))
+    for job in jobs:
+        cells = []
+        for r in runs:
+            j = r["jobs"].get(job)
+            if j is None or "error" in j:
+                cells.append("error" if j else "-")
+                continue
+            cell = f"{j['wall_seconds']:.2f} / {j['query_seconds']:.2f} / {j['peak_rss_mb']:.0f}"
+            if previous:
+                p = prev.get((r["n_predictions"], job))
+                cell += f" ({_delta(j['wall_seconds'], p and p.get('wall_seconds'))} wall)"
+            cells.append(cell)
+        lines.append(f"| {job} | " + " | ".join(cells) + " |")
+    lines.append("| populate (rows/s) | " + " | ".join(f"{r['populate']['rows_per_s']:,.0f}" for r in runs) + " |")
+    lines.append(
+        "| DB size MB | " + " | ".join(f"{r['db_mb']:,.0f}" if r["db_mb"] is not None else "-" for r in runs) + " |"
+    )
+
+    largest = runs[-1]
+    lines += ["", f"Slowest statements at {largest['n_predictions']:,} rows", ""]
+    lines += ["| job | statement | calls | total s |", "|---|---|---|---|"]
+    for job, j in largest["jobs"].items():
+        for q in j.get("queries", [])[:2]:
+            stmt = q["statement"].replace("|", "\\|")
+            lines.append(f"| {job} | `{stmt}` | {q['calls']} | {q['total_seconds']:.3f} |")
+    return "\n".join(lines) + "\n"
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", default="100000,1000000", help="Comma-separated prediction counts, e.g. 1000000,50000000")
+    ap.add_argument("--db-url", default="", help="Benchmark this DB (e.g. a local Postgres) instead of a scratch SQLite file")
+    ap.add_argument("--reset", action="store_true", help="Drop the monitoring tables in --db-url if it has predictions")
+    ap.add_argument("--jobs", default=",".join(JOBS), help=f"Comma-separated subset of {', '.join(JOBS)}")
+    defaults = SyntheticTraffic()
+    ap.add_argument("--days", type=float, default=defaults.days, help="Traffic window the predictions are spread over")
+    ap.add_argument(
+        "--feedback-rate", type=float, default=defaults.feedback_rate, help="Share of predictions older than --feedback-lag-days with a label"
+    )
+    ap.add_argument("--feedback-lag-days", type=float, default=defaults.feedback_lag_days)
+    ap.add_argument("--drift-regions", default=",".join(defaults.drift_regions), help="Regions drifted during the last --drift-days")
+    ap.add_argument(
+        "--drift-days", type=float, default=defaults.drift_days, help="Keep above --feedback-lag-days so drifted rows get labels"
+    )
+    ap.add_argument("--baseline-rows", type=int, default=100_000, help="Rows in the synthetic train baseline for drift")
+    ap.add_argument("--chunk-rows", type=int, default=100_000)
+    ap.add_argument("--job-timeout", type=float, default=3600.0, help="Seconds before a job process is killed and reported as failed")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--compare", default="", help="Previous bench_monitoring.json to show wall-time deltas against")
+    ap.add_argument("--out", default="reports/bench_monitoring.json")
+    ap.add_argument("--md-out", default="reports/bench_monitoring.md")
+    args = ap.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    jobs = [j.strip() for j in args.jobs.split(",") if j.strip()]
+    unknown = set(jobs) - set(JOBS)
+    if unknown:
+        ap.error(f"unknown jobs: {', '.join(sorted(unknown))}")
+    traffic = SyntheticTraffic(
+        days=args.days,
+        feedback_rate=args.feedback_rate,
+        feedback_lag_days=args.feedback_lag_days,
+        drift_days=args.drift_days,
+        drift_regions=tuple(r.strip() for r in args.drift_regions.split(",") if r.strip()),
+    )
+
+    report: dict[str, Any] = {
+        "environment": {
+            "python": platform.python_version(),
+            "sqlalchemy": sqlalchemy.__version__,
+            "platform": platform.platform(),
+            "cpu_count": mp.cpu_count(),
+        },
+        "traffic": asdict(traffic),
+        "seed": args.seed,
+        "runs": [],
+    }
+    with tempfile.TemporaryDirectory(prefix="bench_monitoring_") as tmp:
+        work_dir = Path(tmp)
+        baseline = work_dir / "baseline.parquet"
+        generate_churn(args.baseline_rows, np.random.default_rng(args.seed)).to_parquet(baseline, index=False)
+        for i, n in enumerate(sizes):
+            db_url = args.db_url or f"sqlite:///{work_dir / f'monitoring_{n}.db'}"
+            # after the first size, the tables in --db-url are the ones this run filled
+            _prepare_db(db_url, args.reset or not args.db_url or i > 0)
+            report["runs"].append(bench_size(n, db_url, jobs, traffic, str(baseline), work_dir, args.seed, args.chunk_rows, args.job_timeout))
+            get_engine(db_url).dispose()
+            if not args.db_url:
+                Path(db_url.removeprefix("sqlite:///")).unlink()  # scratch DBs of the larger sizes get big
+
+    write_json(args.out, report)
+    md = markdown_report(report, read_json(args.compare) if args.compare else None)
+    Path(args.md_out).parent.mkdir(parents=True, exist_ok=True)
+    Path(args.md_out).write_text(md, encoding="utf-8")
+    print(md)
+    print(f"Wrote {args.out} and {args.md_out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+from typing import Any
+
+from src.api.prefork import WARMUP_ROW
+from src.utils.io import write_json
+
+SMAPS_FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty")
+
+
+def smaps_rollup(pid: int) -> dict[str, float]:
+    """Memory of one process in MB from /proc/<pid>/smaps_rollup (Linux >= 4.14)."""
+    out = {}
+    for line in Path(f"/proc/{pid}/smaps_rollup").read_text().splitlines():
+        key, _, rest = line.partition(":")
+        if key in SMAPS_FIELDS:
+            out[key.lower() + "_mb"] = int(rest.split()[0]) / 1024
+    return out
+
+
+def children(pid: int) -> list[int]:
+    pids = []
+    for task in Path(f"/proc/{pid}/task").iterdir():
+        pids += [int(p) for p in (task / "children").read_text().split()]
+    return pids
+
+
+def worker_pids(master: int, mode: str) -> list[int]:
+    kids = children(master)
+    if mode == "uvicorn":
+        # multiprocessing may add a resource tracker next to the spawned workers
+        kids = [p for p in kids if "resource_tracker" not in Path(f"/proc/{p}/cmdline").read_text()]
+    return kids
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_ready(port: int, timeout: float) -> float:
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < timeout:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1).read()
+            return time.perf_counter() - t0
+        except OSError:
+            time.sleep(0.1)
+    raise TimeoutError(f"server on port {port} not ready after {timeout}s")
+
+
+def _predict(port: int, n: int) -> None:
+    body = json.dumps(WARMUP_ROW).encode()
+    for _ in range(n):
+        req = urllib.request.Request(
+            f"http://127.0.0.1:{port}/predict", data=body, headers={"Content-Type": "application/json"}
+        )
+        urllib.request.urlopen(req, timeout=30).read()
+
+
+def bench_one(mode: str, workers: int, n_requests: int, timeout: float) -> dict[str, Any]:
+    port = _free_port()
+    if mode == "prefork":
+        cmd = [sys.executable, "-m", "src.api.prefork", "--workers", str(workers), "--port", str(port)]
+    else:
+        cmd = [sys.executable, "-m", "uvicorn", "src.api.main:app", "--workers", str(workers), "--port", str(port)]
+    cmd += ["--host", "127.0.0.1", "--log-level", "warning"]
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        ready = _wait_ready(port, timeout)
+        # wait until every worker is up, then send enough traffic that each one has served
+        expected = 0 if (mode == "uvicorn" and workers == 1) else workers
+        deadline = time.perf_counter() + timeout
+        while len(worker_pids(proc.pid, mode)) < expected and time.perf_counter() < deadline:
+            time.sleep(0.2)
+        _predict(port, n_requests)
+        time.sleep(0.5)
+        master = smaps_rollup(proc.pid)
+        per_worker = [smaps_rollup(p) for p in worker_pids(proc.pid, mode)]
+        if not per_worker:  # `uvicorn --workers 1` serves in-process
+            master, per_worker = {}, [master]
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        try:
+            proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+    def mean(key: str) -> float:
+        return sum(w[key] for w in per_worker) / max(len(per_worker), 1)
+
+    return {
+        "mode": mode,
+        "workers": len(per_worker),
+        "ready_seconds": ready,
+        "master": master,
+        "per_worker": per_worker,
+        "worker_rss_mb": mean("rss_mb"),
+        "worker_pss_mb": mean("pss_mb"),
+        "worker_private_mb": mean("private_clean_mb") + mean("private_dirty_mb"),
+        # PSS adds up to the real footprint, shared pages split among their users
+        "total_pss_mb": master.get("pss_mb", 0.0) + sum(w["pss_mb"] for w in per_worker),
+    }
+
+
+def markdown_report(results: list[dict[str, Any]]) -> str:
+    lines = [
+        "| mode | workers | RSS / worker MB | PSS / worker MB | private / worker MB | total PSS MB | ready s |",
+        "|---|---|---|---|---|---|---|",
+    ]
+    for r in results:
+        lines.append(
+            f"| {r['mode']} | {r['workers']} | {r['worker_rss_mb']:.0f} | {r['worker_pss_mb']:.0f} | "
+            f"{r['worker_private_mb']:.0f} | {r['total_pss_mb']:.0f} | {r['ready_seconds']:.1f} |"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--workers", default="1,4,8", help="Comma-separated worker counts")
+    ap.add_argument("--modes", default="prefork,uvicorn", help="prefork and/or uvicorn (plain --workers)")
+    ap.add_argument("--requests", type=int, default=200, help="/predict calls before measuring")
+    ap.add_argument("--timeout", type=float, default=120.0)
+    ap.add_argument("--out", default="reports/bench_prefork.json")
+    ap.add_argument("--md-out", default="reports/bench_prefork.md")
+    args = ap.parse_args()
+
+    if not Path("/proc/self/smaps_rollup").exists():
+        raise SystemExit("bench_prefork needs Linux /proc/<pid>/smaps_rollup")
+    os.environ.setdefault("PYTHONPATH", os.getcwd())
+
+    results = []
+    for mode in [m.strip() for m in args.modes.split(",") if m.strip()]:
+        for n in [int(w) for w in args.workers.split(",") if w.strip()]:
+            print(f"Benchmarking {mode} with {n} workers ...")
+            results.append(bench_one(mode, n, args.requests, args.timeout))
+
+    write_json(args.out, results)
+    md = markdown_report(results)
+    Path(args.md_out).parent.mkdir(parents=True, exist_ok=True)
+    Path(args.md_out).write_text(md, encoding="utf-8")
+    print(md)
+    print(f"Wrote {args.out} and {args.md_out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import argparse
+import multiprocessing as mp
+import os
+import tempfile
+from pathlib import Path
+from typing import Any
+
+import mlflow
+import numpy as np
+import yaml
+
+from src.data.synthetic import generate_churn
+from src.modeling.train import train_model
+from src.utils.io import write_json
+from src.utils.profiling import StageTimer
+
+
+def _bench_one(n_rows: int, params: dict[str, Any], log_mlflow: bool, queue: mp.Queue) -> None:
+    # Fresh process per size so peak RSS is not inherited from a larger run; artifacts
+    # go to a scratch dir so the real models/ and reports/ are untouched
+    timer = StageTimer()
+    with tempfile.TemporaryDirectory(prefix="bench_training_") as tmp:
+        os.chdir(tmp)
+        with timer.stage("generate"):
+            df = generate_churn(n_rows, np.random.default_rng(int(params["data"]["random_seed"])))
+        pipe, out = train_model(
+            df,
+            model_params=params["model"],
+            threshold=float(params["eval"]["threshold"]),
+            encoding=params.get("features", {}).get("encoding", "onehot"),
+            timer=timer,
+        )
+        model_bytes = out.model_path.stat().st_size
+        if log_mlflow:
+            mlflow.set_experiment("bench_training")
+            with mlflow.start_run(run_name=f"n={n_rows}"):
+                with timer.stage("mlflow_log"):
+                    mlflow.sklearn.log_model(sk_model=pipe, artifact_path="model")
+                mlflow.log_metrics(timer.as_metrics())
+    queue.put(
+        {
+            "n_rows": n_rows,
+            "val_roc_auc": out.metrics["roc_auc"],
+            "model_bytes": model_bytes,
+            "total_wall_seconds": sum(s.wall_seconds for s in timer.stages),
+            "stages": timer.to_dict(),
+        }
+    )
+
+
+def markdown_report(results: list[dict[str, Any]]) -> str:
+    sizes = [r["n_rows"] for r in results]
+    stages = list(dict.fromkeys(s["stage"] for r in results for s in r["stages"]))
+    by = {(r["n_rows"], s["stage"]): s for r in results for s in r["stages"]}
+
+    lines = ["Wall s / CPU s / peak RSS MB per stage", ""]
+    lines.append("| stage | " + " | ".join(f"{n:,} rows" for n in sizes) + " |")
+    lines.append("|---|" + "---|" * len(sizes))
+    for st in stages:
+        cells = []
+        for n in sizes:
+            s = by.get((n, st))
+            cells.append(f"{s['wall_seconds']:.2f} / {s['cpu_seconds']:.2f} / {s['peak_rss_mb']:.0f}" if s else "-")
+        lines.append(f"| {st} | " + " | ".join(cells) + " |")
+    lines.append("| **total wall s** | " + " | ".join(f"{r['total_wall_seconds']:.2f}" for r in results) + " |")
+    lines.append("| val ROC-AUC | " + " | ".join(f"{r['val_roc_auc']:.4f}" for r in results) + " |")
+    return "\n".join(lines) + "\n"
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", default="100000,1000000", help="Comma-separated row counts, e.g. 100000,1000000,10000000")
+    ap.add_argument("--mlflow", action="store_true", help="Also time MLflow model logging (experiment bench_training)")
+    ap.add_argument("--out", default="reports/bench_training.json")
+    ap.add_argument("--md-out", default="reports/bench_training.md")
+    args = ap.parse_args()
+
+    params = yaml.safe_load(Path("params.yaml").read_text(encoding="utf-8"))
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+
+    ctx = mp.get_context("spawn")
+    results = []
+    for n in sizes:
+        print(f"Benchmarking train_model on {n:,} rows ...")
+        q = ctx.Queue()
+        p = ctx.Process(target=_bench_one, args=(n, params, args.mlflow, q))
+        p.start()
+        results.append(q.get())
+        p.join()
+
+    write_json(args.out, results)
+    md = markdown_report(results)
+    Path(args.md_out).write_text(md, encoding="utf-8")
+    print(md)
+    print(f"Wrote {args.out} and {args.md_out}")
+
+
+if __name__ == "__main__":
+    main()
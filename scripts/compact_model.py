@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import argparse
+import logging
+from pathlib import Path
+from typing import Any
+
+import joblib
+import mlflow
+import pandas as pd
+
+from src.api.registry import resolve_model_version
+from src.modeling.schema import CHURN_SPEC
+from src.modeling.train import compact_model, log_and_register, log_compaction
+from src.utils.io import write_json
+
+
+def markdown_report(report: dict[str, Any]) -> str:
+    lines = [
+        f"Kept {report['compact']['n_trees']} of {report['full']['n_trees']} trees "
+        f"(max AUC drop {report['max_auc_drop']}): ΔAUC {report['auc_delta']:+.4f}, "
+        f"single row {report['single_row_speedup']:.2f}x, {report['latency_rows']:,}-row batch {report['batch_speedup']:.2f}x faster.",
+        "",
+        f"| trees | val ROC AUC | ΔAUC | single row p50 ms | {report['latency_rows']:,} rows p50 ms |",
+        "|---|---|---|---|---|",
+    ]
+    for p in report["latency_vs_auc"]:
+        mark = " (kept)" if p["n_trees"] == report["compact"]["n_trees"] else ""
+        lines.append(
+            f"| {p['n_trees']}{mark} | {p['roc_auc']:.4f} | {p['auc_delta']:+.4f} | "
+            f"{p['single_row_p50_ms']:.3f} | {p['batch_p50_ms']:.2f} |"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    src = ap.add_mutually_exclusive_group()
+    src.add_argument("--model-uri", default="", help="e.g. models:/xgb_churn@champion")
+    src.add_argument("--model", default="models/model.joblib", help="Pickled pipeline (when --model-uri is not set)")
+    ap.add_argument("--val", default="data/processed/val.parquet")
+    ap.add_argument("--max-auc-drop", type=float, default=0.002)
+    ap.add_argument("--step", type=int, default=10, help="Candidate sizes are every N trees")
+    ap.add_argument("--latency-rows", type=int, default=1000)
+    ap.add_argument("--register", default="", help="Register the compacted pipeline under this model name")
+    ap.add_argument("--alias", default="", help="Alias for the registered compact version (e.g. challenger)")
+    ap.add_argument("--save", default="", help="Also write the compacted pipeline to this joblib path")
+    ap.add_argument("--out", default="reports/compaction.json")
+    ap.add_argument("--md-out", default="reports/compaction.md")
+    args = ap.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    if args.model_uri:
+        pipe = mlflow.sklearn.load_model(args.model_uri)
+        source = args.model_uri
+        version = resolve_model_version(args.model_uri)
+        if version:
+            source = f"{args.model_uri.split('@')[0]}/{version}"
+    else:
+        pipe = joblib.load(args.model)
+        source = args.model
+
+    val = pd.read_parquet(args.val)
+    X_val = val.drop(columns=[CHURN_SPEC.target])
+    compact, report = compact_model(
+        pipe, X_val, val[CHURN_SPEC.target].to_numpy(), max_auc_drop=args.max_auc_drop, step=args.step, latency_rows=args.latency_rows
+    )
+    report["source"] = source
+
+    if args.save:
+        Path(args.save).parent.mkdir(parents=True, exist_ok=True)
+        joblib.dump(compact, args.save)
+    if args.register:
+        mlflow.set_experiment("enterprise_mlops_churn")
+        version = log_and_register(compact, X_example=X_val.head(200), model_name=args.register, alias=args.alias or None)
+        log_compaction(args.register, version, report, compacted_from=source)
+        report["registered_version"] = version
+        print(f"Registered compacted model '{args.register}' version={version}" + (f" alias={args.alias}" if args.alias else ""))
+
+    write_json(args.out, report)
+    md = markdown_report(report)
+    Path(args.md_out).parent.mkdir(parents=True, exist_ok=True)
+    Path(args.md_out).write_text(md, encoding="utf-8")
+    print(md)
+    print(f"Wrote {args.out} and {args.md_out}")
+
+
+if __name__ == "__main__":
+    main()
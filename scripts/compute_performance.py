@@ -2,12 +2,13 @@ from __future__ import annotations
 
 import argparse
 import json
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
 import numpy as np
-from sqlalchemy import create_engine, text
 from sklearn.metrics import average_precision_score, roc_auc_score
 
+from src.monitoring.archive import load_predictions
 from src.utils.io import write_json
 
 
@@ -15,26 +16,29 @@ def main() -> None:
     ap = argparse.ArgumentParser()
     ap.add_argument("--db", required=True, help="SQLAlchemy DB URL (monitoring db)")
     ap.add_argument("--out", required=True)
+    ap.add_argument("--window-days", type=float, default=None, help="Only use predictions from the last N days")
+    ap.add_argument("--archive-dir", default=None, help="Also read feedback rows from the parquet archive")
     args = ap.parse_args()
 
-    engine = create_engine(args.db, pool_pre_ping=True)
-
-    q = text(
-        "SELECT churn_probability, actual_churn FROM predictions WHERE has_feedback = true AND actual_churn IS NOT NULL"
+    since = datetime.now(timezone.utc) - timedelta(days=args.window_days) if args.window_days is not None else None
+    df = load_predictions(
+        args.db,
+        ["churn_probability", "actual_churn"],
+        since=since,
+        archive_dir=args.archive_dir,
+        feedback_only=True,
     )
-    with engine.connect() as conn:
-        rows = conn.execute(q).fetchall()
 
-    if not rows:
+    if df.empty:
         write_json(args.out, {"note": "no feedback rows yet"})
         print("No feedback rows yet.")
         return
 
-    probs = np.array([float(r[0]) for r in rows])
-    y = np.array([int(r[1]) for r in rows])
+    probs = df["churn_probability"].to_numpy(dtype=float)
+    y = df["actual_churn"].to_numpy(dtype=int)
 
     # Guard against single-class feedback
-    metrics = {"n_feedback": int(len(rows))}
+    metrics = {"n_feedback": int(len(df))}
     if len(np.unique(y)) >= 2:
         metrics["roc_auc"] = float(roc_auc_score(y, probs))
         metrics["pr_auc"] = float(average_precision_score(y, probs))
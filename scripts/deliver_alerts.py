@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import argparse
+import logging
+import signal
+import threading
+
+from src.monitoring.dispatcher import AlertDispatcher
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--queue", default=".cache/alerts.db", help="Persistent alert queue (sqlite) the jobs write to")
+    ap.add_argument("--follow", action="store_true", help="Keep running and deliver alerts as jobs queue them")
+    ap.add_argument("--retry-seconds", type=float, default=30.0, help="How often the queue is polled and failures retried")
+    ap.add_argument("--timeout", type=float, default=60.0, help="Without --follow: give up after this long")
+    args = ap.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    dispatcher = AlertDispatcher(args.queue, retry_seconds=args.retry_seconds)
+    if not dispatcher.channels:
+        raise SystemExit("No channels configured: set SLACK_WEBHOOK_URL and/or SMTP_HOST, ALERT_EMAIL_TO, ALERT_EMAIL_FROM")
+    if args.follow:
+        stop = threading.Event()
+        signal.signal(signal.SIGTERM, lambda *_: stop.set())
+        try:
+            stop.wait()
+        except KeyboardInterrupt:
+            pass
+    else:
+        dispatcher.flush(timeout=args.timeout)
+    left = dispatcher.pending()
+    dispatcher.close()
+    print(f"{left} alerts still pending" if left else "Alert queue drained.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,66 +1,41 @@
 from __future__ import annotations
 
 import argparse
+import time
 from pathlib import Path
 
 import numpy as np
-import pandas as pd
 import yaml
 
-
-def sigmoid(x: np.ndarray) -> np.ndarray:
-    return 1 / (1 + np.exp(-x))
+from src.data.synthetic import generate_churn, generate_parquet
 
 
 def main() -> None:
     ap = argparse.ArgumentParser()
-    ap.add_argument("--out", required=True)
+    ap.add_argument("--out", required=True, help="Directory of parquet parts, or a single .csv file")
+    ap.add_argument("--n-rows", type=int, default=None, help="Override data.n_rows")
+    ap.add_argument("--chunk-rows", type=int, default=None, help="Override data.chunk_rows (rows per parquet part)")
+    ap.add_argument("--workers", type=int, default=0, help="Generator processes (0 = all cores)")
     args = ap.parse_args()
 
     params = yaml.safe_load(Path("params.yaml").read_text(encoding="utf-8"))
-    n = int(params["data"]["n_rows"])
+    n = int(args.n_rows or params["data"]["n_rows"])
     seed = int(params["data"]["random_seed"])
-    rng = np.random.default_rng(seed)
-
-    contract = rng.choice(["month-to-month", "one-year", "two-year"], size=n, p=[0.55, 0.25, 0.20])
-    payment = rng.choice(["credit_card", "bank_transfer", "paypal", "cash"], size=n, p=[0.35, 0.30, 0.25, 0.10])
-    internet = rng.choice(["fiber", "dsl", "none"], size=n, p=[0.55, 0.35, 0.10])
-    region = rng.choice(["NE", "SE", "MW", "SW", "W"], size=n)
-
-    tenure = rng.integers(0, 72, size=n).astype(float)
-    monthly = rng.normal(75, 25, size=n).clip(10, 200)
-    tickets = rng.poisson(1.2, size=n).clip(0, 15).astype(float)
-    total = (monthly * tenure + rng.normal(0, 100, size=n)).clip(0)
-
-    logit = (
-        -0.02 * tenure
-        + 0.10 * tickets
-        + 0.008 * (monthly - 70)
-        + 0.6 * (contract == "month-to-month").astype(float)
-        + 0.25 * (internet == "fiber").astype(float)
-        + 0.5 * (payment == "cash").astype(float)
-    )
-    p = sigmoid(logit)
-    churn = rng.binomial(1, p, size=n)
-
-    df = pd.DataFrame(
-        {
-            "tenure_months": tenure,
-            "monthly_charges": monthly,
-            "total_charges": total,
-            "tickets_90d": tickets,
-            "contract_type": contract,
-            "payment_method": payment,
-            "internet_service": internet,
-            "region": region,
-            "churn": churn,
-        }
-    )
+    chunk_rows = int(args.chunk_rows or params["data"].get("chunk_rows", 1_000_000))
 
     out = Path(args.out)
-    out.parent.mkdir(parents=True, exist_ok=True)
-    df.to_csv(out, index=False)
-    print(f"Wrote {len(df):,} rows to {out}")
+    if out.suffix == ".csv":
+        # legacy single-file output: one RNG, whole dataset in memory
+        df = generate_churn(n, np.random.default_rng(seed))
+        out.parent.mkdir(parents=True, exist_ok=True)
+        df.to_csv(out, index=False)
+        print(f"Wrote {len(df):,} rows to {out}")
+        return
+
+    t0 = time.perf_counter()
+    parts = generate_parquet(out, n, chunk_rows=chunk_rows, seed=seed, workers=args.workers)
+    dt = time.perf_counter() - t0
+    print(f"Wrote {n:,} rows in {len(parts)} parquet parts to {out} in {dt:.1f}s ({n / max(dt, 1e-9):,.0f} rows/s)")
 
 
 if __name__ == "__main__":
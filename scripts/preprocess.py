@@ -1,31 +1,40 @@
 from __future__ import annotations
 
 import argparse
-from pathlib import Path
+import json
 
-import pandas as pd
+from src.features.stream import preprocess_stream
+from src.modeling.schema import CHURN_SPEC
+from src.utils.io import write_json
 
 
 def main() -> None:
     ap = argparse.ArgumentParser()
-    ap.add_argument("--in", dest="inp", required=True)
+    ap.add_argument("--in", dest="inp", required=True, help="Parquet file/dir of parts, or a CSV file")
     ap.add_argument("--out", required=True)
+    ap.add_argument("--val-fraction", type=float, default=0.2)
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--batch-rows", type=int, default=256_000, help="Rows per input record batch")
+    ap.add_argument("--row-group-rows", type=int, default=1_000_000, help="Rows per output parquet row group")
+    ap.add_argument("--stats-out", default=None, help="Optional JSON with row counts and throughput")
     args = ap.parse_args()
 
-    df = pd.read_csv(args.inp)
-
-    out_dir = Path(args.out)
-    out_dir.mkdir(parents=True, exist_ok=True)
-
-    for col in ["contract_type", "payment_method", "internet_service", "region"]:
-        df[col] = df[col].astype(str).fillna("unknown")
-
-    train = df.sample(frac=0.8, random_state=42)
-    val = df.drop(train.index)
-
-    train.to_parquet(out_dir / "train.parquet", index=False)
-    val.to_parquet(out_dir / "val.parquet", index=False)
-    print(f"Wrote train/val parquet to {out_dir}")
+    stats = preprocess_stream(
+        args.inp,
+        args.out,
+        CHURN_SPEC,
+        val_fraction=args.val_fraction,
+        seed=args.seed,
+        batch_rows=args.batch_rows,
+        row_group_rows=args.row_group_rows,
+    )
+    if args.stats_out:
+        write_json(args.stats_out, stats)
+    print(json.dumps(stats, indent=2))
+    print(
+        f"Wrote train/val parquet to {args.out}: {stats['rows_in']:,} rows in {stats['seconds']:.1f}s "
+        f"({stats['rows_per_second']:,.0f} rows/s, peak RSS {stats['peak_rss_mb']:.0f} MB)"
+    )
 
 
 if __name__ == "__main__":
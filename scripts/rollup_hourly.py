@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import argparse
+import json
+
+from src.monitoring.db import init_db
+from src.monitoring.rollup import refresh_hourly_rollups
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--db", required=True, help="SQLAlchemy DB URL (monitoring db)")
+    ap.add_argument(
+        "--lookback-hours",
+        type=int,
+        default=48,
+        help="Recompute rollups for this many trailing hours (must cover late feedback)",
+    )
+    args = ap.parse_args()
+
+    init_db(args.db)  # creates rollup tables on first run
+    summary = refresh_hourly_rollups(args.db, lookback_hours=args.lookback_hours)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
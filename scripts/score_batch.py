@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+
+import mlflow
+
+from src.api.registry import load_model_uri, resolve_model_version
+from src.modeling.artifact import ServingModel
+from src.modeling.batch_scoring import score_customers
+from src.monitoring.db import init_db
+from src.utils.io import write_json
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Nightly batch scoring into the customer_scores lookup table")
+    ap.add_argument("--customers", required=True, help="Customer table: parquet file/dir or CSV with id + feature columns")
+    ap.add_argument("--db", default=os.getenv("SCORE_DB_URL") or os.getenv("MONITORING_DB_URL", ""), help="SQLAlchemy DB URL")
+    ap.add_argument("--id-col", default="customer_id")
+    ap.add_argument("--model-uri", default="models:/xgb_churn@champion")
+    ap.add_argument("--serving-dir", default="", help="Score with a local serving artifact instead of --model-uri")
+    ap.add_argument("--model-version", default="", help="Version label stored with the scores (resolved from --model-uri if empty)")
+    ap.add_argument("--batch-rows", type=int, default=100_000)
+    ap.add_argument("--out", default="reports/score_batch.json")
+    args = ap.parse_args()
+    if not args.db:
+        raise SystemExit("--db (or SCORE_DB_URL / MONITORING_DB_URL) is required")
+
+    if args.serving_dir:
+        model, version = ServingModel(args.serving_dir), args.model_version
+    else:
+        tracking_uri = os.getenv("MLFLOW_TRACKING_URI", "")
+        if tracking_uri:
+            mlflow.set_tracking_uri(tracking_uri)
+        model = load_model_uri(args.model_uri)
+        version = args.model_version or resolve_model_version(args.model_uri)
+
+    init_db(args.db)
+    stats = score_customers(model, args.customers, args.db, version, id_col=args.id_col, batch_rows=args.batch_rows)
+    write_json(args.out, stats)
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
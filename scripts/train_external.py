@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+
+import joblib
+import yaml
+
+from src.modeling.artifact import export_serving_artifact
+from src.modeling.external import train_external_memory
+from src.modeling.schema import CHURN_SPEC
+from src.utils.io import ensure_dir, write_json
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--data", required=True, help="Parquet file or directory of parquet files (read row group by row group)")
+    ap.add_argument("--out", default="models")
+    ap.add_argument("--batch-rows", type=int, default=100_000, help="Rows decoded per batch; bounds peak memory")
+    ap.add_argument("--val-fraction", type=float, default=0.2)
+    ap.add_argument("--cache-dir", default=".cache/xgb_extmem", help="XGBoost external-memory page cache")
+    ap.add_argument("--n-jobs", type=int, default=-1)
+    args = ap.parse_args()
+
+    params = yaml.safe_load(Path("params.yaml").read_text(encoding="utf-8"))
+    pipe, metrics = train_external_memory(
+        args.data,
+        CHURN_SPEC,
+        params["model"],
+        batch_rows=args.batch_rows,
+        val_fraction=args.val_fraction,
+        cache_dir=args.cache_dir,
+        n_jobs=args.n_jobs,
+    )
+
+    out = ensure_dir(args.out)
+    joblib.dump(pipe, out / "model.joblib")
+    export_serving_artifact(pipe, CHURN_SPEC, out / "serving")
+    write_json(
+        out / "model_meta.json",
+        {
+            "features_numeric": list(CHURN_SPEC.numeric),
+            "features_categorical": list(CHURN_SPEC.categorical),
+            "target": CHURN_SPEC.target,
+            "encoding": "onehot",
+            "training": "external_memory",
+        },
+    )
+    write_json("reports/metrics.json", metrics)
+    print(json.dumps(metrics, indent=2))
+
+
+if __name__ == "__main__":
+    main()
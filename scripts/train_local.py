@@ -1,26 +1,52 @@
 from __future__ import annotations
 
 import argparse
+import logging
 from pathlib import Path
 
-import yaml
 import pandas as pd
+import yaml
 
+from src.features.cache import add_cache_args, cache_from_args
+from src.modeling.schema import CHURN_SPEC
 from src.modeling.train import train_model
+from src.utils.io import write_json
+from src.utils.profiling import StageTimer
 
 
 def main() -> None:
     ap = argparse.ArgumentParser()
     ap.add_argument("--data", required=True)
     ap.add_argument("--out", required=True)
+    ap.add_argument("--model-params", default=None, help="YAML with a `model:` section overriding params.yaml (e.g. from tune.py)")
+    add_cache_args(ap)
+    ap.add_argument("--profile", action="store_true", help="Record per-stage wall/CPU time and peak RSS")
+    ap.add_argument("--profile-out", default="reports/train_profile.json")
     args = ap.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
 
     params = yaml.safe_load(Path("params.yaml").read_text(encoding="utf-8"))
     model_params = params["model"]
+    if args.model_params:
+        model_params = yaml.safe_load(Path(args.model_params).read_text(encoding="utf-8"))["model"]
     threshold = float(params["eval"]["threshold"])
-
-    df = pd.read_parquet(Path(args.data) / "train.parquet")
-    train_model(df, model_params=model_params, threshold=threshold)
+    encoding = params.get("features", {}).get("encoding", "onehot")
+
+    timer = StageTimer(enabled=args.profile)
+    train_path = Path(args.data) / "train.parquet"
+    cache = cache_from_args(args)
+    # the cache stores one-hot matrices only; native mode encodes in place.
+    # On a hit the parquet is not read at all; on a miss get_or_encode reads it.
+    with timer.stage("feature_cache"):
+        encoded = cache.get_or_encode(train_path, CHURN_SPEC) if cache and encoding == "onehot" else None
+    df = None
+    if encoded is None:
+        with timer.stage("load_data"):
+            df = pd.read_parquet(train_path)
+    train_model(df, model_params=model_params, threshold=threshold, encoded=encoded, encoding=encoding, timer=timer)
+    if args.profile:
+        write_json(args.profile_out, timer.to_dict())
+        print(timer.table())
     print("Saved model artifacts to models/ and reports/.")
 
 
@@ -1,13 +1,18 @@
 from __future__ import annotations
 
 import argparse
+import logging
 from pathlib import Path
 
 import mlflow
 import pandas as pd
 import yaml
 
+from src.features.cache import add_cache_args, cache_from_args
+from src.modeling.schema import CHURN_SPEC
 from src.modeling.train import log_and_register, train_model
+from src.utils.io import read_parquet_head, write_json
+from src.utils.profiling import StageTimer
 
 
 def main() -> None:
@@ -15,19 +20,38 @@ def main() -> None:
     ap.add_argument("--data", required=True, help="Processed data dir containing train.parquet")
     ap.add_argument("--model-name", required=True)
     ap.add_argument("--alias", default="champion")
+    add_cache_args(ap)
+    ap.add_argument("--profile", action="store_true", help="Record per-stage wall/CPU time and peak RSS")
+    ap.add_argument("--profile-out", default="reports/train_profile.json")
     args = ap.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
 
     params = yaml.safe_load(Path("params.yaml").read_text(encoding="utf-8"))
     model_params = params["model"]
     threshold = float(params["eval"]["threshold"])
-
-    df = pd.read_parquet(Path(args.data) / "train.parquet")
-    pipe, _ = train_model(df, model_params=model_params, threshold=threshold)
-
-    X_example = df.drop(columns=["churn"]).head(200)
+    encoding = params.get("features", {}).get("encoding", "onehot")
+
+    timer = StageTimer(enabled=args.profile)
+    train_path = Path(args.data) / "train.parquet"
+    cache = cache_from_args(args)
+    # the cache stores one-hot matrices only; native mode encodes in place.
+    # On a hit the parquet is not read at all; on a miss get_or_encode reads it.
+    with timer.stage("feature_cache"):
+        encoded = cache.get_or_encode(train_path, CHURN_SPEC) if cache and encoding == "onehot" else None
+    df = None
+    if encoded is None:
+        with timer.stage("load_data"):
+            df = pd.read_parquet(train_path)
+    pipe, _ = train_model(df, model_params=model_params, threshold=threshold, encoded=encoded, encoding=encoding, timer=timer)
+
+    X_example = (df if df is not None else read_parquet_head(train_path, 200)).drop(columns=["churn"]).head(200)
 
     mlflow.set_experiment("enterprise_mlops_churn")
-    version = log_and_register(pipe, X_example=X_example, model_name=args.model_name, alias=args.alias)
+    version = log_and_register(pipe, X_example=X_example, model_name=args.model_name, alias=args.alias, timer=timer)
+
+    if args.profile:
+        write_json(args.profile_out, timer.to_dict())
+        print(timer.table())
 
     print(f"Registered model '{args.model_name}' version={version} alias={args.alias}")
 
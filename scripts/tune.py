@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+from pathlib import Path
+
+import mlflow
+import yaml
+
+from src.features.cache import add_cache_args, cache_from_args
+from src.modeling.schema import CHURN_SPEC
+from src.modeling.tune import best_model_params, plan_workers, run_search, sample_candidates
+from src.utils.io import write_json
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--data", default="data/processed", help="Processed data dir containing train.parquet")
+    ap.add_argument("--out", default="models/best_params.yaml", help="Best params, consumable by train_local.py --model-params")
+    ap.add_argument("--n-trials", type=int, default=None, help="Override tune.n_trials")
+    ap.add_argument("--cpu-budget", type=int, default=None, help="Override tune.cpu_budget (0 = all cores)")
+    ap.add_argument("--threads-per-trial", type=int, default=None, help="Override tune.threads_per_trial")
+    add_cache_args(ap)
+    ap.add_argument("--seed", type=int, default=42)
+    args = ap.parse_args()
+    if not args.feature_cache:
+        ap.error("--feature-cache is required: the trial workers memory-map the encoded matrices from it")
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    params = yaml.safe_load(Path("params.yaml").read_text(encoding="utf-8"))
+    tune = params["tune"]
+    n_trials = args.n_trials if args.n_trials is not None else int(tune["n_trials"])
+    cpu_budget = args.cpu_budget if args.cpu_budget is not None else int(tune["cpu_budget"])
+    threads = args.threads_per_trial if args.threads_per_trial is not None else int(tune["threads_per_trial"])
+
+    tracking_uri = os.getenv("MLFLOW_TRACKING_URI", "")
+    if tracking_uri:
+        mlflow.set_tracking_uri(tracking_uri)
+
+    # Encode once; every worker memory-maps the same cache entry
+    train_path = Path(args.data) / "train.parquet"
+    cache = cache_from_args(args)
+    cache.get_or_encode(train_path, CHURN_SPEC, seed=args.seed)  # reads the parquet only on a miss
+    key = cache.key(train_path, CHURN_SPEC, seed=args.seed)
+
+    candidates = sample_candidates(tune["space"], n_trials, seed=args.seed)
+    n_workers, n_threads = plan_workers(cpu_budget, threads)
+
+    mlflow.set_experiment("enterprise_mlops_tuning")
+    with mlflow.start_run(run_name="xgb-search"):
+        mlflow.log_params({"n_trials": len(candidates), "n_workers": n_workers, "threads_per_trial": n_threads})
+        results = run_search(
+            cache,
+            key,
+            candidates,
+            cpu_budget=cpu_budget,
+            threads_per_trial=threads,
+            max_rounds=int(tune["max_rounds"]),
+            early_stopping_rounds=int(tune["early_stopping_rounds"]),
+            seed=args.seed,
+        )
+        best = results[0]
+        best_params = best_model_params(best)
+        mlflow.log_params({f"best_{k}": v for k, v in best_params.items()})
+        mlflow.log_metrics({"best_val_logloss": best.val_logloss, "best_val_roc_auc": best.val_roc_auc})
+
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(yaml.safe_dump({"model": best_params}, sort_keys=False), encoding="utf-8")
+    write_json(
+        "reports/tuning.json",
+        [
+            {
+                "trial": r.trial,
+                "params": r.params,
+                "val_logloss": r.val_logloss,
+                "val_roc_auc": r.val_roc_auc,
+                "n_rounds": r.best_iteration + 1,
+                "pruned": r.pruned,
+                "fit_seconds": r.fit_seconds,
+            }
+            for r in results
+        ],
+    )
+    print(f"Best trial {best.trial}: logloss={best.val_logloss:.5f} auc={best.val_roc_auc:.4f}")
+    print(f"Wrote {out}")
+
+
+if __name__ == "__main__":
+    main()
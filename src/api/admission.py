@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import math
+import os
+import time
+from collections import OrderedDict, deque
+from typing import Any, Awaitable, Callable, Optional
+
+from prometheus_client import Counter, Gauge, Histogram
+
+# livesum: under pre-fork, /metrics reports the total over live workers
+ADMISSION_INFLIGHT = Gauge("admission_inflight", "Admitted requests currently running", multiprocess_mode="livesum")
+ADMISSION_QUEUE_DEPTH = Gauge("admission_queue_depth", "Requests waiting for a slot", multiprocess_mode="livesum")
+ADMISSION_WAIT = Histogram(
+    "admission_wait_seconds",
+    "Time admitted requests spent queued",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+ADMISSION_SHED = Counter("admission_shed_total", "Requests rejected by admission control", ["reason"])
+
+Scope = dict[str, Any]
+ASGIApp = Callable[[Scope, Callable, Callable], Awaitable[None]]
+
+ALWAYS_ADMIT = ("/health", "/metrics")
+
+
+class TokenBucket:
+    """Per-client token buckets (`rate` tokens/s, up to `burst`), LRU-capped at `max_clients`."""
+
+    def __init__(self, rate: float, burst: float, max_clients: int = 10_000):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    def take(self, client: str, now: Optional[float] = None) -> float:
+        """0 if a token was taken, else the seconds until one is available."""
+        now = time.monotonic() if now is None else now
+        tokens, last = self._buckets.pop(client, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - last) * self.rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / self.rate
+        self._buckets[client] = (tokens, now)
+        if len(self._buckets) > self.max_clients:
+            self._buckets.popitem(last=False)
+        return wait
+
+
+class AdmissionController:
+    """ASGI middleware: at most `max_concurrency` guarded requests run at once.
+
+    Up to `max_queue` more wait in FIFO order. A request is shed (503 + Retry-After) when
+    the queue is full, or when its expected wait exceeds `deadline` seconds. The expected
+    wait is the queue position times the EWMA of service time, divided by the
+    concurrency. Requests that are admitted but still wait past the deadline are also
+    shed. Only paths starting with one of `paths` are guarded. /health and /metrics are
+    always admitted.
+
+    It runs on the event loop in front of Starlette's threadpool, so shed requests never
+    occupy a worker thread.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        max_concurrency: int,
+        max_queue: int,
+        deadline: float = 1.0,
+        paths: tuple[str, ...] = ("/predict", "/models/", "/score/", "/explain"),
+        rate_limiter: Optional[TokenBucket] = None,
+        client_header: str = "x-api-key",
+        ewma_alpha: float = 0.2,
+    ):
+        self.app = app
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.deadline = deadline
+        self.paths = paths
+        self.rate_limiter = rate_limiter
+        self.client_header = client_header.lower().encode()
+        self.ewma_alpha = ewma_alpha
+        self.service_time = 0.0  # EWMA seconds per admitted request
+        self.inflight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+
+    @staticmethod
+    def settings_from_env() -> Optional[dict[str, Any]]:
+        """Keyword arguments from ADMISSION_* / RATE_LIMIT_* env vars; None when disabled."""
+        max_concurrency = int(os.getenv("ADMISSION_MAX_CONCURRENCY", "0"))
+        if max_concurrency <= 0:
+            return None
+        rps = float(os.getenv("RATE_LIMIT_RPS", "0"))
+        return {
+            "max_concurrency": max_concurrency,
+            "max_queue": int(os.getenv("ADMISSION_MAX_QUEUE", str(2 * max_concurrency))),
+            "deadline": float(os.getenv("ADMISSION_DEADLINE_MS", "1000")) / 1000,
+            "paths": tuple(p.strip() for p in os.getenv("ADMISSION_PATHS", "/predict,/models/,/score/,/explain").split(",") if p.strip()),
+            "rate_limiter": TokenBucket(rps, float(os.getenv("RATE_LIMIT_BURST", str(max(1.0, 2 * rps))))) if rps > 0 else None,
+        }
+
+    # --- slot accounting -------------------------------------------------------------
+
+    def expected_wait(self, position: int) -> float:
+        return position * self.service_time / self.max_concurrency
+
+    def _release(self) -> None:
+        while self._waiters:
+            fut = self._waiters.popleft()
+            if not fut.done():
+                fut.set_result(None)  # hand the slot over; inflight stays the same
+                ADMISSION_QUEUE_DEPTH.set(len(self._waiters))
+                return
+        self.inflight -= 1
+        ADMISSION_INFLIGHT.set(self.inflight)
+
+    async def _acquire(self) -> Optional[str]:
+        """None once a slot is held, else the shed reason."""
+        if self.inflight < self.max_concurrency and not self._waiters:
+            self.inflight += 1
+            ADMISSION_INFLIGHT.set(self.inflight)
+            ADMISSION_WAIT.observe(0.0)
+            return None
+        if len(self._waiters) >= self.max_queue:
+            return "queue_full"
+        if self.expected_wait(len(self._waiters) + 1) > self.deadline:
+            return "deadline"
+
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        ADMISSION_QUEUE_DEPTH.set(len(self._waiters))
+        t0 = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(fut), timeout=self.deadline)
+        except TimeoutError:
+            if fut.done():  # slot was handed over as the timeout fired: give it back
+                self._release()
+            else:
+                fut.cancel()
+                self._waiters.remove(fut)
+            ADMISSION_QUEUE_DEPTH.set(len(self._waiters))
+            return "timeout"
+        except asyncio.CancelledError:  # client went away while queued
+            if fut.done() and not fut.cancelled():
+                self._release()
+            else:
+                fut.cancel()
+                self._waiters.remove(fut)
+                ADMISSION_QUEUE_DEPTH.set(len(self._waiters))
+            raise
+        ADMISSION_WAIT.observe(time.perf_counter() - t0)
+        return None
+
+    # --- ASGI ------------------------------------------------------------------------
+
+    def _client(self, scope: Scope) -> str:
+        for k, v in scope.get("headers", ()):
+            if k == self.client_header:
+                return v.decode("latin-1")
+        client = scope.get("client")
+        return client[0] if client else "-"
+
+    @staticmethod
+    async def _reject(send: Callable, status: int, retry_after: float, reason: str) -> None:
+        body = json.dumps({"detail": f"overloaded ({reason}), retry later"}).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+    async def __call__(self, scope: Scope, receive: Callable, send: Callable) -> None:
+        path = scope.get("path", "")
+        if scope["type"] != "http" or path in ALWAYS_ADMIT or not path.startswith(self.paths):
+            await self.app(scope, receive, send)
+            return
+
+        if self.rate_limiter is not None:
+            wait = self.rate_limiter.take(self._client(scope))
+            if wait > 0:
+                ADMISSION_SHED.labels("rate_limited").inc()
+                await self._reject(send, 429, wait, "rate limited")
+                return
+
+        reason = await self._acquire()
+        if reason is not None:
+            ADMISSION_SHED.labels(reason).inc()
+            await self._reject(send, 503, max(self.expected_wait(len(self._waiters) + 1), self.deadline), reason)
+            return
+
+        t0 = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            elapsed = time.perf_counter() - t0
+            a = self.ewma_alpha
+            self.service_time = elapsed if self.service_time == 0 else (1 - a) * self.service_time + a * elapsed
+            self._release()
@@ -0,0 +1,239 @@
+"""Model inference in a pool of worker processes, off the API's event loop and GIL.
+
+Each worker loads the serving artifact once. Requests are encoded in the API process,
+on a thread so the event loop keeps serving, and copied into a slot of one shared-memory
+block, so only (slot, n_rows) crosses the process boundary and the worker writes probabilities back into the same slot. Batches
+larger than a slot are split into chunks that queue FIFO with everyone else's, so a
+10k-row batch delays a single-row call by about one chunk, not the whole batch.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing as mp
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Mapping, Optional, Sequence, TypeVar
+
+import numpy as np
+from prometheus_client import Counter, Gauge
+
+from src.api.threads import thread_budget
+from src.modeling.artifact import ServingModel
+
+logger = logging.getLogger(__name__)
+
+INFERENCE_SLOTS_BUSY = Gauge("inference_slots_busy", "Shared-memory slots held by in-flight chunks", multiprocess_mode="livesum")
+INFERENCE_CANCELLED = Counter("inference_cancelled_total", "Inference calls cancelled because the client disconnected")
+
+T = TypeVar("T")
+
+
+def _views(buf: Any, slots: int, slot_rows: int, n_features: int) -> tuple[np.ndarray, np.ndarray]:
+    """(inputs [slots, slot_rows, n_features], outputs [slots, slot_rows]) float32 views of `buf`."""
+    n_in = slots * slot_rows * n_features
+    inputs = np.ndarray((slots, slot_rows, n_features), dtype=np.float32, buffer=buf)
+    outputs = np.ndarray((slots, slot_rows), dtype=np.float32, buffer=buf, offset=n_in * 4)
+    return inputs, outputs
+
+
+# --- worker process ------------------------------------------------------------------
+
+_worker: dict[str, Any] = {}
+
+
+def _init_worker(serving_dir: str, shm_name: str, slots: int, slot_rows: int, threads: tuple[int, int, int], ready: Any) -> None:
+    model = ServingModel(serving_dir, verify=False)
+    model.set_threads(*threads)
+    shm = SharedMemory(name=shm_name)
+    inputs, outputs = _views(shm.buf, slots, slot_rows, model.n_features)
+    _worker.update(model=model, shm=shm, inputs=inputs, outputs=outputs)
+    with ready.get_lock():
+        ready.value += 1
+
+
+def _predict_slot(slot: int, n: int) -> None:
+    _worker["outputs"][slot, :n] = _worker["model"].predict_encoded(_worker["inputs"][slot, :n])
+
+
+def _ping() -> None:
+    pass
+
+
+# --- API process ---------------------------------------------------------------------
+
+
+class ProcessInferenceExecutor:
+    """`await predict_proba(rows)` on `workers` processes holding the model at `serving_dir`.
+
+    `slots` chunks of up to `slot_rows` rows can be in flight at once; more wait FIFO
+    for a free slot. A call cancelled while its chunk is still queued is dropped before
+    a worker sees it. A chunk that is already running keeps its slot until the worker
+    is done writing to it.
+    """
+
+    def __init__(self, serving_dir: str | Path, workers: int = 2, slot_rows: int = 1024, slots: Optional[int] = None):
+        self.serving_dir = str(serving_dir)
+        self.encoder = ServingModel(serving_dir, verify=False)  # encodes in the API process
+        self.workers = workers
+        self.slot_rows = slot_rows
+        self.slots = slots or 2 * workers
+        nbytes = self.slots * slot_rows * (self.encoder.n_features + 1) * 4
+        self._shm = SharedMemory(create=True, size=nbytes)
+        self._inputs, self._outputs = _views(self._shm.buf, self.slots, slot_rows, self.encoder.n_features)
+        self._free = list(range(self.slots))
+        self._waiters: deque[asyncio.Future] = deque()
+        self._lock = threading.Lock()
+        self._pool = self._new_pool()
+
+    @staticmethod
+    def settings_from_env() -> Optional[dict[str, Any]]:
+        """Keyword arguments from INFERENCE_* env vars; None unless INFERENCE_EXECUTOR=process."""
+        if os.getenv("INFERENCE_EXECUTOR", "inprocess").lower() != "process":
+            return None
+        return {
+            "workers": int(os.getenv("INFERENCE_WORKERS", "2")),
+            "slot_rows": int(os.getenv("INFERENCE_SLOT_ROWS", "1024")),
+        }
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        # spawn, not fork: the API process runs an event loop and exporter threads
+        ctx = mp.get_context("spawn")
+        budget = thread_budget()  # also exports OMP/BLAS limits for the workers to inherit
+        threads = (budget.small_batch_threads, budget.large_batch_threads, budget.large_batch_rows)
+        self._ready = ctx.Value("i", 0)  # workers that have loaded the model
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=ctx,
+            initializer=_init_worker,
+            initargs=(self.serving_dir, self._shm.name, self.slots, self.slot_rows, threads, self._ready),
+        )
+
+    def warm(self, timeout: float = 120.0) -> int:
+        """Start the workers and wait until each has loaded the model; returns how many did."""
+        # spawn pools start a worker per submit while none is idle
+        for f in [self._pool.submit(_ping) for _ in range(self.workers)]:
+            f.result(timeout)
+        deadline = time.monotonic() + timeout
+        while self._ready.value < self.workers and time.monotonic() < deadline:
+            time.sleep(0.05)
+        return self._ready.value
+
+    # --- slots -----------------------------------------------------------------------
+
+    async def _acquire(self) -> int:
+        with self._lock:
+            if self._free:
+                INFERENCE_SLOTS_BUSY.inc()
+                return self._free.pop()
+            fut = asyncio.get_running_loop().create_future()
+            self._waiters.append(fut)
+        try:
+            return await fut
+        except asyncio.CancelledError:
+            with self._lock:
+                if fut in self._waiters:
+                    self._waiters.remove(fut)
+            if fut.done() and not fut.cancelled():  # slot arrived as we were cancelled
+                self._release(fut.result())
+            raise
+
+    def _release(self, slot: int) -> None:
+        """Hand `slot` to the oldest waiter, else free it. Safe from any thread."""
+        with self._lock:
+            if not self._waiters:
+                self._free.append(slot)
+                INFERENCE_SLOTS_BUSY.dec()
+                return
+            fut = self._waiters.popleft()
+        fut.get_loop().call_soon_threadsafe(self._hand_over, fut, slot)
+
+    def _hand_over(self, fut: asyncio.Future, slot: int) -> None:
+        if fut.done():  # waiter was cancelled meanwhile
+            self._release(slot)
+        else:
+            fut.set_result(slot)
+
+    # --- inference -------------------------------------------------------------------
+
+    async def _run_chunk(self, rows: Sequence[Mapping[str, Any]]) -> np.ndarray:
+        n = len(rows)
+        # encode before taking a slot: a cancelled to_thread keeps running, and must not write into one
+        X = await asyncio.to_thread(self.encoder.encode, rows)
+        slot = await self._acquire()
+        cf: Optional[Future] = None
+        pool = self._pool
+        try:
+            self._inputs[slot, :n] = X
+            cf = pool.submit(_predict_slot, slot, n)
+            await asyncio.wrap_future(cf)
+            return self._outputs[slot, :n].copy()
+        except BrokenProcessPool:
+            with self._lock:
+                if self._pool is pool:  # first chunk to notice restarts it
+                    logger.error("inference worker died; restarting the pool")
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    self._pool = self._new_pool()
+            raise
+        finally:
+            if cf is None or cf.done():
+                self._release(slot)
+            else:  # cancelled while a worker may still write into the slot
+                cf.add_done_callback(lambda _: self._release(slot))
+
+    async def predict_proba(self, rows: Sequence[Mapping[str, Any]]) -> np.ndarray:
+        """P(churn) per row. A batch keeps at most `workers` of its chunks in flight."""
+        out = np.empty(len(rows), dtype=np.float32)
+        limit = asyncio.Semaphore(self.workers)
+
+        async def chunk(lo: int) -> None:
+            async with limit:
+                out[lo : lo + self.slot_rows] = await self._run_chunk(rows[lo : lo + self.slot_rows])
+
+        await asyncio.gather(*(chunk(lo) for lo in range(0, len(rows), self.slot_rows)))
+        return out
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True, cancel_futures=True)
+        self._inputs = self._outputs = None  # drop views before closing the buffer
+        self._shm.close()
+        self._shm.unlink()
+
+
+class ClientDisconnected(Exception):
+    pass
+
+
+async def cancel_on_disconnect(receive: Callable[[], Awaitable[dict]], aw: Awaitable[T]) -> T:
+    """Await `aw`; if the client disconnects first, cancel it and raise ClientDisconnected.
+
+    `receive` is the request's ASGI receive; call this only after the body has been
+    read, when the next message can only be `http.disconnect`.
+    """
+    task = asyncio.ensure_future(aw)
+    disconnected = False
+
+    async def watch() -> None:
+        nonlocal disconnected
+        while (await receive())["type"] != "http.disconnect":
+            pass
+        if not task.done():
+            disconnected = True
+            INFERENCE_CANCELLED.inc()
+            task.cancel()
+
+    watcher = asyncio.ensure_future(watch())
+    try:
+        return await task
+    except asyncio.CancelledError:
+        if disconnected:
+            raise ClientDisconnected from None
+        raise
+    finally:
+        watcher.cancel()
@@ -1,12 +1,20 @@
 from __future__ import annotations
 
+import logging
 import os
-from typing import Any, Dict, Optional
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
 
 import mlflow
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
+from fastapi import Path as PathParam
+from fastapi import Query
 from pydantic import BaseModel, Field
+from prometheus_client import Counter
 from prometheus_fastapi_instrumentator import Instrumentator
+from starlette.concurrency import run_in_threadpool
 
 from opentelemetry import trace
 from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
@@ -15,7 +23,23 @@ from opentelemetry.sdk.resources import Resource
 from opentelemetry.sdk.trace import TracerProvider
 from opentelemetry.sdk.trace.export import BatchSpanProcessor
 
-from src.monitoring.db import add_feedback, init_db, insert_prediction
+from src.api.admission import AdmissionController
+from src.api.executor import ClientDisconnected, ProcessInferenceExecutor, cancel_on_disconnect
+from src.api.profiling import RequestProfiler, profiled, register_profiling_routes
+from src.api.registry import (
+    PREDICT_LATENCY,
+    ModelRegistry,
+    PipelineScorer,
+    load_model_uri,
+    resolve_model_version,
+)
+from src.api.threads import thread_budget
+from src.modeling.artifact import MANIFEST_FILE, ServingModel
+from src.modeling.batch_scoring import feature_hash
+from src.modeling.explain import Explainer, explainer_for
+from src.monitoring.db import add_feedback, get_customer_score, init_db, insert_prediction
+
+logger = logging.getLogger(__name__)
 
 
 def setup_otel(app_name: str = "mlops-api") -> None:
@@ -27,31 +51,98 @@ def setup_otel(app_name: str = "mlops-api") -> None:
     trace.set_tracer_provider(provider)
 
 
-def load_model():
-    model_uri = os.getenv("MODEL_URI", "")
+def _setup_tracking() -> None:
     tracking_uri = os.getenv("MLFLOW_TRACKING_URI", "")
     if tracking_uri:
         mlflow.set_tracking_uri(tracking_uri)
+
+
+def _is_alias(model_uri: str) -> bool:
+    return model_uri.startswith("models:/") and "@" in model_uri
+
+
+def load_model(version: str = ""):
+    """(model, model_uri); `model.predict_proba(rows)` returns P(churn) per row.
+
+    Prefers the compact serving artifact (UBJ booster + flat encoder params, no
+    sklearn unpickling): SERVING_ARTIFACT_DIR, else the one logged next to MODEL_URI,
+    else models/serving. Models logged without one fall back to the pickled pipeline.
+    `version` pins a registry alias MODEL_URI to the version already resolved.
+    """
+    model_uri = os.getenv("MODEL_URI", "")
+    _setup_tracking()
+
+    local_dir = os.getenv("SERVING_ARTIFACT_DIR", "")
+    if local_dir:
+        return ServingModel(local_dir), model_uri or f"local:{local_dir}"
     if model_uri:
-        return mlflow.pyfunc.load_model(model_uri), model_uri
+        pinned = f"{model_uri.split('@', 1)[0]}/{version}" if version and _is_alias(model_uri) else model_uri
+        return load_model_uri(pinned), model_uri
+    if (Path("models/serving") / MANIFEST_FILE).exists():
+        return ServingModel("models/serving"), "local:models/serving"
     import joblib
-    return joblib.load("models/model.joblib"), "local:models/model.joblib"
+    return PipelineScorer(joblib.load("models/model.joblib")), "local:models/model.joblib"
 
 
-def resolve_model_version(model_uri: str) -> str:
-    # best-effort: if registry URI models:/name@alias, resolve alias -> version
-    try:
-        if model_uri.startswith("models:/") and "@" in model_uri:
-            name_alias = model_uri[len("models:/") :]
-            name, alias = name_alias.split("@", 1)
-            from mlflow import MlflowClient
-            client = MlflowClient()
-            m = client.get_registered_model(name)
-            v = m.aliases.get(alias)
-            return str(v) if v is not None else ""
-    except Exception:
-        return ""
-    return ""
+class ModelHolder:
+    """The default model as (model, model_uri, model_version), loaded on first call.
+
+    When MODEL_URI is a registry alias, the alias is re-resolved every
+    `alias_ttl_seconds` (0 disables) and the model reloaded only if the version has
+    moved. The call doing the check loads the new version; the others keep serving the
+    old one, as does a failed check.
+    """
+
+    def __init__(self, alias_ttl_seconds: float = 60.0):
+        self.alias_ttl_seconds = alias_ttl_seconds
+        self._lock = threading.Lock()
+        self._entry: Optional[tuple[Any, str, str]] = None
+        self._checked = 0.0
+
+    def __call__(self) -> tuple[Any, str, str]:
+        with self._lock:
+            if self._entry is None:
+                self._entry = self._load()
+                self._checked = time.monotonic()
+                return self._entry
+            entry = self._entry
+            if not self._due(entry[1]):
+                return entry
+            self._checked = time.monotonic()  # this call does the check
+        try:
+            _setup_tracking()
+            version = resolve_model_version(entry[1])
+            if not version or version == entry[2]:
+                return entry
+            new = self._load()
+        except Exception:
+            logger.warning("could not refresh %s; keeping version %s", entry[1], entry[2], exc_info=True)
+            return entry
+        logger.info("alias %s moved: version %s -> %s", entry[1], entry[2], new[2])
+        with self._lock:
+            self._entry = new
+        return new
+
+    def _due(self, model_uri: str) -> bool:
+        return (
+            self.alias_ttl_seconds > 0
+            and _is_alias(model_uri)
+            and not os.getenv("SERVING_ARTIFACT_DIR")
+            and time.monotonic() - self._checked >= self.alias_ttl_seconds
+        )
+
+    def _load(self) -> tuple[Any, str, str]:
+        _setup_tracking()
+        version = resolve_model_version(os.getenv("MODEL_URI", ""))
+        model, model_uri = load_model(version)
+        return thread_budget().configure(model), model_uri, version
+
+    def cache_clear(self) -> None:
+        with self._lock:
+            self._entry = None
+
+
+get_model = ModelHolder(alias_ttl_seconds=float(os.getenv("MODEL_ALIAS_TTL_SECONDS", "60")))
 
 
 app = FastAPI(title="Enterprise MLOps API", version="2.0.0")
@@ -60,6 +151,32 @@ setup_otel("enterprise-mlops-api")
 FastAPIInstrumentor.instrument_app(app)
 Instrumentator().instrument(app).expose(app)
 
+# ADMISSION_MAX_CONCURRENCY > 0 bounds concurrent /predict work and sheds with 503 +
+# Retry-After instead of queueing without limit; added last so it is the outermost layer.
+ADMISSION = AdmissionController.settings_from_env()
+if ADMISSION is not None:
+    app.add_middleware(AdmissionController, **ADMISSION)
+
+# PROFILING_ENABLED=1 adds the /admin/profile routes and samples PROFILE_SAMPLE_RATE of
+# /predict calls; when unset nothing is registered or wrapped.
+PROFILER = RequestProfiler.from_env()
+if PROFILER is not None:
+    register_profiling_routes(app, PROFILER)
+
+# Per-business-unit models behind /models/{name}/predict, loaded from models:/{name}@MODEL_ALIAS
+# on first use and evicted LRU past MODEL_CACHE_MB. MODEL_NAMES (comma-separated) restricts
+# which names may be loaded.
+MODELS = ModelRegistry.from_env()
+MODEL_NAMES = {n.strip() for n in os.getenv("MODEL_NAMES", "").split(",") if n.strip()}
+
+# INFERENCE_EXECUTOR=process scores /predict and /predict/batch in INFERENCE_WORKERS
+# worker processes (shared-memory batches) instead of the API process's threadpool.
+INFERENCE = ProcessInferenceExecutor.settings_from_env()
+
+# Thread counts from the container's CPU quota split over the serving processes; shown as
+# inference_threads_info / inference_thread_budget on /metrics.
+THREADS = thread_budget()
+
 
 class PredictRequest(BaseModel):
     tenure_months: float = Field(..., ge=0)
@@ -80,6 +197,44 @@ class PredictResponse(BaseModel):
     model_version: str = ""
 
 
+class PredictBatchRequest(BaseModel):
+    rows: list[PredictRequest] = Field(..., min_length=1, max_length=10_000)
+
+
+class PredictBatchResponse(BaseModel):
+    churn_probability: list[float]
+    model_uri: str = ""
+    model_version: str = ""
+
+
+class ScoreResponse(PredictResponse):
+    customer_id: str
+    source: str  # "precomputed" or "live"
+
+
+class ExplainBatchRequest(BaseModel):
+    rows: list[PredictRequest] = Field(..., min_length=1, max_length=10_000)
+    top_k: int = Field(3, ge=1, le=20)
+
+
+class FeatureContribution(BaseModel):
+    feature: str
+    value: Any
+    contribution: float  # log-odds
+
+
+class Explanation(BaseModel):
+    churn_probability: float
+    base_value: float
+    top_features: list[FeatureContribution]
+
+
+class ExplainResponse(BaseModel):
+    model_uri: str = ""
+    model_version: str = ""
+    explanations: list[Explanation]
+
+
 class FeedbackRequest(BaseModel):
     prediction_id: int
     actual_churn: int = Field(..., ge=0, le=1)
@@ -90,6 +245,25 @@ def on_startup():
     db_url = os.getenv("MONITORING_DB_URL", "")
     if db_url:
         init_db(db_url)
+    try:
+        _, model_uri, model_version = get_model()
+        logger.info("Loaded model %s (version %s)", model_uri, model_version or "n/a")
+    except Exception:
+        logger.exception("Model load failed at startup; will retry on first request")
+        return
+    if INFERENCE is not None:
+        executor = get_executor(get_model()[0])
+        if executor is not None:
+            logger.info("%d inference workers ready", executor.warm())
+
+
+@app.on_event("shutdown")
+def on_shutdown():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor[1].close()
+            _executor = None
 
 
 @app.get("/health")
@@ -97,20 +271,11 @@ def health():
     return {"status": "ok"}
 
 
-@app.post("/predict", response_model=PredictResponse)
-def predict(req: PredictRequest):
-    model, model_uri = load_model()
-    model_version = resolve_model_version(model_uri)
+def _score(req: PredictRequest, model: Any, model_uri: str, model_version: str) -> PredictResponse:
+    return _respond(req, float(model.predict_proba([req.model_dump()])[0]), model_uri, model_version)
 
-    X: list[Dict[str, Any]] = [req.model_dump()]
-    try:
-        import pandas as pd
-        df = pd.DataFrame(X)
-        out = model.predict(df)
-        proba = float(out[0]) if hasattr(out, "__len__") else float(out)
-    except Exception:
-        proba = float(model.predict_proba(X)[0, 1])
 
+def _respond(req: PredictRequest, proba: float, model_uri: str, model_version: str) -> PredictResponse:
     label = int(proba >= 0.5)
 
     pred_id = None
@@ -134,6 +299,154 @@ def predict(req: PredictRequest):
     )
 
 
+_executor: Optional[tuple[Any, ProcessInferenceExecutor]] = None  # (model it serves, executor)
+_executor_lock = threading.Lock()
+
+
+def get_executor(model: Any) -> Optional[ProcessInferenceExecutor]:
+    """Worker pool for `model` when INFERENCE_EXECUTOR=process; restarted when the model is
+    reloaded. None in-process, or for pickled-pipeline models (workers load serving artifacts)."""
+    global _executor
+    if INFERENCE is None or not isinstance(model, ServingModel):
+        return None
+    with _executor_lock:
+        if _executor is None or _executor[0] is not model:
+            if _executor is not None:
+                _executor[1].close()
+            _executor = (model, ProcessInferenceExecutor(model.path, **INFERENCE))
+        return _executor[1]
+
+
+@profiled(PROFILER, "/predict")
+def _predict_inprocess(req: PredictRequest) -> PredictResponse:
+    model, model_uri, model_version = get_model()
+    with PREDICT_LATENCY.labels("default").time():
+        return _score(req, model, model_uri, model_version)
+
+
+@app.post("/predict", response_model=PredictResponse)
+async def predict(req: PredictRequest, request: Request):
+    model, model_uri, model_version = await run_in_threadpool(get_model)
+    executor = get_executor(model)
+    if executor is None:
+        return await run_in_threadpool(_predict_inprocess, req)
+    with PREDICT_LATENCY.labels("default").time():
+        proba = await _infer(request, executor, [req.model_dump()])
+        return await run_in_threadpool(_respond, req, float(proba[0]), model_uri, model_version)
+
+
+@app.post("/predict/batch", response_model=PredictBatchResponse)
+async def predict_batch(req: PredictBatchRequest, request: Request):
+    """Scores up to 10k rows; batch calls are not logged to the monitoring DB."""
+    model, model_uri, model_version = await run_in_threadpool(get_model)
+    rows = [r.model_dump() for r in req.rows]
+    executor = get_executor(model)
+    with PREDICT_LATENCY.labels("batch").time():
+        if executor is None:
+            proba = await run_in_threadpool(model.predict_proba, rows)
+        else:
+            proba = await _infer(request, executor, rows)
+    return PredictBatchResponse(churn_probability=proba.tolist(), model_uri=model_uri, model_version=model_version)
+
+
+async def _infer(request: Request, executor: ProcessInferenceExecutor, rows: list[dict[str, Any]]) -> Any:
+    try:
+        return await cancel_on_disconnect(request.receive, executor.predict_proba(rows))
+    except ClientDisconnected:
+        raise HTTPException(status_code=499, detail="client disconnected") from None
+
+
+@app.post("/models/{name}/predict", response_model=PredictResponse)
+def predict_named(req: PredictRequest, name: str = PathParam(..., pattern=r"^[A-Za-z0-9_.-]+$")):
+    if MODEL_NAMES and name not in MODEL_NAMES:
+        raise HTTPException(status_code=404, detail=f"model {name!r} is not served here")
+    try:
+        entry = MODELS.get(name)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+    except Exception as e:
+        logger.exception("loading model %s failed", name)
+        raise HTTPException(status_code=503, detail=f"model {name!r} could not be loaded") from e
+    return _score(req, entry, entry.model_uri, entry.model_version)
+
+
+@app.get("/models")
+def loaded_models():
+    return {"budget_bytes": MODELS.budget_bytes, "alias": MODELS.alias, "loaded": MODELS.loaded()}
+
+
+SCORE_LOOKUPS = Counter("score_lookups_total", "/score lookups by outcome", ["result"])
+
+
+@app.post("/score/{customer_id}", response_model=ScoreResponse)
+def score_customer(customer_id: str, req: PredictRequest):
+    """Nightly precomputed score when the customer's features and the model version still
+    match; otherwise score live (and log it like /predict)."""
+    model, model_uri, model_version = get_model()
+    db_url = os.getenv("SCORE_DB_URL") or os.getenv("MONITORING_DB_URL", "")
+    row = get_customer_score(db_url, customer_id) if db_url else None
+    if row is None:
+        result = "miss"
+    elif row.model_version != model_version:
+        result = "stale_model"
+    elif row.feature_hash != feature_hash(req.model_dump()):
+        result = "stale_features"
+    else:
+        result = "hit"
+    SCORE_LOOKUPS.labels(result).inc()
+
+    if result == "hit":
+        proba = float(row.churn_probability)
+        return ScoreResponse(
+            customer_id=customer_id,
+            source="precomputed",
+            churn_probability=proba,
+            churn_label=int(proba >= 0.5),
+            model_uri=model_uri,
+            model_version=model_version,
+        )
+    with PREDICT_LATENCY.labels("default").time():
+        live = _score(req, model, model_uri, model_version)
+    return ScoreResponse(customer_id=customer_id, source="live", **live.model_dump())
+
+
+_explainer: Optional[tuple[Any, Explainer]] = None  # (model it was built for, explainer)
+_explainer_lock = threading.Lock()
+
+
+def get_explainer() -> tuple[Explainer, str, str]:
+    """Explainer for the current default model; rebuilt when the model is reloaded."""
+    global _explainer
+    model, model_uri, model_version = get_model()
+    with _explainer_lock:
+        if _explainer is None or _explainer[0] is not model:
+            cache_size = int(os.getenv("EXPLAIN_CACHE_SIZE", "100000"))
+            explainer = explainer_for(model, model_version, cache_size=cache_size)
+            if explainer.model is not model:  # pickled pipeline converted to a serving artifact
+                THREADS.configure(explainer.model)
+            if _explainer is not None:
+                _explainer[1].close()
+            _explainer = (model, explainer)
+        return _explainer[1], model_uri, model_version
+
+
+def _explain(rows: list[PredictRequest], top_k: int) -> ExplainResponse:
+    explainer, model_uri, model_version = get_explainer()
+    with PREDICT_LATENCY.labels("explain").time():
+        out = explainer.explain([r.model_dump() for r in rows], top_k=top_k)
+    return ExplainResponse(model_uri=model_uri, model_version=model_version, explanations=out)
+
+
+@app.post("/explain", response_model=ExplainResponse)
+def explain(req: PredictRequest, top_k: int = Query(3, ge=1, le=20)):
+    return _explain([req], top_k)
+
+
+@app.post("/explain/batch", response_model=ExplainResponse)
+def explain_batch(req: ExplainBatchRequest):
+    return _explain(req.rows, req.top_k)
+
+
 @app.post("/feedback")
 def feedback(req: FeedbackRequest):
     db_url = os.getenv("MONITORING_DB_URL", "")
@@ -0,0 +1,244 @@
+"""Pre-fork serving: load and warm the model once, then fork uvicorn workers.
+
+Workers inherit the master's model, encoder arrays and imported modules as shared
+copy-on-write pages instead of each loading their own copy. `gc.freeze()` keeps the
+cyclic GC in the workers from writing to (and so un-sharing) those inherited objects.
+
+When MODEL_URI is a registry alias (models:/name@alias) the master polls the alias
+and, when it moves, loads the new version itself and replaces workers one at a time,
+so capacity never drops to zero and no worker loads a model on its own.
+
+prometheus_client runs in multiprocess mode (PROMETHEUS_MULTIPROC_DIR, emptied at
+startup): each worker writes its metrics to files there and /metrics aggregates all
+of them, so a scrape counts every worker's traffic, not just the one that answered.
+
+    python -m src.api.prefork --workers 4 --port 8000
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+WARMUP_ROW = {
+    "tenure_months": 12.0,
+    "monthly_charges": 70.0,
+    "total_charges": 840.0,
+    "tickets_90d": 1.0,
+    "contract_type": "month-to-month",
+    "payment_method": "credit_card",
+    "internet_service": "fiber",
+    "region": "NE",
+}
+
+
+def warm_model(reload: bool = False) -> str:
+    """Load (or reload) the model into this process and score one row; returns the version."""
+    from src.api.main import get_model
+
+    if reload:
+        # the previous model was frozen into the permanent generation; thaw it so it can be collected
+        gc.unfreeze()
+        get_model.cache_clear()
+    get_model.alias_ttl_seconds = 0  # the master polls the alias and rolls the workers instead
+    model, model_uri, model_version = get_model()
+    model.predict_proba([WARMUP_ROW])
+    logger.info("master warmed %s (version %s)", model_uri, model_version or "n/a")
+    # everything loaded so far is long-lived: keep it out of the workers' GC passes
+    gc.collect()
+    gc.freeze()
+    return model_version
+
+
+def setup_multiprocess_metrics() -> str:
+    """Point prometheus_client at an empty PROMETHEUS_MULTIPROC_DIR; must run before it is imported."""
+    if "prometheus_client" in sys.modules:
+        logger.warning("prometheus_client already imported; metrics will not be aggregated across workers")
+    path = Path(os.getenv("PROMETHEUS_MULTIPROC_DIR") or tempfile.mkdtemp(prefix="prometheus_multiproc_"))
+    path.mkdir(parents=True, exist_ok=True)
+    for stale in path.glob("*.db"):  # files from a previous run would be added to this run's counters
+        stale.unlink()
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = str(path)
+    return str(path)
+
+
+def _mark_dead(pid: int) -> None:
+    """Drop the live gauges (in-flight, queue depth, ...) of a worker that has exited."""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(pid)
+
+
+def bind_socket(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+class PreforkMaster:
+    def __init__(
+        self,
+        sock: socket.socket,
+        workers: int,
+        poll_seconds: float = 60.0,
+        ready_seconds: float = 2.0,
+        log_level: str = "info",
+    ):
+        self.sock = sock
+        self.n_workers = workers
+        self.poll_seconds = poll_seconds
+        self.ready_seconds = ready_seconds
+        self.log_level = log_level
+        self.pids: list[int] = []
+        self.version = ""
+        self._stopping = False
+        self._reload_requested = False
+
+    # --- workers -----------------------------------------------------------------
+
+    def _spawn(self) -> int:
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                self._worker_main()
+            except BaseException:
+                logger.exception("worker crashed")
+                code = 1
+            finally:
+                os._exit(code)
+        logger.info("started worker %d", pid)
+        return pid
+
+    def _worker_main(self) -> None:
+        import uvicorn
+
+        from src.api.main import app
+
+        for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP, signal.SIGCHLD):
+            signal.signal(sig, signal.SIG_DFL)
+        config = uvicorn.Config(app, log_level=self.log_level, lifespan="on")
+        uvicorn.Server(config).run(sockets=[self.sock])
+
+    def _stop_worker(self, pid: int, timeout: float = 30.0) -> None:
+        try:
+            os.kill(pid, signal.SIGTERM)  # uvicorn drains in-flight requests on SIGTERM
+        except ProcessLookupError:
+            return
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            done, _ = os.waitpid(pid, os.WNOHANG)
+            if done:
+                _mark_dead(pid)
+                return
+            time.sleep(0.1)
+        os.kill(pid, signal.SIGKILL)
+        os.waitpid(pid, 0)
+        _mark_dead(pid)
+
+    def _reap(self) -> None:
+        """Replace workers that exited unexpectedly."""
+        for i, pid in enumerate(list(self.pids)):
+            done, status = os.waitpid(pid, os.WNOHANG)
+            if done and not self._stopping:
+                logger.warning("worker %d exited (status %d); respawning", pid, status)
+                _mark_dead(pid)
+                self.pids[i] = self._spawn()
+
+    # --- reload --------------------------------------------------------------------
+
+    def _alias_version(self) -> Optional[str]:
+        from src.api.registry import resolve_model_version
+
+        model_uri = os.getenv("MODEL_URI", "")
+        if not (model_uri.startswith("models:/") and "@" in model_uri):
+            return None
+        return resolve_model_version(model_uri) or None
+
+    def rolling_reload(self) -> None:
+        """Load the new model in the master, then swap workers one by one."""
+        try:
+            self.version = warm_model(reload=True)
+        except Exception:
+            logger.exception("reload failed; keeping current workers")
+            return
+        for i, old in enumerate(list(self.pids)):
+            self.pids[i] = self._spawn()
+            time.sleep(self.ready_seconds)
+            self._stop_worker(old)
+        logger.info("all workers now serve version %s", self.version or "n/a")
+
+    # --- main loop -----------------------------------------------------------------
+
+    def run(self) -> None:
+        self.version = warm_model()
+        self.pids = [self._spawn() for _ in range(self.n_workers)]
+
+        def stop(signum, frame):
+            self._stopping = True
+
+        def hup(signum, frame):
+            self._reload_requested = True
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+        signal.signal(signal.SIGHUP, hup)
+
+        next_poll = time.monotonic() + self.poll_seconds
+        while not self._stopping:
+            time.sleep(0.5)
+            self._reap()
+            if self._reload_requested:
+                self._reload_requested = False
+                self.rolling_reload()
+            elif time.monotonic() >= next_poll:
+                next_poll = time.monotonic() + self.poll_seconds
+                latest = self._alias_version()
+                if latest and latest != self.version:
+                    logger.info("alias moved %s -> %s; rolling reload", self.version, latest)
+                    self.rolling_reload()
+
+        for pid in self.pids:
+            self._stop_worker(pid)
+        self.sock.close()
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--host", default="0.0.0.0")
+    ap.add_argument("--port", type=int, default=8000)
+    ap.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", "2")))
+    ap.add_argument("--poll-seconds", type=float, default=60.0, help="How often to check the MODEL_URI alias")
+    ap.add_argument("--ready-seconds", type=float, default=2.0, help="Grace period for a new worker before its predecessor stops")
+    ap.add_argument("--log-level", default="info")
+    args = ap.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stderr)
+    os.environ["WEB_CONCURRENCY"] = str(args.workers)  # the thread budget is split across workers
+    setup_multiprocess_metrics()
+    master = PreforkMaster(
+        bind_socket(args.host, args.port),
+        workers=args.workers,
+        poll_seconds=args.poll_seconds,
+        ready_seconds=args.ready_seconds,
+        log_level=args.log_level,
+    )
+    master.run()
+
+
+if __name__ == "__main__":
+    main()
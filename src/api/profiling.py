@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import functools
+import heapq
+import inspect
+import itertools
+import json
+import os
+import random
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+Frame = tuple[str, str, int]  # (function, file, first line)
+Stack = tuple[Frame, ...]  # root -> leaf
+
+
+def _stack(frame: Any) -> Stack:
+    out = []
+    while frame is not None:
+        code = frame.f_code
+        out.append((code.co_name, code.co_filename, code.co_firstlineno))
+        frame = frame.f_back
+    return tuple(reversed(out))
+
+
+def collapsed(samples: Counter) -> str:
+    """Brendan Gregg collapsed format (`a;b;c <count>`), readable by flamegraph.pl / speedscope."""
+    lines = [
+        ";".join(f"{name} ({os.path.basename(path)}:{line})" for name, path, line in stack) + f" {n}"
+        for stack, n in samples.most_common()
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def speedscope(samples: Counter, interval: float, name: str = "profile") -> dict[str, Any]:
+    """speedscope "sampled" profile; weights are seconds of wall time per stack."""
+    index: dict[Frame, int] = {}
+    frames: list[dict[str, Any]] = []
+    stacks, weights = [], []
+    for stack, n in samples.most_common():
+        ids = []
+        for fr in stack:
+            if fr not in index:
+                index[fr] = len(frames)
+                frames.append({"name": fr[0], "file": fr[1], "line": fr[2]})
+            ids.append(index[fr])
+        stacks.append(ids)
+        weights.append(n * interval)
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": name,
+        "exporter": "src.api.profiling",
+        "shared": {"frames": frames},
+        "profiles": [
+            {
+                "type": "sampled",
+                "name": name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": stacks,
+                "weights": weights,
+            }
+        ],
+    }
+
+
+def sample_process(seconds: float, interval: float = 0.005) -> Counter:
+    """Sample every thread's Python stack (except the caller's) for `seconds`.
+
+    Sync endpoints run on the anyio threadpool, so their frames show up here like any
+    other thread; the GIL is only held for the `sys._current_frames()` snapshot.
+    """
+    me = threading.get_ident()
+    samples: Counter = Counter()
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        for tid, frame in sys._current_frames().items():
+            if tid != me:
+                samples[_stack(frame)] += 1
+        time.sleep(interval)
+    return samples
+
+
+@dataclass(order=True)
+class RequestProfile:
+    duration_ms: float
+    id: int = field(compare=False)
+    path: str = field(compare=False)
+    started_at: float = field(compare=False)
+    cpu_ms: float = field(compare=False)
+    samples: Counter = field(compare=False, repr=False)
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "path": self.path,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration_ms, 3),
+            "cpu_ms": round(self.cpu_ms, 3),
+            "n_samples": sum(self.samples.values()),
+        }
+
+
+class RequestProfiler:
+    """Profiles a random `sample_rate` fraction of requests and keeps the slowest `keep`.
+
+    One sampler thread snapshots only the threads currently running a sampled request
+    and sleeps while there are none. Endpoints opt in with `profiled(...)`, which is a
+    no-op when the profiler is disabled.
+    """
+
+    def __init__(self, sample_rate: float = 0.01, keep: int = 20, interval: float = 0.005):
+        self.sample_rate = sample_rate
+        self.keep = keep
+        self.interval = interval
+        self._slowest: list[RequestProfile] = []  # min-heap on duration
+        self._ids = itertools.count(1)
+        self._start()
+        # threads do not survive fork (src/api/prefork.py): give each worker its own sampler
+        os.register_at_fork(after_in_child=self._start)
+
+    def _start(self) -> None:
+        self._lock = threading.Lock()
+        self._active: dict[int, Counter] = {}
+        self._has_work = threading.Event()
+        threading.Thread(target=self._run, name="request-profiler", daemon=True).start()
+
+    @classmethod
+    def from_env(cls) -> Optional[RequestProfiler]:
+        """PROFILING_ENABLED=1 turns profiling on; None (no routes, no wrapping) otherwise."""
+        if os.getenv("PROFILING_ENABLED", "").lower() not in ("1", "true", "yes", "y"):
+            return None
+        return cls(
+            sample_rate=float(os.getenv("PROFILE_SAMPLE_RATE", "0.01")),
+            keep=int(os.getenv("PROFILE_KEEP", "20")),
+            interval=float(os.getenv("PROFILE_INTERVAL_MS", "5")) / 1000,
+        )
+
+    def _run(self) -> None:
+        while True:
+            self._has_work.wait()
+            with self._lock:
+                active = dict(self._active)
+            frames = sys._current_frames()
+            for tid, samples in active.items():
+                frame = frames.get(tid)
+                if frame is not None:
+                    samples[_stack(frame)] += 1
+            time.sleep(self.interval)
+
+    def wrap(self, fn: Callable, path: str) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if random.random() >= self.sample_rate:
+                return fn(*args, **kwargs)
+            tid = threading.get_ident()
+            samples: Counter = Counter()
+            with self._lock:
+                self._active[tid] = samples
+                self._has_work.set()
+            started, t0, c0 = time.time(), time.perf_counter(), time.thread_time()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                duration_ms = (time.perf_counter() - t0) * 1000
+                cpu_ms = (time.thread_time() - c0) * 1000
+                with self._lock:
+                    self._active.pop(tid, None)
+                    if not self._active:
+                        self._has_work.clear()
+                    self._record(RequestProfile(duration_ms, next(self._ids), path, started, cpu_ms, samples))
+
+        # FastAPI resolves string annotations against the wrapper's module; hand it the
+        # endpoint's resolved signature instead.
+        wrapper.__signature__ = inspect.signature(fn, eval_str=True)
+        return wrapper
+
+    def _record(self, prof: RequestProfile) -> None:
+        if len(self._slowest) < self.keep:
+            heapq.heappush(self._slowest, prof)
+        elif prof > self._slowest[0]:
+            heapq.heapreplace(self._slowest, prof)
+
+    def slowest(self) -> list[RequestProfile]:
+        with self._lock:
+            return sorted(self._slowest, reverse=True)
+
+    def get(self, profile_id: int) -> Optional[RequestProfile]:
+        with self._lock:
+            return next((p for p in self._slowest if p.id == profile_id), None)
+
+
+def profiled(profiler: Optional[RequestProfiler], path: str) -> Callable[[Callable], Callable]:
+    """Decorator; returns the endpoint unchanged when profiling is disabled."""
+    if profiler is None:
+        return lambda fn: fn
+    return lambda fn: profiler.wrap(fn, path)
+
+
+def register_profiling_routes(app: Any, profiler: RequestProfiler) -> None:
+    """`/admin/profile*` routes, guarded by the ADMIN_TOKEN env var (X-Admin-Token header)."""
+    from fastapi import Depends, Header, HTTPException, Query
+    from fastapi.responses import PlainTextResponse, Response
+
+    def require_admin(x_admin_token: str = Header(default="")) -> None:
+        expected = os.getenv("ADMIN_TOKEN", "")
+        if not expected or not secrets.compare_digest(x_admin_token, expected):
+            raise HTTPException(status_code=403, detail="admin token required")
+
+    def render(samples: Counter, fmt: str, interval: float, name: str) -> Response:
+        if fmt == "speedscope":
+            return Response(
+                json.dumps(speedscope(samples, interval, name)),
+                media_type="application/json",
+                headers={"Content-Disposition": f'attachment; filename="{name}.speedscope.json"'},
+            )
+        return PlainTextResponse(collapsed(samples))
+
+    @app.post("/admin/profile", dependencies=[Depends(require_admin)])
+    def profile_process(
+        seconds: float = Query(10.0, gt=0, le=120),
+        interval_ms: float = Query(5.0, ge=1, le=100),
+        format: str = Query("collapsed", pattern="^(collapsed|speedscope)$"),
+    ):
+        samples = sample_process(seconds, interval_ms / 1000)
+        return render(samples, format, interval_ms / 1000, f"process-{int(time.time())}")
+
+    @app.get("/admin/profile/requests", dependencies=[Depends(require_admin)])
+    def profiled_requests():
+        return {"sample_rate": profiler.sample_rate, "profiles": [p.summary() for p in profiler.slowest()]}
+
+    @app.get("/admin/profile/requests/{profile_id}", dependencies=[Depends(require_admin)])
+    def profiled_request(profile_id: int, format: str = Query("collapsed", pattern="^(collapsed|speedscope)$")):
+        prof = profiler.get(profile_id)
+        if prof is None:
+            raise HTTPException(status_code=404, detail="profile not found (evicted or never sampled)")
+        return render(prof.samples, format, profiler.interval, f"request-{prof.id}")
@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import copy
+import logging
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+import mlflow
+import numpy as np
+from prometheus_client import Counter, Gauge, Histogram
+
+from src.api.threads import thread_budget
+from src.modeling.artifact import ServingModel
+
+logger = logging.getLogger(__name__)
+
+PREDICT_LATENCY = Histogram(
+    "model_predict_latency_seconds",
+    "predict_proba latency per model",
+    ["model"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0),
+)
+MODEL_LOADS = Counter("model_loads_total", "Models loaded into the registry", ["model"])
+MODEL_LOAD_SECONDS = Histogram("model_load_seconds", "Time to load a model", ["model"])
+MODEL_EVICTIONS = Counter("model_evictions_total", "Models evicted from the registry (LRU)", ["model"])
+MODELS_LOADED = Gauge("models_loaded", "Models currently held by the registry", multiprocess_mode="livesum")
+MODELS_BYTES = Gauge("models_loaded_bytes", "Estimated bytes of the models held by the registry", multiprocess_mode="livesum")
+
+
+class PipelineScorer:
+    """Gives a pickled sklearn pipeline the `ServingModel.predict_proba` signature."""
+
+    def __init__(self, pipe: Any):
+        self.pipe = pipe
+        self._large: Optional[tuple[int, Any]] = None  # (min rows, pipeline)
+
+    def set_threads(self, small: int, large: int = 0, large_batch_rows: int = 0) -> None:
+        """Override the pickled `n_jobs` (-1 at training time); see `ServingModel.set_threads`."""
+        self.pipe.named_steps["model"].set_params(n_jobs=small)
+        self._large = None
+        if large and large != small and large_batch_rows > 0:
+            big = copy.deepcopy(self.pipe)
+            big.named_steps["model"].set_params(n_jobs=large)
+            self._large = (large_batch_rows, big)
+
+    def predict_proba(self, rows: Any) -> np.ndarray:
+        import pandas as pd
+        pipe = self._large[1] if self._large is not None and len(rows) >= self._large[0] else self.pipe
+        return pipe.predict_proba(pd.DataFrame(rows))[:, 1]
+
+
+def download_serving_artifact(model_uri: str) -> Optional[str]:
+    """Local copy of the `serving/` artifact logged in the same run as `model_uri`, if any."""
+    try:
+        from mlflow import MlflowClient
+        if model_uri.startswith("models:/"):
+            ref = model_uri[len("models:/") :]
+            client = MlflowClient()
+            if "@" in ref:
+                name, alias = ref.split("@", 1)
+                mv = client.get_model_version_by_alias(name, alias)
+            else:
+                name, version = ref.split("/", 1)
+                mv = client.get_model_version(name, version)
+            run_id = mv.run_id
+        elif model_uri.startswith("runs:/"):
+            run_id = model_uri[len("runs:/") :].split("/", 1)[0]
+        else:
+            return None
+        return mlflow.artifacts.download_artifacts(run_id=run_id, artifact_path="serving")
+    except Exception:
+        return None
+
+
+def resolve_model_version(model_uri: str) -> str:
+    # best-effort: if registry URI models:/name@alias, resolve alias -> version
+    try:
+        if model_uri.startswith("models:/") and "@" in model_uri:
+            name_alias = model_uri[len("models:/") :]
+            name, alias = name_alias.split("@", 1)
+            from mlflow import MlflowClient
+            client = MlflowClient()
+            m = client.get_registered_model(name)
+            v = m.aliases.get(alias)
+            return str(v) if v is not None else ""
+    except Exception:
+        return ""
+    return ""
+
+
+def load_model_uri(model_uri: str) -> Any:
+    """Serving artifact logged next to `model_uri` if there is one, else the pickled pipeline."""
+    serving_dir = download_serving_artifact(model_uri)
+    if serving_dir:
+        return ServingModel(serving_dir)
+    return PipelineScorer(mlflow.sklearn.load_model(model_uri))
+
+
+def model_nbytes(model: Any) -> int:
+    """Rough resident size: artifact files for a ServingModel, pickle size otherwise."""
+    if isinstance(model, ServingModel):
+        return sum(p.stat().st_size for p in model.path.iterdir() if p.is_file())
+    try:
+        return len(pickle.dumps(getattr(model, "pipe", model), protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return 0
+
+
+@dataclass
+class LoadedModel:
+    name: str
+    model: Any
+    model_uri: str
+    model_version: str
+    nbytes: int
+    loaded_at: float
+
+    def predict_proba(self, rows: Any) -> np.ndarray:
+        with PREDICT_LATENCY.labels(self.name).time():
+            return self.model.predict_proba(rows)
+
+
+def _resolve_registered(name: str, alias: str) -> str:
+    return resolve_model_version(f"models:/{name}@{alias}")
+
+
+def _load_registered(name: str, alias: str) -> LoadedModel:
+    model_uri = f"models:/{name}@{alias}"
+    version = _resolve_registered(name, alias)
+    if not version:
+        raise LookupError(f"no registered model {name!r} with alias {alias!r}")
+    # load the version just resolved, so the alias moving mid-load cannot mislabel the model
+    model = thread_budget().configure(load_model_uri(f"models:/{name}/{version}"))
+    return LoadedModel(name, model, model_uri, version, model_nbytes(model), time.time())
+
+
+class ModelRegistry:
+    """Named models loaded on first use and kept in LRU order under a byte budget.
+
+    Concurrent requests for a model that is not loaded yet share one load. Loads run
+    outside the registry lock, so other models keep serving meanwhile. The model just
+    loaded is never evicted, even if it alone exceeds the budget.
+
+    Every `alias_ttl_seconds` (0 disables), the next request for a loaded model
+    re-resolves its alias. If the alias has moved, that request loads the new version
+    and swaps it in; concurrent requests keep using the old one until then.
+    """
+
+    def __init__(
+        self,
+        budget_bytes: int,
+        alias: str = "champion",
+        loader: Optional[Callable[[str, str], LoadedModel]] = None,
+        alias_ttl_seconds: float = 60.0,
+        resolver: Optional[Callable[[str, str], str]] = None,
+    ):
+        self.budget_bytes = budget_bytes
+        self.alias = alias
+        self.alias_ttl_seconds = alias_ttl_seconds
+        self._loader = loader or _load_registered
+        self._resolver = resolver or _resolve_registered
+        self._lock = threading.Lock()
+        self._models: OrderedDict[str, LoadedModel] = OrderedDict()
+        self._loading: dict[str, Future] = {}
+        self._checked: dict[str, float] = {}  # name -> monotonic time the alias was last resolved
+
+    @classmethod
+    def from_env(cls) -> ModelRegistry:
+        return cls(
+            budget_bytes=int(float(os.getenv("MODEL_CACHE_MB", "1024")) * 1024**2),
+            alias=os.getenv("MODEL_ALIAS", "champion"),
+            alias_ttl_seconds=float(os.getenv("MODEL_ALIAS_TTL_SECONDS", "60")),
+        )
+
+    def get(self, name: str) -> LoadedModel:
+        with self._lock:
+            entry = self._models.get(name)
+            if entry is not None:
+                self._models.move_to_end(name)
+                now = time.monotonic()
+                if self.alias_ttl_seconds <= 0 or now - self._checked.get(name, now) < self.alias_ttl_seconds:
+                    return entry
+                self._checked[name] = now  # this request does the check; the others keep serving
+            else:
+                fut = self._loading.get(name)
+                owner = fut is None
+                if owner:
+                    fut = self._loading[name] = Future()
+        if entry is not None:
+            return self._refresh(name, entry)
+        if not owner:
+            return fut.result()
+
+        try:
+            t0 = time.perf_counter()
+            entry = self._loader(name, self.alias)
+            MODEL_LOAD_SECONDS.labels(name).observe(time.perf_counter() - t0)
+            MODEL_LOADS.labels(name).inc()
+            logger.info("loaded %s version %s (%.1f MB)", entry.model_uri, entry.model_version, entry.nbytes / 1024**2)
+        except BaseException as e:
+            with self._lock:
+                del self._loading[name]
+            fut.set_exception(e)
+            raise
+        with self._lock:
+            self._models[name] = entry
+            self._checked[name] = time.monotonic()
+            del self._loading[name]
+            self._evict(keep=name)
+        fut.set_result(entry)
+        return entry
+
+    def _refresh(self, name: str, entry: LoadedModel) -> LoadedModel:
+        """`entry`, or the alias's new version if it has moved. Failures keep `entry` serving."""
+        try:
+            version = self._resolver(name, self.alias)
+            if not version or version == entry.model_version:
+                return entry
+            t0 = time.perf_counter()
+            new = self._loader(name, self.alias)
+            MODEL_LOAD_SECONDS.labels(name).observe(time.perf_counter() - t0)
+            MODEL_LOADS.labels(name).inc()
+        except Exception:
+            logger.warning("could not refresh %s@%s; keeping version %s", name, self.alias, entry.model_version, exc_info=True)
+            return entry
+        logger.info("alias %s@%s moved: version %s -> %s", name, self.alias, entry.model_version, new.model_version)
+        with self._lock:
+            if name in self._models:  # not evicted meanwhile
+                self._models[name] = new
+                self._models.move_to_end(name)
+                self._evict(keep=name)
+        return new
+
+    def _evict(self, keep: str) -> None:
+        total = sum(m.nbytes for m in self._models.values())
+        for name in list(self._models):
+            if total <= self.budget_bytes:
+                break
+            if name == keep:
+                continue
+            total -= self._models.pop(name).nbytes
+            MODEL_EVICTIONS.labels(name).inc()
+            logger.info("evicted %s (LRU, budget %.0f MB)", name, self.budget_bytes / 1024**2)
+        MODELS_LOADED.set(len(self._models))
+        MODELS_BYTES.set(total)
+
+    def loaded(self) -> list[dict[str, Any]]:
+        with self._lock:
+            return [
+                {"name": m.name, "model_uri": m.model_uri, "model_version": m.model_version, "bytes": m.nbytes}
+                for m in self._models.values()
+            ]
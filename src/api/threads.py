@@ -0,0 +1,154 @@
+"""CPU thread budget for serving.
+
+XGBoost, OpenMP and BLAS default to one thread per visible core. In a container that
+core count is the host's, not the task's CPU quota, and every serving process starts
+that many threads. This module reads the quota from the cgroup, divides it among
+the serving processes, and scores single rows single-threaded. Only batches from
+`large_batch_rows` rows up run on the process's share of the cores.
+"""
+from __future__ import annotations
+
+import logging
+import math
+import os
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Optional
+
+from prometheus_client import Gauge
+
+logger = logging.getLogger(__name__)
+
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS")
+
+# An info-style gauge rather than prometheus_client.Info, which multiprocess mode (pre-fork) drops;
+# every serving process publishes the same values, hence livemax.
+THREAD_CONFIG = Gauge(
+    "inference_threads_info",
+    "CPU limit and thread budget chosen for this serving process",
+    ["cpu_limit", "source", "processes", "threads_per_process", "small_batch_threads", "large_batch_threads", "large_batch_rows"],
+    multiprocess_mode="livemax",
+)
+THREAD_COUNTS = Gauge("inference_thread_budget", "Threads per scoring call by batch size", ["batch"], multiprocess_mode="livemax")
+CPU_LIMIT = Gauge("inference_cpu_limit", "CPUs available to the container (cgroup quota or affinity)", multiprocess_mode="livemax")
+
+
+def _cgroup_dirs(root: Path, proc_cgroup: Path) -> list[Path]:
+    """This process's own cgroup directories and their ancestors, then the mount root."""
+    dirs = []
+    try:
+        for line in proc_cgroup.read_text().splitlines():
+            _, controllers, path = line.split(":", 2)
+            parts = Path(path.lstrip("/")).parts
+            subs = [Path(*parts[:i]) for i in range(len(parts), 0, -1)]
+            if controllers == "":  # v2 unified hierarchy
+                dirs += [root / sub for sub in subs]
+            elif "cpu" in controllers.split(","):
+                dirs += [base / sub for sub in subs for base in (root / "cpu", root / "cpu,cpuacct")]
+    except (OSError, ValueError):
+        pass
+    return list(dict.fromkeys(dirs + [root, root / "cpu", root / "cpu,cpuacct"]))
+
+
+def _read_quota(d: Path) -> Optional[tuple[float, str]]:
+    try:
+        quota, period = (d / "cpu.max").read_text().split()[:2]  # v2: "max 100000" or "150000 100000"
+        return (int(quota) / int(period), "cgroup v2") if quota != "max" else None
+    except (OSError, ValueError):
+        pass
+    try:
+        quota = int((d / "cpu.cfs_quota_us").read_text())  # v1: -1 when unlimited
+        return (quota / int((d / "cpu.cfs_period_us").read_text()), "cgroup v1") if quota > 0 else None
+    except (OSError, ValueError):
+        return None
+
+
+def cgroup_cpu_limit(root: str | Path = "/sys/fs/cgroup", proc_cgroup: str | Path = "/proc/self/cgroup") -> Optional[tuple[float, str]]:
+    """(CPUs, source) from the tightest CPU quota on this process's cgroup path, or None
+    when no level has one. An unlimited child does not lift a parent's quota."""
+    quotas = [q for q in map(_read_quota, _cgroup_dirs(Path(root), Path(proc_cgroup))) if q is not None]
+    return min(quotas, key=lambda q: q[0]) if quotas else None
+
+
+def detect_cpu_limit() -> tuple[float, str]:
+    """CPUs this process may use: CPU_LIMIT, else the cgroup quota, capped by the affinity mask."""
+    cores = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+    if os.getenv("CPU_LIMIT"):
+        return float(os.environ["CPU_LIMIT"]), "env"
+    quota = cgroup_cpu_limit()
+    if quota is not None and quota[0] < cores:
+        return quota
+    return float(cores), "affinity"
+
+
+@dataclass(frozen=True)
+class ThreadBudget:
+    cpu_limit: float
+    source: str
+    processes: int  # serving processes sharing the limit
+    threads_per_process: int
+    small_batch_threads: int
+    large_batch_threads: int
+    large_batch_rows: int
+
+    @classmethod
+    def from_env(cls) -> ThreadBudget:
+        """Budget for WEB_CONCURRENCY API processes (times INFERENCE_WORKERS when
+        INFERENCE_EXECUTOR=process). INFERENCE_THREADS overrides the large-batch count."""
+        cpu_limit, source = detect_cpu_limit()
+        processes = max(1, int(os.getenv("WEB_CONCURRENCY", "1") or 1))
+        if os.getenv("INFERENCE_EXECUTOR", "inprocess").lower() == "process":
+            processes *= max(1, int(os.getenv("INFERENCE_WORKERS", "2")))
+        per_process = max(1, math.floor(cpu_limit) // processes)
+        large = int(os.getenv("INFERENCE_THREADS") or 0) or per_process
+        return cls(
+            cpu_limit=cpu_limit,
+            source=source,
+            processes=processes,
+            threads_per_process=per_process,
+            small_batch_threads=1,
+            large_batch_threads=large,
+            large_batch_rows=int(os.getenv("INFERENCE_LARGE_BATCH_ROWS", "512")),
+        )
+
+    def configure(self, model: Any) -> Any:
+        """Apply the budget to a ServingModel or PipelineScorer; returns the model."""
+        if hasattr(model, "set_threads"):
+            model.set_threads(self.small_batch_threads, self.large_batch_threads, self.large_batch_rows)
+        return model
+
+    def apply_process_limits(self) -> None:
+        """Cap BLAS at one thread and export the per-process budget to OpenMP/BLAS env vars.
+
+        The env vars only reach libraries that are loaded later, such as spawned
+        inference workers, and values the operator has set are kept.
+        """
+        for var in THREAD_ENV_VARS:
+            os.environ.setdefault(var, str(self.threads_per_process))
+        try:
+            from threadpoolctl import threadpool_limits
+        except ImportError:
+            return
+        # serving's numpy work is per-request and tiny: never fan it out
+        threadpool_limits(limits=1, user_api="blas")
+
+    def publish(self) -> None:
+        THREAD_CONFIG.labels(**{k: str(v) for k, v in asdict(self).items()}).set(1)
+        THREAD_COUNTS.labels("small").set(self.small_batch_threads)
+        THREAD_COUNTS.labels("large").set(self.large_batch_threads)
+        CPU_LIMIT.set(self.cpu_limit)
+
+
+@lru_cache(maxsize=1)
+def thread_budget() -> ThreadBudget:
+    """The process-wide budget, applied and published on first use."""
+    budget = ThreadBudget.from_env()
+    budget.apply_process_limits()
+    budget.publish()
+    logger.info(
+        "CPU limit %.2f (%s) over %d serving processes: %d thread(s) below %d rows, %d from there",
+        budget.cpu_limit, budget.source, budget.processes, budget.small_batch_threads,
+        budget.large_batch_rows, budget.large_batch_threads,
+    )
+    return budget
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+def sigmoid(x: np.ndarray) -> np.ndarray:
+    return 1 / (1 + np.exp(-x))
+
+
+def generate_churn(n: int, rng: np.random.Generator) -> pd.DataFrame:
+    """Synthetic churn rows with the columns of CHURN_SPEC (see scripts/make_dataset.py)."""
+    contract = rng.choice(["month-to-month", "one-year", "two-year"], size=n, p=[0.55, 0.25, 0.20])
+    payment = rng.choice(["credit_card", "bank_transfer", "paypal", "cash"], size=n, p=[0.35, 0.30, 0.25, 0.10])
+    internet = rng.choice(["fiber", "dsl", "none"], size=n, p=[0.55, 0.35, 0.10])
+    region = rng.choice(["NE", "SE", "MW", "SW", "W"], size=n)
+
+    tenure = rng.integers(0, 72, size=n).astype(float)
+    monthly = rng.normal(75, 25, size=n).clip(10, 200)
+    tickets = rng.poisson(1.2, size=n).clip(0, 15).astype(float)
+    total = (monthly * tenure + rng.normal(0, 100, size=n)).clip(0)
+
+    logit = (
+        -0.02 * tenure
+        + 0.10 * tickets
+        + 0.008 * (monthly - 70)
+        + 0.6 * (contract == "month-to-month").astype(float)
+        + 0.25 * (internet == "fiber").astype(float)
+        + 0.5 * (payment == "cash").astype(float)
+    )
+    p = sigmoid(logit)
+    churn = rng.binomial(1, p, size=n)
+
+    return pd.DataFrame(
+        {
+            "tenure_months": tenure,
+            "monthly_charges": monthly,
+            "total_charges": total,
+            "tickets_90d": tickets,
+            "contract_type": contract,
+            "payment_method": payment,
+            "internet_service": internet,
+            "region": region,
+            "churn": churn,
+        }
+    )
+
+
+def chunk_rng(seed: int, chunk_idx: int) -> np.random.Generator:
+    """Independent stream per chunk (SeedSequence spawned from [seed, chunk_idx])."""
+    return np.random.default_rng([seed, chunk_idx])
+
+
+def write_chunk(out_dir: str | Path, chunk_idx: int, n_rows: int, seed: int) -> Path:
+    """Generate chunk `chunk_idx` and write it to part-<chunk_idx>.parquet (atomically)."""
+    df = generate_churn(n_rows, chunk_rng(seed, chunk_idx))
+    path = Path(out_dir) / f"part-{chunk_idx:05d}.parquet"
+    tmp = path.with_suffix(".parquet.tmp")
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), tmp, compression="zstd")
+    tmp.replace(path)
+    return path
+
+
+def generate_parquet(
+    out_dir: str | Path, n_rows: int, chunk_rows: int = 1_000_000, seed: int = 42, workers: int = 0
+) -> list[Path]:
+    """Write `n_rows` as ceil(n_rows / chunk_rows) parquet parts using `workers` processes.
+
+    Chunk i always holds the same rows for a given (seed, chunk_rows), whatever the
+    worker count, and each worker holds one chunk in memory at a time.
+    """
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    for stale in [*out.glob("part-*.parquet"), *out.glob("part-*.parquet.tmp")]:
+        stale.unlink()
+
+    sizes = [min(chunk_rows, n_rows - start) for start in range(0, n_rows, chunk_rows)]
+    if not sizes:
+        return []
+    workers = workers if workers > 0 else (os.cpu_count() or 1)
+    if workers == 1 or len(sizes) == 1:
+        return [write_chunk(out, i, n, seed) for i, n in enumerate(sizes)]
+    with ProcessPoolExecutor(max_workers=min(workers, len(sizes))) as ex:
+        return list(ex.map(write_chunk, repeat(out), range(len(sizes)), sizes, repeat(seed)))
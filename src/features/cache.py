@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Optional
+
+import joblib
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+import sklearn
+
+from src.features.preprocess import EncodedSplit, encode_split
+from src.modeling.schema import FeatureSpec
+
+logger = logging.getLogger(__name__)
+
+_MATRICES = ("X_train", "X_val")
+_VECTORS = ("y_train", "y_val")
+# content hashes of input files, memoized by (size, mtime) so a cache hit does not reread the data
+_HASHES_FILE = "content_hashes.json"
+# a .tmp-* dir older than this was left by a store() that died; newer ones may still be written
+_ORPHAN_TMP_SECONDS = 3600.0
+
+
+def file_sha256(path: str | Path, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _dir_bytes(path: Path) -> int:
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+
+def _save_matrix(entry: Path, name: str, X: Any) -> dict[str, Any]:
+    # CSR is stored as its three component arrays so every piece can be np.load(mmap_mode="r")-ed
+    if sp.issparse(X):
+        X = sp.csr_matrix(X)
+        for part in ("data", "indices", "indptr"):
+            np.save(entry / f"{name}.{part}.npy", getattr(X, part))
+        return {"format": "csr", "shape": list(X.shape)}
+    np.save(entry / f"{name}.npy", np.ascontiguousarray(X))
+    return {"format": "dense", "shape": list(X.shape)}
+
+
+def _load_matrix(entry: Path, name: str, info: dict[str, Any]) -> Any:
+    if info["format"] == "csr":
+        parts = [np.load(entry / f"{name}.{p}.npy", mmap_mode="r") for p in ("data", "indices", "indptr")]
+        return sp.csr_matrix(tuple(parts), shape=tuple(info["shape"]), copy=False)
+    return np.load(entry / f"{name}.npy", mmap_mode="r")
+
+
+class FeatureMatrixCache:
+    """On-disk cache of `EncodedSplit`s keyed by input data + FeatureSpec + split params.
+
+    Each entry is a directory of `.npy` files (memory-mapped on load) plus the
+    joblib-pickled fitted preprocessor. Entries are evicted least-recently-used
+    once the cache exceeds `max_bytes`.
+    """
+
+    def __init__(self, root: str | Path, max_bytes: int = 2 * 1024**3):
+        self.root = Path(root)
+        self.max_bytes = int(max_bytes)
+
+    def content_hash(self, data_path: str | Path) -> str:
+        """sha256 of `data_path`, recomputed only when its size or mtime has changed."""
+        path = Path(data_path).resolve()
+        st = path.stat()
+        stamp = [st.st_size, st.st_mtime_ns]
+        memo_path = self.root / _HASHES_FILE
+        try:
+            memo = json.loads(memo_path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            memo = {}
+        hit = memo.get(str(path))
+        if hit is not None and hit["stat"] == stamp:
+            return hit["sha256"]
+
+        digest = file_sha256(path)
+        memo[str(path)] = {"stat": stamp, "sha256": digest}
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = memo_path.with_name(f"{_HASHES_FILE}.{uuid.uuid4().hex[:8]}")
+        tmp.write_text(json.dumps(memo), encoding="utf-8")
+        os.replace(tmp, memo_path)
+        return digest
+
+    def key(self, data_path: str | Path, spec: FeatureSpec, seed: int = 42, test_size: float = 0.2) -> str:
+        h = hashlib.sha256()
+        h.update(self.content_hash(data_path).encode())
+        h.update(
+            json.dumps(
+                {
+                    "numeric": list(spec.numeric),
+                    "categorical": list(spec.categorical),
+                    "target": spec.target,
+                    "seed": seed,
+                    "test_size": test_size,
+                    "sklearn": sklearn.__version__,
+                },
+                sort_keys=True,
+            ).encode()
+        )
+        return h.hexdigest()[:32]
+
+    def load(self, key: str) -> Optional[EncodedSplit]:
+        entry = self.root / key
+        meta_path = entry / "meta.json"
+        if not meta_path.exists():
+            return None
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        split = EncodedSplit(
+            preprocessor=joblib.load(entry / "preprocessor.joblib"),
+            **{name: _load_matrix(entry, name, meta[name]) for name in _MATRICES},
+            **{name: np.load(entry / f"{name}.npy", mmap_mode="r") for name in _VECTORS},
+        )
+        os.utime(meta_path)  # LRU recency
+        return split
+
+    def store(self, key: str, split: EncodedSplit) -> Path:
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.root / f".tmp-{key}-{uuid.uuid4().hex[:8]}"
+        tmp.mkdir()
+        meta: dict[str, Any] = {"created_at": time.time()}
+        for name in _MATRICES:
+            meta[name] = _save_matrix(tmp, name, getattr(split, name))
+        for name in _VECTORS:
+            np.save(tmp / f"{name}.npy", np.asarray(getattr(split, name)))
+        joblib.dump(split.preprocessor, tmp / "preprocessor.joblib")
+        (tmp / "meta.json").write_text(json.dumps(meta), encoding="utf-8")
+
+        entry = self.root / key
+        try:
+            tmp.rename(entry)
+        except OSError:
+            # another process stored the same key first
+            shutil.rmtree(tmp, ignore_errors=True)
+        self.evict()
+        return entry
+
+    def evict(self) -> list[str]:
+        if not self.root.exists():
+            return []
+        for tmp in self.root.glob(".tmp-*"):
+            try:
+                stale = time.time() - tmp.stat().st_mtime > _ORPHAN_TMP_SECONDS
+            except FileNotFoundError:  # renamed or removed meanwhile
+                continue
+            if stale:
+                shutil.rmtree(tmp, ignore_errors=True)
+                logger.info("feature cache: removed orphaned %s", tmp.name)
+        entries = [p for p in self.root.iterdir() if (p / "meta.json").exists()]
+        entries.sort(key=lambda p: (p / "meta.json").stat().st_mtime, reverse=True)
+
+        evicted: list[str] = []
+        total = 0
+        for i, p in enumerate(entries):
+            total += _dir_bytes(p)
+            # always keep the most recent entry, even if it alone exceeds the budget
+            if total > self.max_bytes and i > 0:
+                shutil.rmtree(p, ignore_errors=True)
+                evicted.append(p.name)
+        if evicted:
+            logger.info("feature cache: evicted %d entries (budget %d bytes)", len(evicted), self.max_bytes)
+        return evicted
+
+    def get_or_encode(
+        self,
+        data_path: str | Path,
+        spec: FeatureSpec,
+        seed: int = 42,
+        test_size: float = 0.2,
+        df: Optional[pd.DataFrame] = None,
+    ) -> EncodedSplit:
+        t0 = time.perf_counter()
+        key = self.key(data_path, spec, seed=seed, test_size=test_size)
+        split = self.load(key)
+        if split is not None:
+            logger.info("feature cache HIT %s (%s) in %.1f ms", key, data_path, (time.perf_counter() - t0) * 1e3)
+            return split
+
+        if df is None:
+            df = pd.read_parquet(data_path)
+        split = encode_split(df, spec, seed=seed, test_size=test_size)
+        self.store(key, split)
+        logger.info("feature cache MISS %s (%s): encoded in %.1f s", key, data_path, time.perf_counter() - t0)
+        return split
+
+
+def add_cache_args(ap: argparse.ArgumentParser) -> None:
+    """The --feature-cache / --feature-cache-max-gb options shared by the training scripts."""
+    ap.add_argument("--feature-cache", default=".cache/features", help="Encoded feature-matrix cache dir ('' disables)")
+    ap.add_argument("--feature-cache-max-gb", type=float, default=2.0)
+
+
+def cache_from_args(args: Any) -> Optional[FeatureMatrixCache]:
+    """The cache configured by `add_cache_args` options (or a config with the same fields); None if disabled."""
+    if not args.feature_cache:
+        return None
+    return FeatureMatrixCache(args.feature_cache, max_bytes=int(args.feature_cache_max_gb * 1024**3))
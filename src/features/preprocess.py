@@ -1,16 +1,27 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import numpy as np
 import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
 from sklearn.compose import ColumnTransformer
+from sklearn.model_selection import train_test_split
 from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import OneHotEncoder, StandardScaler
 
 from src.modeling.schema import FeatureSpec
+from src.utils.profiling import StageTimer
+
+_HASH_BUCKETS = 10_000
 
 
-def build_preprocessor(spec: FeatureSpec) -> ColumnTransformer:
+def build_preprocessor(spec: FeatureSpec, categories: Any = "auto") -> ColumnTransformer:
+    """`categories` is forwarded to OneHotEncoder (one list per categorical column)
+    when the vocabulary is known up front, e.g. from a streaming pass."""
     numeric_pipe = Pipeline([("scaler", StandardScaler())])
-    cat_pipe = Pipeline([("onehot", OneHotEncoder(handle_unknown="ignore"))])
+    cat_pipe = Pipeline([("onehot", OneHotEncoder(categories=categories, handle_unknown="ignore"))])
 
     return ColumnTransformer(
         transformers=[
@@ -22,7 +33,97 @@ def build_preprocessor(spec: FeatureSpec) -> ColumnTransformer:
     )
 
 
+class CategoricalCaster(BaseEstimator, TransformerMixin):
+    """Pass-through encoder for tree models with native categorical support.
+
+    Numeric columns are cast to float64 (no scaling: trees are invariant to it) and
+    categorical columns to pandas `category` with the vocabulary seen in `fit`, so
+    train and serve produce identical category codes. Unseen values become NaN,
+    which XGBoost routes down the missing-value branch.
+    """
+
+    def __init__(self, numeric: list[str], categorical: list[str]):
+        self.numeric = numeric
+        self.categorical = categorical
+
+    def fit(self, X: pd.DataFrame, y: Any = None) -> CategoricalCaster:
+        self.categories_ = {
+            c: sorted(pd.Series(X[c]).dropna().astype(str).unique().tolist()) for c in self.categorical
+        }
+        return self
+
+    def transform(self, X: pd.DataFrame) -> pd.DataFrame:
+        out = pd.DataFrame(index=X.index)
+        for c in self.numeric:
+            out[c] = X[c].astype("float64")
+        for c in self.categorical:
+            vals = X[c].astype("object")
+            vals = vals.where(vals.isna(), vals.astype(str))
+            # unseen values are masked first: casting them to the dtype is deprecated in pandas
+            vals = vals.where(vals.isin(self.categories_[c]))
+            out[c] = vals.astype(pd.CategoricalDtype(self.categories_[c]))
+        return out
+
+    def get_feature_names_out(self, input_features: Any = None) -> np.ndarray:
+        return np.asarray(list(self.numeric) + list(self.categorical), dtype=object)
+
+
+def build_native_preprocessor(spec: FeatureSpec) -> CategoricalCaster:
+    return CategoricalCaster(list(spec.numeric), list(spec.categorical))
+
+
 def split_xy(df: pd.DataFrame, spec: FeatureSpec) -> tuple[pd.DataFrame, pd.Series]:
     X = df[list(spec.numeric) + list(spec.categorical)].copy()
     y = df[spec.target].astype(int).copy()
     return X, y
+
+
+def hash_split_mask(df: pd.DataFrame, val_fraction: float, seed: int = 42) -> np.ndarray:
+    """True for validation rows. Depends only on row content (and seed), so the split is
+    identical across passes, batch sizes and file layouts without any global shuffle."""
+    h = pd.util.hash_pandas_object(df, index=False, hash_key=f"{seed:016d}"[:16]).to_numpy()
+    return (h % _HASH_BUCKETS) < int(val_fraction * _HASH_BUCKETS)
+
+
+@dataclass(frozen=True)
+class EncodedSplit:
+    """Fitted preprocessor plus the encoded train/validation matrices it produced.
+
+    X_* are whatever the preprocessor emits: dense ndarray or scipy CSR for the one-hot
+    ColumnTransformer, a category-dtype DataFrame for `CategoricalCaster`.
+    """
+
+    preprocessor: Any
+    X_train: Any
+    X_val: Any
+    y_train: np.ndarray
+    y_val: np.ndarray
+
+
+def encode_split(
+    df: pd.DataFrame,
+    spec: FeatureSpec,
+    seed: int = 42,
+    test_size: float = 0.2,
+    native: bool = False,
+    timer: Optional[StageTimer] = None,
+) -> EncodedSplit:
+    """Stratified split + preprocessor fit. `native=True` yields category-dtype frames
+    (see `CategoricalCaster`) instead of one-hot/scaled matrices."""
+    timer = timer or StageTimer(enabled=False)
+    with timer.stage("split"):
+        X, y = split_xy(df, spec)
+        X_train, X_val, y_train, y_val = train_test_split(
+            X, y, test_size=test_size, random_state=seed, stratify=y
+        )
+    with timer.stage("preprocess_fit"):
+        pre = build_native_preprocessor(spec) if native else build_preprocessor(spec)
+        X_train_enc = pre.fit_transform(X_train)
+        X_val_enc = pre.transform(X_val)
+    return EncodedSplit(
+        preprocessor=pre,
+        X_train=X_train_enc,
+        X_val=X_val_enc,
+        y_train=y_train.to_numpy(),
+        y_val=y_val.to_numpy(),
+    )
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import time
+from pathlib import Path
+from typing import Any, Iterator
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+
+from src.features.preprocess import hash_split_mask
+from src.modeling.schema import FeatureSpec
+from src.utils.profiling import peak_rss_mb
+
+UNKNOWN = "unknown"
+
+
+def output_schema(spec: FeatureSpec) -> pa.Schema:
+    return pa.schema(
+        [pa.field(c, pa.float64()) for c in spec.numeric]
+        + [pa.field(c, pa.dictionary(pa.int32(), pa.string())) for c in spec.categorical]
+        + [pa.field(spec.target, pa.int64())]
+    )
+
+
+def open_batches(path: str | Path, columns: list[str], batch_rows: int) -> Iterator[pa.RecordBatch]:
+    """Record batches from a CSV file or a parquet file/directory, in file order.
+
+    Readers are synchronous on purpose: pyarrow.dataset scanners prefetch ahead of a
+    slow consumer, which makes memory grow with the number of input files.
+    """
+    p = Path(path)
+    if p.suffix == ".csv":
+        reader = pacsv.open_csv(
+            p,
+            read_options=pacsv.ReadOptions(block_size=1 << 24),
+            convert_options=pacsv.ConvertOptions(include_columns=columns, strings_can_be_null=True),
+        )
+        for block in reader:
+            for start in range(0, block.num_rows, batch_rows):
+                yield block.slice(start, batch_rows)
+        return
+    files = [p] if p.is_file() else sorted(p.rglob("*.parquet"))
+    for f in files:
+        yield from pq.ParquetFile(f).iter_batches(batch_size=batch_rows, columns=columns)
+
+
+def clean_batch(batch: pa.RecordBatch, spec: FeatureSpec, schema: pa.Schema) -> tuple[pa.RecordBatch, dict[str, int]]:
+    """Cast to `schema`; null categoricals become "unknown" (real nulls, not the string "nan")."""
+    arrays: list[pa.Array] = []
+    filled: dict[str, int] = {}
+    for field in schema:
+        col = batch.column(field.name)
+        if field.name in spec.categorical:
+            col = pc.cast(col, pa.string())
+            filled[field.name] = col.null_count
+            col = pc.fill_null(col, UNKNOWN).dictionary_encode()
+            col = col.cast(field.type)
+        else:
+            col = pc.cast(col, field.type)
+        arrays.append(col)
+    return pa.RecordBatch.from_arrays(arrays, schema=schema), filled
+
+
+class _RowGroupWriter:
+    """Buffers batches and writes one parquet row group per `row_group_rows` rows."""
+
+    def __init__(self, path: Path, schema: pa.Schema, row_group_rows: int):
+        self.path = path
+        self.tmp = path.with_suffix(path.suffix + ".tmp")
+        self.writer = pq.ParquetWriter(self.tmp, schema, compression="zstd")
+        self.row_group_rows = row_group_rows
+        self.buf: list[pa.RecordBatch] = []
+        self.buffered = 0
+        self.rows = 0
+        self.row_groups = 0
+
+    def write(self, batch: pa.RecordBatch) -> None:
+        if batch.num_rows:
+            self.buf.append(batch)
+            self.buffered += batch.num_rows
+        if self.buffered >= self.row_group_rows:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.buf:
+            return
+        table = pa.Table.from_batches(self.buf).unify_dictionaries().combine_chunks()
+        self.writer.write_table(table, row_group_size=max(table.num_rows, 1))
+        self.rows += table.num_rows
+        self.row_groups += 1
+        self.buf, self.buffered = [], 0
+
+    def close(self) -> None:
+        """Write the last row group and publish the file under its final name."""
+        self.flush()
+        self.writer.close()
+        self.tmp.replace(self.path)
+
+    def abort(self) -> None:
+        """Drop the partial file; a previous `path` (if any) is left untouched."""
+        self.writer.close()
+        self.tmp.unlink(missing_ok=True)
+
+
+def preprocess_stream(
+    inp: str | Path,
+    out_dir: str | Path,
+    spec: FeatureSpec,
+    val_fraction: float = 0.2,
+    seed: int = 42,
+    batch_rows: int = 256_000,
+    row_group_rows: int = 1_000_000,
+) -> dict[str, Any]:
+    """Clean and split `inp` into out_dir/train.parquet and val.parquet batch by batch.
+
+    Rows go to val via `hash_split_mask` (content hash), so the split does not depend
+    on row order, batch size or worker layout. Memory is bounded by one input batch
+    plus up to `row_group_rows` buffered rows per output file.
+    """
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    schema = output_schema(spec)
+    columns = [f.name for f in schema]
+
+    t0 = time.perf_counter()
+    train = _RowGroupWriter(out / "train.parquet", schema, row_group_rows)
+    val = _RowGroupWriter(out / "val.parquet", schema, row_group_rows)
+    nulls_filled = {c: 0 for c in spec.categorical}
+    rows_in = 0
+    bytes_in = 0
+    try:
+        for raw in open_batches(inp, columns, batch_rows):
+            batch, filled = clean_batch(raw, spec, schema)
+            for c, n in filled.items():
+                nulls_filled[c] += n
+            rows_in += batch.num_rows
+            bytes_in += raw.nbytes
+
+            is_val = hash_split_mask(batch.to_pandas(), val_fraction, seed)
+            val.write(batch.filter(pa.array(is_val)))
+            train.write(batch.filter(pa.array(np.logical_not(is_val))))
+    except BaseException:
+        train.abort()
+        val.abort()
+        raise
+    train.close()
+    val.close()
+    seconds = time.perf_counter() - t0
+
+    return {
+        "rows_in": rows_in,
+        "rows_train": train.rows,
+        "rows_val": val.rows,
+        "row_groups_train": train.row_groups,
+        "row_groups_val": val.row_groups,
+        "nulls_filled": nulls_filled,
+        "seconds": seconds,
+        "rows_per_second": rows_in / max(seconds, 1e-9),
+        "mb_per_second": bytes_in / 1024**2 / max(seconds, 1e-9),
+        "peak_rss_mb": peak_rss_mb(),
+    }
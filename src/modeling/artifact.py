@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Mapping, Optional, Sequence
+
+import numpy as np
+import xgboost as xgb
+
+from src.modeling.schema import FeatureSpec
+
+FORMAT_VERSION = 1
+BOOSTER_FILE = "model.ubj"
+ENCODER_FILE = "encoder.f64"
+MANIFEST_FILE = "manifest.json"
+
+
+def _sha256(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def _encoder_params(pre: Any) -> tuple[str, dict[str, np.ndarray], dict[str, list[str]], bool]:
+    """(mode, numeric arrays, category vocabularies, sparse_input) from a fitted preprocessor.
+
+    Reads fitted attributes only (duck-typed) so this module never imports sklearn.
+    """
+    if hasattr(pre, "categories_") and isinstance(pre.categories_, dict):  # CategoricalCaster
+        return "native", {}, {c: [str(v) for v in pre.categories_[c]] for c in pre.categorical}, False
+
+    num = pre.named_transformers_["num"].named_steps["scaler"]
+    onehot = pre.named_transformers_["cat"].named_steps["onehot"]
+    cat_cols = next(cols for name, _, cols in pre.transformers_ if name == "cat")
+    arrays = {"mean": np.asarray(num.mean_, dtype=np.float64), "scale": np.asarray(num.scale_, dtype=np.float64)}
+    vocab = {c: [str(v) for v in cats] for c, cats in zip(cat_cols, onehot.categories_, strict=True)}
+    return "onehot", arrays, vocab, bool(getattr(pre, "sparse_output_", False))
+
+
+def export_serving_artifact(pipe: Any, spec: FeatureSpec, out_dir: str | Path) -> Path:
+    """Write the booster (UBJ), encoder parameters and a manifest to `out_dir`.
+
+    encoder.f64 is one flat little-endian float64 array (scaler means then scales),
+    memory-mapped on load; its offsets, the category vocabularies, the FeatureSpec and
+    a sha256 of every file are recorded in manifest.json.
+    """
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    mode, arrays, vocab, sparse_input = _encoder_params(pipe.named_steps["preprocess"])
+
+    booster = pipe.named_steps["model"].get_booster()
+    (out / BOOSTER_FILE).write_bytes(bytes(booster.save_raw("ubj")))
+
+    layout: dict[str, list[int]] = {}
+    offset = 0
+    for name, arr in arrays.items():
+        layout[name] = [offset, int(arr.size)]
+        offset += int(arr.size)
+    flat = np.concatenate(list(arrays.values())) if arrays else np.zeros(0)
+    flat.astype("<f8").tofile(out / ENCODER_FILE)
+
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "mode": mode,
+        "spec": {"numeric": list(spec.numeric), "categorical": list(spec.categorical), "target": spec.target},
+        "categories": {c: vocab[c] for c in spec.categorical},
+        "encoder_layout": layout,
+        "sparse_input": sparse_input,
+        "xgboost_version": xgb.__version__,
+        "sha256": {f: _sha256(out / f) for f in (BOOSTER_FILE, ENCODER_FILE)},
+    }
+    (out / MANIFEST_FILE).write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return out
+
+
+class ArtifactChecksumError(ValueError):
+    pass
+
+
+class ServingModel:
+    """Churn scorer loaded from `export_serving_artifact` output; needs only numpy + xgboost.
+
+    Reproduces the training preprocessor exactly: standard scaling and one-hot with
+    unknown categories ignored (onehot mode), or category codes with unseen values
+    treated as missing (native mode).
+    """
+
+    def __init__(self, path: str | Path, verify: bool = True, nthread: int = 0):
+        self.path = Path(path)
+        self.manifest = json.loads((self.path / MANIFEST_FILE).read_text(encoding="utf-8"))
+        if verify:
+            for f, digest in self.manifest["sha256"].items():
+                if _sha256(self.path / f) != digest:
+                    raise ArtifactChecksumError(f"checksum mismatch for {self.path / f}")
+
+        spec = self.manifest["spec"]
+        self.spec = FeatureSpec(numeric=spec["numeric"], categorical=spec["categorical"], target=spec["target"])
+        self.mode: str = self.manifest["mode"]
+        self._sparse_input = bool(self.manifest.get("sparse_input", False))
+        self._index = {c: {v: i for i, v in enumerate(vals)} for c, vals in self.manifest["categories"].items()}
+
+        enc = np.memmap(self.path / ENCODER_FILE, dtype="<f8", mode="r") if (self.path / ENCODER_FILE).stat().st_size else None
+        self._arrays = {name: enc[o : o + n] for name, (o, n) in self.manifest["encoder_layout"].items()} if enc is not None else {}
+
+        self.booster = xgb.Booster(model_file=str(self.path / BOOSTER_FILE))
+        self._large: Optional[tuple[int, xgb.Booster]] = None  # (min rows, booster)
+        if nthread:
+            self.booster.set_param({"nthread": nthread})
+
+    def set_threads(self, small: int, large: int = 0, large_batch_rows: int = 0) -> None:
+        """Score with `small` threads, or with `large` from `large_batch_rows` rows up.
+
+        Large batches use a second copy of the booster, so concurrent calls never flip
+        a shared `nthread` param.
+        """
+        self.booster.set_param({"nthread": small})
+        self._large = None
+        if large and large != small and large_batch_rows > 0:
+            big = self.booster.copy()
+            big.set_param({"nthread": large})
+            self._large = (large_batch_rows, big)
+
+    def booster_for(self, n_rows: int) -> xgb.Booster:
+        if self._large is not None and n_rows >= self._large[0]:
+            return self._large[1]
+        return self.booster
+
+    @property
+    def n_features(self) -> int:
+        if self.mode == "native":
+            return len(self.spec.numeric) + len(self.spec.categorical)
+        return len(self.spec.numeric) + sum(len(v) for v in self._index.values())
+
+    def encode(self, rows: Sequence[Mapping[str, Any]]) -> np.ndarray:
+        n = len(rows)
+        X = np.zeros((n, self.n_features), dtype=np.float32)
+        num = np.array([[float(r[c]) for c in self.spec.numeric] for r in rows], dtype=np.float64).reshape(n, -1)
+        k = len(self.spec.numeric)
+        if self.mode == "native":
+            X[:, :k] = num
+            for j, c in enumerate(self.spec.categorical):
+                idx = self._index[c]
+                X[:, k + j] = [idx.get(str(r[c]), np.nan) for r in rows]
+            return X
+
+        X[:, :k] = (num - self._arrays["mean"]) / self._arrays["scale"]
+        col = k
+        for c in self.spec.categorical:
+            idx = self._index[c]
+            for i, r in enumerate(rows):
+                hit = idx.get(str(r[c]))
+                if hit is not None:
+                    X[i, col + hit] = 1.0
+            col += len(idx)
+        if self._sparse_input:
+            # trained on CSR: absent entries were "missing" to XGBoost, not 0.0
+            X[X == 0.0] = np.nan
+        return X
+
+    def predict_proba(self, rows: Sequence[Mapping[str, Any]] | Any) -> np.ndarray:
+        """P(churn) per row; `rows` is a list of dicts or a DataFrame."""
+        if hasattr(rows, "to_dict"):
+            rows = rows.to_dict(orient="records")
+        return self.predict_encoded(self.encode(rows))
+
+    def predict_encoded(self, X: np.ndarray) -> np.ndarray:
+        """P(churn) per row of an `encode` output."""
+        booster = self.booster_for(X.shape[0])
+        if self.mode == "native":
+            feature_types = ["q"] * len(self.spec.numeric) + ["c"] * len(self.spec.categorical)
+            dm = xgb.DMatrix(
+                X,
+                feature_names=list(self.spec.numeric) + list(self.spec.categorical),
+                feature_types=feature_types,
+                enable_categorical=True,
+            )
+            return booster.predict(dm)
+        return booster.inplace_predict(X)
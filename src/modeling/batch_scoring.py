@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import hashlib
+import time
+from pathlib import Path
+from typing import Any, Iterator, Mapping
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from src.modeling.schema import CHURN_SPEC, FeatureSpec
+from src.monitoring.db import replace_customer_scores
+
+
+def feature_hash(row: Mapping[str, Any], spec: FeatureSpec = CHURN_SPEC) -> str:
+    """Stable 16-hex digest of one customer's model features (numerics as float repr)."""
+    parts = [repr(float(row[c])) for c in spec.numeric] + [str(row[c]) for c in spec.categorical]
+    return hashlib.blake2b("\x1f".join(parts).encode(), digest_size=8).hexdigest()
+
+
+def feature_hashes(df: pd.DataFrame, spec: FeatureSpec = CHURN_SPEC) -> list[str]:
+    """`feature_hash` for every row of `df` (same digests as the per-row function)."""
+    cols = [df[c].astype(float).map(repr) for c in spec.numeric] + [df[c].astype(str) for c in spec.categorical]
+    joined = cols[0].str.cat(cols[1:], sep="\x1f")
+    return [hashlib.blake2b(s.encode(), digest_size=8).hexdigest() for s in joined]
+
+
+def iter_customer_batches(path: str | Path, id_col: str, batch_rows: int, spec: FeatureSpec = CHURN_SPEC) -> Iterator[pd.DataFrame]:
+    """Customer id + feature columns in batches of `batch_rows` from a parquet file/dir or CSV."""
+    path = Path(path)
+    cols = [id_col, *spec.numeric, *spec.categorical]
+    if path.suffix == ".csv":
+        yield from pd.read_csv(path, usecols=cols, chunksize=batch_rows)
+        return
+    files = sorted(path.glob("*.parquet")) if path.is_dir() else [path]
+    for f in files:
+        for batch in pq.ParquetFile(f).iter_batches(batch_size=batch_rows, columns=cols):
+            yield batch.to_pandas()
+
+
+def score_batch(model: Any, df: pd.DataFrame, id_col: str, model_version: str) -> list[dict[str, Any]]:
+    """customer_scores rows for one batch."""
+    X = df.drop(columns=[id_col])
+    proba = np.asarray(model.predict_proba(X), dtype=float)
+    return [
+        {"customer_id": str(cid), "feature_hash": h, "churn_probability": float(p), "model_version": model_version}
+        for cid, h, p in zip(df[id_col], feature_hashes(X), proba, strict=True)
+    ]
+
+
+def score_customers(
+    model: Any,
+    customers: str | Path,
+    db_url: str,
+    model_version: str,
+    id_col: str = "customer_id",
+    batch_rows: int = 100_000,
+) -> dict[str, Any]:
+    """Score the whole customer table and atomically replace customer_scores with it."""
+    t0 = time.perf_counter()
+    chunks = (score_batch(model, df, id_col, model_version) for df in iter_customer_batches(customers, id_col, batch_rows))
+    n = replace_customer_scores(db_url, chunks)
+    seconds = time.perf_counter() - t0
+    return {"rows": n, "model_version": model_version, "seconds": seconds, "rows_per_s": n / max(seconds, 1e-9)}
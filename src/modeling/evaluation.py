@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Mapping, Optional
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.metrics import average_precision_score, roc_auc_score
+from sklearn.pipeline import Pipeline
+
+
+class EvalCache:
+    """Validation-set probabilities per (model name, model version, validation data hash).
+
+    Registered model versions are immutable, so a cached entry never goes stale; a
+    changed val.parquet simply produces a different key.
+    """
+
+    def __init__(self, root: str | Path = ".cache/eval"):
+        self.root = Path(root)
+
+    def _path(self, model_name: str, version: str, data_hash: str) -> Path:
+        return self.root / f"{model_name}-v{version}-{data_hash[:16]}.npy"
+
+    def get(self, model_name: str, version: str, data_hash: str) -> Optional[np.ndarray]:
+        p = self._path(model_name, version, data_hash)
+        return np.load(p) if p.exists() else None
+
+    def put(self, model_name: str, version: str, data_hash: str, proba: np.ndarray) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        np.save(self._path(model_name, version, data_hash), np.asarray(proba, dtype=np.float64))
+
+
+def score_models(models: Mapping[str, Pipeline], X: pd.DataFrame) -> dict[str, np.ndarray]:
+    """P(churn) for each pipeline, encoding X once per distinct fitted preprocessor.
+
+    Challengers trained from the same feature cache or warm-started from the champion
+    share an identical encoder, so they share one transform.
+    """
+    encoded: dict[str, Any] = {}
+    out: dict[str, np.ndarray] = {}
+    for name, pipe in models.items():
+        pre = pipe.named_steps["preprocess"]
+        fp = joblib.hash(pre)
+        if fp not in encoded:
+            encoded[fp] = pre.transform(X)
+        out[name] = pipe.named_steps["model"].predict_proba(encoded[fp])[:, 1]
+    return out
+
+
+def weighted_auc(scores: np.ndarray, y: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """ROC-AUC of one score vector under each row of `weights` (shape [B, n]).
+
+    Rows are sorted once; ties are grouped so each tie counts 1/2, matching
+    sklearn's roc_auc_score. Cost is O(B * n) after the single sort.
+    """
+    order = np.argsort(scores, kind="mergesort")
+    s, yy, w = scores[order], y[order].astype(bool), weights[:, order]
+    starts = np.flatnonzero(np.r_[True, s[1:] != s[:-1]])
+
+    pos = np.add.reduceat(np.where(yy, w, 0.0), starts, axis=1)
+    neg = np.add.reduceat(np.where(yy, 0.0, w), starts, axis=1)
+    neg_below = np.cumsum(neg, axis=1) - neg
+    num = (pos * (neg_below + 0.5 * neg)).sum(axis=1)
+    den = pos.sum(axis=1) * neg.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return num / den
+
+
+def bootstrap_aucs(
+    y: np.ndarray, probas: Mapping[str, np.ndarray], n_boot: int = 1000, seed: int = 0, chunk: int = 200
+) -> dict[str, np.ndarray]:
+    """Paired bootstrap: every model is scored under the same resamples, so per-resample
+    AUC differences give a valid CI for the delta.
+
+    Resamples are Poisson(1) row weights (the standard large-n approximation of
+    multinomial resampling), which are drawn without a per-row categorical sample.
+    """
+    rng = np.random.default_rng(seed)
+    n = len(y)
+    out: dict[str, list[np.ndarray]] = {k: [] for k in probas}
+    for start in range(0, n_boot, chunk):
+        b = min(chunk, n_boot - start)
+        w = rng.poisson(1.0, size=(b, n)).astype(np.float64)
+        for k, p in probas.items():
+            out[k].append(weighted_auc(np.asarray(p), y, w))
+    return {k: np.concatenate(v) for k, v in out.items()}
+
+
+def compare_to_champion(
+    y: np.ndarray,
+    probas: Mapping[str, np.ndarray],
+    champion: Optional[str] = "champion",
+    n_boot: int = 1000,
+    alpha: float = 0.05,
+    seed: int = 0,
+) -> dict[str, dict[str, Optional[float]]]:
+    """Point metrics for every model plus bootstrap CI of ROC-AUC delta vs `champion`."""
+    y = np.asarray(y).astype(int)
+    single_class = len(np.unique(y)) < 2
+    boots = bootstrap_aucs(y, probas, n_boot=n_boot, seed=seed) if not single_class and n_boot > 0 else {}
+
+    report: dict[str, dict[str, Optional[float]]] = {}
+    for name, p in probas.items():
+        row: dict[str, Optional[float]] = {
+            "roc_auc": float("nan") if single_class else float(roc_auc_score(y, p)),
+            "pr_auc": float("nan") if single_class else float(average_precision_score(y, p)),
+        }
+        if champion is not None and champion in probas and name != champion:
+            row["delta_roc_auc"] = row["roc_auc"] - float(roc_auc_score(y, probas[champion])) if not single_class else None
+            if boots:
+                d = boots[name] - boots[champion]
+                d = d[np.isfinite(d)]
+                row["delta_ci_low"] = float(np.quantile(d, alpha / 2))
+                row["delta_ci_high"] = float(np.quantile(d, 1 - alpha / 2))
+        report[name] = row
+    return report
+
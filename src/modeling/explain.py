@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Mapping, Optional, Sequence
+
+import numpy as np
+import xgboost as xgb
+
+from src.modeling.artifact import ServingModel
+from src.modeling.batch_scoring import feature_hash
+
+
+def feature_groups(model: ServingModel) -> np.ndarray:
+    """(n_encoded_columns, n_features) 0/1 matrix mapping each encoded column to its
+    FeatureSpec feature: numerics map to themselves, every one-hot column of a
+    categorical maps to that categorical."""
+    spec = model.spec
+    k = len(spec.numeric)
+    if model.mode == "native":
+        return np.eye(k + len(spec.categorical))
+    widths = [1] * k + [len(model._index[c]) for c in spec.categorical]
+    owner = np.repeat(np.arange(len(widths)), widths)
+    G = np.zeros((owner.size, len(widths)))
+    G[np.arange(owner.size), owner] = 1.0
+    return G
+
+
+class Explainer:
+    """Per-row reason codes from XGBoost's exact TreeSHAP (`pred_contribs=True`).
+
+    Contributions are in log-odds: for each row, `base_value` plus all feature
+    contributions equals the model margin, and `churn_probability` is its sigmoid.
+    Contributions of one-hot columns are summed back onto their original feature.
+    Aggregated contribution vectors are cached in an LRU keyed by
+    (model_version, feature hash), so only cache misses go through the booster.
+    `workdir`, if given, holds the model's files and is removed by `close()` (or
+    when the explainer is garbage collected).
+    """
+
+    def __init__(
+        self,
+        model: ServingModel,
+        model_version: str = "",
+        cache_size: int = 100_000,
+        workdir: Optional[tempfile.TemporaryDirectory] = None,
+    ):
+        self.model = model
+        self.model_version = model_version
+        self.features = list(model.spec.numeric) + list(model.spec.categorical)
+        self.groups = feature_groups(model)
+        self.cache_size = cache_size
+        self._cache: OrderedDict[tuple[str, str], np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+        self._workdir = workdir
+
+    def close(self) -> None:
+        """Remove the temporary artifact this explainer was built from, if any."""
+        if self._workdir is not None:
+            self._workdir.cleanup()
+            self._workdir = None
+
+    def _dmatrix(self, X: np.ndarray) -> xgb.DMatrix:
+        if self.model.mode == "native":
+            types = ["q"] * len(self.model.spec.numeric) + ["c"] * len(self.model.spec.categorical)
+            return xgb.DMatrix(X, feature_names=self.features, feature_types=types, enable_categorical=True)
+        return xgb.DMatrix(X, missing=np.nan)
+
+    def contributions(self, rows: Sequence[Mapping[str, Any]]) -> np.ndarray:
+        """(n, n_features + 1) log-odds contributions per FeatureSpec feature; last column is the bias."""
+        keys = [(self.model_version, feature_hash(r, self.model.spec)) for r in rows]
+        out = np.empty((len(rows), len(self.features) + 1))
+        todo = []
+        with self._lock:
+            for i, key in enumerate(keys):
+                hit = self._cache.get(key)
+                if hit is None:
+                    todo.append(i)
+                else:
+                    self._cache.move_to_end(key)
+                    out[i] = hit
+            self.hits += len(rows) - len(todo)
+            self.misses += len(todo)
+        if not todo:
+            return out
+
+        X = self.model.encode([rows[i] for i in todo])
+        raw = self.model.booster_for(len(todo)).predict(self._dmatrix(X), pred_contribs=True)
+        agg = np.column_stack([raw[:, :-1] @ self.groups, raw[:, -1]])
+        out[todo] = agg
+        with self._lock:
+            for j, i in enumerate(todo):
+                self._cache[keys[i]] = agg[j]
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return out
+
+    def explain(self, rows: Sequence[Mapping[str, Any]], top_k: int = 3) -> list[dict[str, Any]]:
+        contrib = self.contributions(rows)
+        phi, bias = contrib[:, :-1], contrib[:, -1]
+        proba = 1.0 / (1.0 + np.exp(-(phi.sum(axis=1) + bias)))
+        k = min(top_k, phi.shape[1])
+        top = np.argsort(-np.abs(phi), axis=1, kind="stable")[:, :k]
+        return [
+            {
+                "churn_probability": float(proba[i]),
+                "base_value": float(bias[i]),
+                "top_features": [
+                    {"feature": self.features[j], "value": rows[i][self.features[j]], "contribution": float(phi[i, j])}
+                    for j in top[i]
+                ],
+            }
+            for i in range(len(rows))
+        ]
+
+
+def explainer_for(model: Any, model_version: str = "", cache_size: int = 100_000, spec: Optional[Any] = None) -> Explainer:
+    """Explainer for a `ServingModel`, or for a pickled pipeline via a temporary serving
+    artifact owned (and cleaned up) by the returned explainer."""
+    workdir = None
+    if not isinstance(model, ServingModel):
+        from src.modeling.artifact import export_serving_artifact
+        from src.modeling.schema import CHURN_SPEC
+
+        pipe = getattr(model, "pipe", model)
+        workdir = tempfile.TemporaryDirectory(prefix="explain_")
+        model = ServingModel(export_serving_artifact(pipe, spec or CHURN_SPEC, workdir.name))
+    return Explainer(model, model_version=model_version, cache_size=cache_size, workdir=workdir)
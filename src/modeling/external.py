@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import time
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import xgboost as xgb
+from sklearn.compose import ColumnTransformer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+from xgboost import XGBClassifier
+
+from src.features.preprocess import build_preprocessor, hash_split_mask
+from src.modeling.schema import FeatureSpec
+
+
+def parquet_files(path: str | Path) -> list[Path]:
+    p = Path(path)
+    return [p] if p.is_file() else sorted(p.rglob("*.parquet"))
+
+
+def iter_batches(files: Sequence[Path], columns: Sequence[str], batch_rows: int) -> Iterator[pd.DataFrame]:
+    """Stream record batches (never more than `batch_rows` rows in memory at once)."""
+    for f in files:
+        for batch in pq.ParquetFile(f).iter_batches(batch_size=batch_rows, columns=list(columns)):
+            yield batch.to_pandas()
+
+
+def fit_preprocessor_streaming(
+    files: Sequence[Path], spec: FeatureSpec, batch_rows: int, val_fraction: float, seed: int = 42
+) -> ColumnTransformer:
+    """Fit the standard one-hot preprocessor in one streaming pass over the train rows.
+
+    StandardScaler is fitted with partial_fit and the category vocabulary is collected
+    batch by batch; the result is equivalent to `build_preprocessor(spec).fit(train)`.
+    """
+    cols = list(spec.numeric) + list(spec.categorical) + [spec.target]
+    scaler = StandardScaler()
+    vocab: dict[str, set[str]] = {c: set() for c in spec.categorical}
+    sample: Optional[pd.DataFrame] = None
+
+    for batch in iter_batches(files, cols, batch_rows):
+        train = batch[~hash_split_mask(batch, val_fraction, seed)]
+        if train.empty:
+            continue
+        scaler.partial_fit(train[list(spec.numeric)])
+        for c in spec.categorical:
+            vocab[c].update(train[c].dropna().astype(str).unique())
+        if sample is None:
+            sample = train.head(1000)
+
+    if sample is None:
+        raise ValueError("no training rows found")
+
+    pre = build_preprocessor(spec, categories=[sorted(vocab[c]) for c in spec.categorical])
+    pre.fit(sample)
+    # swap in the scaler that saw every training row
+    pre.named_transformers_["num"].steps[0] = ("scaler", scaler)
+    return pre
+
+
+class ParquetBatchIter(xgb.DataIter):
+    """Feeds encoded parquet row groups to XGBoost's external-memory DMatrix."""
+
+    def __init__(
+        self,
+        files: Sequence[Path],
+        spec: FeatureSpec,
+        pre: ColumnTransformer,
+        batch_rows: int,
+        keep: Callable[[np.ndarray], np.ndarray],
+        val_fraction: float,
+        seed: int,
+        cache_prefix: str,
+    ):
+        self._files = list(files)
+        self._spec = spec
+        self._pre = pre
+        self._batch_rows = batch_rows
+        self._keep = keep
+        self._val_fraction = val_fraction
+        self._seed = seed
+        self._cols = list(spec.numeric) + list(spec.categorical) + [spec.target]
+        self._it: Optional[Iterator[pd.DataFrame]] = None
+        super().__init__(cache_prefix=cache_prefix)
+
+    def reset(self) -> None:
+        self._it = None
+
+    def next(self, input_data: Callable[..., None]) -> int:
+        if self._it is None:
+            self._it = iter_batches(self._files, self._cols, self._batch_rows)
+        for batch in self._it:
+            rows = batch[self._keep(hash_split_mask(batch, self._val_fraction, self._seed))]
+            if rows.empty:
+                continue
+            X = self._pre.transform(rows.drop(columns=[self._spec.target]))
+            input_data(data=X, label=rows[self._spec.target].to_numpy(dtype=np.float32))
+            return 1
+        return 0
+
+
+def classifier_from_booster(booster: xgb.Booster, **params: Any) -> XGBClassifier:
+    """Wrap a low-level Booster in an XGBClassifier so it fits the sklearn Pipeline artifact."""
+    clf = XGBClassifier(**params)
+    clf.load_model(bytearray(booster.save_raw("ubj")))
+    # load_model only restores n_classes_ when sklearn recognises the classifier tags,
+    # which depends on the sklearn/xgboost version pair; this model is always binary
+    if not hasattr(clf, "n_classes_"):
+        clf.n_classes_ = 2
+    return clf
+
+
+def train_external_memory(
+    data: str | Path,
+    spec: FeatureSpec,
+    model_params: dict[str, Any],
+    batch_rows: int = 100_000,
+    val_fraction: float = 0.2,
+    cache_dir: str | Path = ".cache/xgb_extmem",
+    n_jobs: int = -1,
+    seed: int = 42,
+) -> tuple[Pipeline, dict[str, float]]:
+    """Train from a parquet file/dir without loading it into memory.
+
+    Peak memory is bounded by `batch_rows` (one decoded batch + its encoded copy) plus
+    XGBoost's in-memory quantile sketch; pages are spilled under `cache_dir`.
+    """
+    files = parquet_files(data)
+    if not files:
+        raise FileNotFoundError(f"no parquet files under {data}")
+    Path(cache_dir).mkdir(parents=True, exist_ok=True)
+
+    t0 = time.perf_counter()
+    pre = fit_preprocessor_streaming(files, spec, batch_rows, val_fraction, seed)
+    t_pre = time.perf_counter() - t0
+
+    common = dict(spec=spec, pre=pre, batch_rows=batch_rows, val_fraction=val_fraction, seed=seed)
+    train_it = ParquetBatchIter(files, keep=np.logical_not, cache_prefix=str(Path(cache_dir) / "train"), **common)
+    val_it = ParquetBatchIter(files, keep=lambda m: m, cache_prefix=str(Path(cache_dir) / "val"), **common)
+    dtrain = xgb.DMatrix(train_it)
+    dval = xgb.DMatrix(val_it)
+
+    params = dict(model_params)
+    num_round = int(params.pop("n_estimators", 100))
+    params.update(
+        objective="binary:logistic",
+        eval_metric=["logloss", "auc"],
+        tree_method="hist",
+        nthread=n_jobs,
+        seed=seed,
+    )
+
+    evals_result: dict[str, Any] = {}
+    t0 = time.perf_counter()
+    booster = xgb.train(
+        params, dtrain, num_boost_round=num_round, evals=[(dval, "val")], evals_result=evals_result, verbose_eval=False
+    )
+    t_fit = time.perf_counter() - t0
+
+    clf = classifier_from_booster(booster, n_jobs=n_jobs)
+    metrics = {
+        "roc_auc": float(evals_result["val"]["auc"][-1]),
+        "logloss": float(evals_result["val"]["logloss"][-1]),
+        "n_train": float(dtrain.num_row()),
+        "n_val": float(dval.num_row()),
+        "preprocess_seconds": t_pre,
+        "fit_seconds": t_fit,
+    }
+    return Pipeline([("preprocess", pre), ("model", clf)]), metrics
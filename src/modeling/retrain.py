@@ -0,0 +1,282 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Optional, Sequence
+
+import mlflow
+import numpy as np
+import pandas as pd
+import yaml
+from mlflow import MlflowClient
+
+from src.features.cache import cache_from_args, file_sha256
+from src.modeling.evaluation import EvalCache, compare_to_champion, score_models
+from src.modeling.schema import CHURN_SPEC
+from src.modeling.train import continue_training, log_serving_artifact, train_model
+from src.monitoring.archive import FEATURE_COLUMNS, load_predictions
+from src.utils.io import write_json
+
+
+@dataclass
+class RetrainConfig:
+    """Options of scripts/retrain_if_needed.py (same names and defaults as the CLI flags)."""
+
+    processed: str = "data/processed"
+    model_name: str = "xgb_churn"
+    alias: str = "champion"
+    drift_report: str = "reports/drift_live.json"
+    perf_report: str = "reports/monitoring_snapshot.json"
+    drift_threshold: float = 0.25
+    min_roc_auc: float = 0.72
+    promote_delta: float = 0.002
+    mode: str = "full"
+    db: str = ""
+    archive_dir: Optional[str] = None
+    recent_days: float = 30
+    extra_rounds: int = 50
+    baseline_frac: float = 0.1
+    min_new_rows: int = 500
+    feature_cache: str = ".cache/features"
+    feature_cache_max_gb: float = 2.0
+    eval_cache: str = ".cache/eval"
+    challenger_uri: list[str] = field(default_factory=list)
+    n_boot: int = 1000
+    require_ci: bool = False
+    comparison_out: str = "reports/champion_comparison.json"
+
+
+def champion_version(model_name: str, alias: str = "champion") -> Optional[str]:
+    client = MlflowClient()
+    try:
+        rm = client.get_registered_model(model_name)
+        v = rm.aliases.get(alias)
+        return str(v) if v is not None else None
+    except Exception:
+        return None
+
+
+def load_recent_feedback(db_url: str, days: float, archive_dir: Optional[str] = None) -> pd.DataFrame:
+    """Labeled predictions from the last `days`, shaped like train.parquet."""
+    since = datetime.now(timezone.utc) - timedelta(days=days)
+    df = load_predictions(
+        db_url, FEATURE_COLUMNS + ["actual_churn"], since=since, archive_dir=archive_dir, feedback_only=True
+    )
+    return df.rename(columns={"actual_churn": CHURN_SPEC.target}).astype({CHURN_SPEC.target: int})
+
+
+def retrain_triggered(
+    drift: dict[str, Any], perf: dict[str, Any], drift_threshold: float, min_roc_auc: float
+) -> tuple[bool, float, float]:
+    """(should_retrain, worst_psi, live_roc_auc) from a drift report / monitoring snapshot."""
+    worst_psi = (drift.get("worst_psi") or drift.get("drift", {}).get("worst_psi"))  # support both
+    if worst_psi is None:
+        worst_psi = drift.get("psi_numeric", {}) and max(drift["psi_numeric"].values())
+    try:
+        worst_psi = float(worst_psi) if worst_psi is not None else 0.0
+    except Exception:
+        worst_psi = 0.0
+
+    live_roc = perf.get("performance", {}).get("roc_auc")
+    try:
+        live_roc = float(live_roc) if live_roc is not None else float("nan")
+    except Exception:
+        live_roc = float("nan")
+
+    should_retrain = (worst_psi >= drift_threshold) or (not np.isnan(live_roc) and live_roc < min_roc_auc)
+    return should_retrain, worst_psi, live_roc
+
+
+def choose_promotion(
+    comparison: dict[str, dict[str, Optional[float]]],
+    candidates: Sequence[str],
+    has_champion: bool,
+    promote_delta: float,
+    require_ci: bool = False,
+) -> Optional[str]:
+    """The candidate to promote, or None: the highest ROC-AUC among those that beat the
+    champion by `promote_delta`.
+
+    Extra challengers (anything but "new") also need a delta CI lower bound above 0;
+    the new model only with `require_ci`. Without a champion the new model is promoted.
+    """
+    if not has_champion:
+        return "new"
+    best: Optional[str] = None
+    for name in candidates:
+        row = comparison[name]
+        delta, ci_low = row.get("delta_roc_auc"), row.get("delta_ci_low")
+        if delta is None or delta < promote_delta:
+            continue
+        if name == "new" and require_ci and ci_low is not None and ci_low <= 0:
+            print(f"new model: ROC-AUC delta CI lower bound {ci_low:.4f} <= 0; not significant")
+            continue
+        if name != "new" and (ci_low is None or ci_low <= 0):
+            print(f"{name}: ROC-AUC delta CI lower bound {ci_low} not above 0; not promoted")
+            continue
+        if best is None or row["roc_auc"] > comparison[best]["roc_auc"]:
+            best = name
+    return best
+
+
+def _registered_version(client: MlflowClient, model_name: str, uri: str) -> Optional[str]:
+    """Version of `model_name` that `uri` points at (models:/name/N or models:/name@alias), else None."""
+    prefix = f"models:/{model_name}"
+    if uri.startswith(prefix + "/"):
+        return uri[len(prefix) + 1 :]
+    if uri.startswith(prefix + "@"):
+        try:
+            return str(client.get_model_version_by_alias(model_name, uri[len(prefix) + 1 :]).version)
+        except Exception:
+            return None
+    return None
+
+
+def retrain_if_needed(
+    cfg: RetrainConfig, drift: Optional[dict[str, Any]] = None, perf: Optional[dict[str, Any]] = None
+) -> dict[str, Any]:
+    """Retrain (full or incremental) when drift/performance triggers fire, compare with
+    the champion and promote or set the challenger alias.
+
+    `drift`/`perf` default to the JSON reports named in `cfg`; the monitoring flow
+    passes its in-memory snapshot for both.
+    """
+    if drift is None:
+        drift = json.loads(Path(cfg.drift_report).read_text(encoding="utf-8")) if Path(cfg.drift_report).exists() else {}
+    if perf is None:
+        perf = json.loads(Path(cfg.perf_report).read_text(encoding="utf-8")) if Path(cfg.perf_report).exists() else {}
+
+    should_retrain, worst_psi, live_roc = retrain_triggered(drift, perf, cfg.drift_threshold, cfg.min_roc_auc)
+    result: dict[str, Any] = {"triggered": should_retrain, "worst_psi": worst_psi, "live_roc_auc": live_roc}
+    if not should_retrain:
+        print("No retraining triggered.")
+        print(f"worst_psi={worst_psi:.3f}, live_roc_auc={live_roc}")
+        return result
+
+    print("Retraining triggered.")
+    print(f"worst_psi={worst_psi:.3f}, live_roc_auc={live_roc}")
+
+    train_path = Path(cfg.processed) / "train.parquet"
+    val_path = Path(cfg.processed) / "val.parquet"
+    val_df = pd.read_parquet(val_path)
+    X_val = val_df.drop(columns=["churn"])
+    y_val = val_df["churn"].astype(int)
+
+    params = yaml.safe_load(Path("params.yaml").read_text(encoding="utf-8"))
+    model_params = params["model"]
+    threshold = float(params["eval"]["threshold"])
+    encoding = params.get("features", {}).get("encoding", "onehot")
+
+    # The champion is only downloaded when needed: warm start, or no cached validation scores
+    champ_ver = champion_version(cfg.model_name, alias=cfg.alias)
+    champ_uri = f"models:/{cfg.model_name}/{champ_ver}" if champ_ver else None
+    champ = None
+
+    mode = cfg.mode
+    recent = None
+    if mode == "incremental":
+        if champ_uri is None or not cfg.db:
+            print("Incremental retrain needs a champion and --db; falling back to full retrain.")
+            mode = "full"
+        else:
+            recent = load_recent_feedback(cfg.db, cfg.recent_days, archive_dir=cfg.archive_dir)
+            if len(recent) < cfg.min_new_rows:
+                print(f"Only {len(recent)} feedback rows in the last {cfg.recent_days} days; falling back to full retrain.")
+                mode = "full"
+
+    if mode == "incremental":
+        champ = mlflow.sklearn.load_model(champ_uri)
+        parts = [recent]
+        if cfg.baseline_frac > 0:
+            train_df = pd.read_parquet(train_path, columns=list(recent.columns))
+            parts.append(train_df.sample(frac=cfg.baseline_frac, random_state=42)[recent.columns])
+        inc_df = pd.concat(parts, ignore_index=True)
+        print(f"Incremental retrain: {len(recent)} feedback rows + {len(inc_df) - len(recent)} baseline rows, {cfg.extra_rounds} extra rounds")
+        model = continue_training(champ, inc_df, extra_rounds=cfg.extra_rounds)
+        model_params = {**model_params, "mode": "incremental", "extra_rounds": cfg.extra_rounds, "n_new_rows": len(inc_df)}
+    else:
+        cache = cache_from_args(cfg)
+        # the cache stores one-hot matrices only; native mode encodes in place. A hit reads no parquet.
+        encoded = cache.get_or_encode(train_path, CHURN_SPEC) if cache and encoding == "onehot" else None
+        train_df = pd.read_parquet(train_path) if encoded is None else None
+        model, _ = train_model(train_df, model_params=model_params, threshold=threshold, encoded=encoded, encoding=encoding)
+
+    # Score new model, extra challengers and (if not cached) the champion in one pass
+    val_hash = file_sha256(val_path)
+    eval_cache = EvalCache(cfg.eval_cache)
+    to_score = {"new": model}
+    for uri in cfg.challenger_uri:
+        to_score[uri] = mlflow.sklearn.load_model(uri)
+    champ_proba = eval_cache.get(cfg.model_name, champ_ver, val_hash) if champ_ver else None
+    if champ_ver and champ_proba is None:
+        to_score["champion"] = champ if champ is not None else mlflow.sklearn.load_model(champ_uri)
+    probas = score_models(to_score, X_val)
+    if champ_proba is not None:
+        print(f"Champion v{champ_ver} validation scores loaded from eval cache")
+        probas["champion"] = champ_proba
+    elif champ_ver:
+        eval_cache.put(cfg.model_name, champ_ver, val_hash, probas["champion"])
+
+    comparison = compare_to_champion(
+        y_val.to_numpy(), probas, champion="champion" if champ_ver else None, n_boot=cfg.n_boot
+    )
+    write_json(cfg.comparison_out, comparison)
+    new_metrics = {k: comparison["new"][k] for k in ("roc_auc", "pr_auc")}
+    print("New model val metrics:", new_metrics)
+
+    champ_metrics = None
+    if champ_ver:
+        champ_metrics = comparison["champion"]
+        print("Champion val metrics:", champ_metrics)
+        print("Comparison vs champion:", {k: v for k, v in comparison.items() if k != "champion"})
+
+    # Log and register new model
+    mlflow.set_experiment("enterprise_mlops_retrain")
+    with mlflow.start_run():
+        mlflow.log_params(model_params)
+        mlflow.log_metrics({f"val_{k}": v for k, v in new_metrics.items()})
+        mlflow.sklearn.log_model(
+            sk_model=model,
+            artifact_path="model",
+            registered_model_name=cfg.model_name,
+        )
+        log_serving_artifact(model)
+
+    client = MlflowClient()
+    versions = client.search_model_versions(f"name='{cfg.model_name}'")
+    latest = max(versions, key=lambda v: int(v.version))
+    new_version = int(latest.version)
+    eval_cache.put(cfg.model_name, str(new_version), val_hash, probas["new"])
+
+    # Decide promotion: the new model and every --challenger-uri that is a version of this model
+    candidates = {"new": str(new_version)}
+    for uri in cfg.challenger_uri:
+        if champ_ver:
+            row = comparison[uri]
+            print(f"{uri}: roc_auc={row['roc_auc']:.4f} delta={row.get('delta_roc_auc')} CI low={row.get('delta_ci_low')}")
+        version = _registered_version(client, cfg.model_name, uri)
+        if version is None:
+            print(f"{uri} is not a registered version of {cfg.model_name}; compared only")
+        else:
+            candidates[uri] = version
+    winner = choose_promotion(
+        comparison, list(candidates), champ_metrics is not None, cfg.promote_delta, require_ci=cfg.require_ci
+    )
+
+    if winner is not None:
+        client.set_registered_model_alias(cfg.model_name, cfg.alias, candidates[winner])
+        print(f"PROMOTED: {cfg.model_name} version {candidates[winner]} ({winner}) -> alias {cfg.alias}")
+    if winner != "new":
+        client.set_registered_model_alias(cfg.model_name, "challenger", str(new_version))
+        print(f"NOT PROMOTED: set alias challenger to version {new_version}")
+
+    result.update(
+        mode=mode,
+        version=new_version,
+        promoted=winner == "new",
+        promoted_version=int(candidates[winner]) if winner is not None else None,
+        new_metrics=new_metrics,
+    )
+    return result
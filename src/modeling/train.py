@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import tempfile
+import time
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Optional
@@ -8,15 +10,18 @@ import joblib
 import mlflow
 import numpy as np
 import pandas as pd
+import xgboost as xgb
 from mlflow.models import infer_signature
 from sklearn.metrics import average_precision_score, f1_score, precision_score, recall_score, roc_auc_score
-from sklearn.model_selection import train_test_split
 from sklearn.pipeline import Pipeline
 from xgboost import XGBClassifier
 
-from src.features.preprocess import build_preprocessor, split_xy
+from src.features.preprocess import EncodedSplit, encode_split, split_xy
+from src.modeling.artifact import ServingModel, export_serving_artifact
+from src.modeling.external import classifier_from_booster
 from src.modeling.schema import CHURN_SPEC
 from src.utils.io import ensure_dir, write_json
+from src.utils.profiling import StageTimer
 
 
 @dataclass(frozen=True)
@@ -24,32 +29,75 @@ class TrainOutputs:
     metrics: dict[str, float]
     model_path: Path
     meta_path: Path
+    serving_path: Path
 
 
-def train_model(
-    df: pd.DataFrame,
+ENCODINGS = ("onehot", "native")
+
+
+def fit_model(
+    df: Optional[pd.DataFrame],
     model_params: dict[str, Any],
-    threshold: float = 0.5,
     seed: int = 42,
-) -> tuple[Pipeline, TrainOutputs]:
-    X, y = split_xy(df, CHURN_SPEC)
-    X_train, X_val, y_train, y_val = train_test_split(
-        X, y, test_size=0.2, random_state=seed, stratify=y
-    )
+    encoded: Optional[EncodedSplit] = None,
+    encoding: str = "onehot",
+    timer: Optional[StageTimer] = None,
+) -> tuple[Pipeline, EncodedSplit]:
+    """Fit preprocessor + XGBoost on an 80/20 split of `df` (no files written).
+
+    encoding="onehot": scaled numerics + one-hot categoricals (ColumnTransformer).
+    encoding="native": category dtypes passed straight to XGBoost with
+    enable_categorical and tree_method="hist"; the sklearn wrapper then builds a
+    QuantileDMatrix internally, so no one-hot or float copy of the data is made.
+    `df` is only read when `encoded` is None, so it may be None otherwise.
+    """
+    if encoding not in ENCODINGS:
+        raise ValueError(f"encoding must be one of {ENCODINGS}, got {encoding!r}")
+    timer = timer or StageTimer(enabled=False)
+    if encoded is None:
+        encoded = encode_split(df, CHURN_SPEC, seed=seed, native=encoding == "native", timer=timer)
+
+    extra: dict[str, Any] = {}
+    if encoding == "native":
+        extra = {"tree_method": "hist", "enable_categorical": True}
 
-    pre = build_preprocessor(CHURN_SPEC)
     clf = XGBClassifier(
-        **model_params,
+        **{**model_params, **extra},
         objective="binary:logistic",
         eval_metric="logloss",
         n_jobs=-1,
         random_state=seed,
     )
+    with timer.stage("xgb_fit"):
+        clf.fit(encoded.X_train, encoded.y_train)
+
+    # Same fitted steps Pipeline.fit would have produced; kept as one artifact for serving
+    return Pipeline([("preprocess", encoded.preprocessor), ("model", clf)]), encoded
 
-    pipe = Pipeline([("preprocess", pre), ("model", clf)])
-    pipe.fit(X_train, y_train)
 
-    proba = pipe.predict_proba(X_val)[:, 1]
+def train_model(
+    df: Optional[pd.DataFrame],
+    model_params: dict[str, Any],
+    threshold: float = 0.5,
+    seed: int = 42,
+    encoded: Optional[EncodedSplit] = None,
+    encoding: str = "onehot",
+    timer: Optional[StageTimer] = None,
+) -> tuple[Pipeline, TrainOutputs]:
+    """Fit via `fit_model` and write models/model.joblib, model_meta.json, reports/metrics.json
+    and the compact serving artifact in models/serving/ (see `src.modeling.artifact`).
+
+    Pass `encoded` (e.g. from `FeatureMatrixCache.get_or_encode`) to skip the split
+    and preprocessor fit; it must have been produced from the same `df` and `seed`, and `df`
+    may then be None.
+    Pass an enabled `timer` to record the split, preprocess_fit, xgb_fit, val_score
+    save and export_serving stages.
+    """
+    timer = timer or StageTimer(enabled=False)
+    pipe, encoded = fit_model(df, model_params, seed=seed, encoded=encoded, encoding=encoding, timer=timer)
+    y_val = encoded.y_val
+    with timer.stage("val_score"):
+        proba = pipe.named_steps["model"].predict_proba(encoded.X_val)[:, 1]
     pred = (proba >= threshold).astype(int)
 
     metrics = {
@@ -67,17 +115,156 @@ def train_model(
 
     ensure_dir("models")
     model_path = Path("models/model.joblib")
-    joblib.dump(pipe, model_path)
+    with timer.stage("save"):
+        joblib.dump(pipe, model_path)
+    with timer.stage("export_serving"):
+        serving_path = export_serving_artifact(pipe, CHURN_SPEC, "models/serving")
 
     meta = {
         "features_numeric": list(CHURN_SPEC.numeric),
         "features_categorical": list(CHURN_SPEC.categorical),
         "target": CHURN_SPEC.target,
+        "encoding": encoding,
     }
     meta_path = Path("models/model_meta.json")
     write_json(meta_path, meta)
 
-    return pipe, TrainOutputs(metrics=metrics, model_path=model_path, meta_path=meta_path)
+    return pipe, TrainOutputs(metrics=metrics, model_path=model_path, meta_path=meta_path, serving_path=serving_path)
+
+
+def continue_training(
+    pipe: Pipeline,
+    df: pd.DataFrame,
+    extra_rounds: int,
+    seed: int = 42,
+) -> Pipeline:
+    """Warm-start: boost `extra_rounds` more trees onto `pipe`'s booster using `df`.
+
+    The fitted preprocessor is reused unchanged so the new trees see the same feature
+    space as the existing ones; cost scales with len(df) * extra_rounds, not history.
+    """
+    X, y = split_xy(df, CHURN_SPEC)
+    pre = pipe.named_steps["preprocess"]
+    base = pipe.named_steps["model"]
+
+    params = base.get_params()
+    params.update(n_estimators=int(extra_rounds), random_state=seed)
+    clf = XGBClassifier(**params)
+    clf.fit(pre.transform(X), y, xgb_model=base.get_booster())
+
+    return Pipeline([("preprocess", pre), ("model", clf)])
+
+
+def _truncated(pipe: Pipeline, n_trees: int) -> Pipeline:
+    """`pipe` with only the first `n_trees` boosting rounds."""
+    clf = pipe.named_steps["model"]
+    params = {k: v for k, v in clf.get_params().items() if k != "booster"}  # tree type comes with the model
+    head = classifier_from_booster(clf.get_booster()[:n_trees], **{**params, "n_estimators": n_trees})
+    return Pipeline([("preprocess", pipe.named_steps["preprocess"]), ("model", head)])
+
+
+def _serving_latency(pipe: Pipeline, rows: list[dict[str, Any]], repeats: int) -> dict[str, float]:
+    """p50 ms for one row and for `rows` through the single-threaded serving artifact."""
+    with tempfile.TemporaryDirectory() as tmp:
+        model = ServingModel(export_serving_artifact(pipe, CHURN_SPEC, tmp), nthread=1)
+        out = {}
+        for key, batch, n in (("single_row_p50_ms", rows[:1], repeats), ("batch_p50_ms", rows, max(3, repeats // 20))):
+            model.predict_proba(batch)
+            times = []
+            for _ in range(n):
+                t0 = time.perf_counter()
+                model.predict_proba(batch)
+                times.append((time.perf_counter() - t0) * 1000)
+            out[key] = float(np.median(times))
+        return out
+
+
+def compact_model(
+    pipe: Pipeline,
+    X_val: pd.DataFrame,
+    y_val: Any,
+    max_auc_drop: float = 0.002,
+    step: int = 10,
+    latency_rows: int = 1000,
+    latency_repeats: int = 1000,
+) -> tuple[Pipeline, dict[str, Any]]:
+    """Drop trailing trees while validation ROC AUC stays within `max_auc_drop` of the full model.
+
+    Candidate sizes are every `step` trees. The smallest candidate within tolerance is
+    kept, as a pipeline with the same preprocessor and the first n trees. The report
+    has the full AUC-by-trees curve. It also has serving latency (single row and a
+    `latency_rows` batch, one thread) for quarter sizes, the chosen size and the full
+    model, so promotion can trade AUC for serving cost.
+    """
+    booster = pipe.named_steps["model"].get_booster()
+    n_full = booster.num_boosted_rounds()
+    dval = xgb.DMatrix(pipe.named_steps["preprocess"].transform(X_val), enable_categorical=True)
+
+    def auc(n: int) -> float:
+        return float(roc_auc_score(y_val, booster.predict(dval, iteration_range=(0, n))))
+
+    sizes = sorted(set(range(step, n_full, step)) | {n_full})
+    curve = [{"n_trees": n, "roc_auc": auc(n)} for n in sizes]
+    full_auc = curve[-1]["roc_auc"]
+    chosen = next(c for c in curve if c["roc_auc"] >= full_auc - max_auc_drop)
+    n_keep = chosen["n_trees"]
+
+    compact = _truncated(pipe, n_keep)
+
+    rows = X_val.head(latency_rows).to_dict(orient="records")
+    aucs = {c["n_trees"]: c["roc_auc"] for c in curve}
+    points = sorted({max(1, n_full * q // 4) for q in (1, 2, 3)} | {n_keep, n_full})
+    latency = []
+    for n in points:
+        n_auc = aucs[n] if n in aucs else auc(n)
+        timings = _serving_latency(pipe if n == n_full else _truncated(pipe, n), rows, latency_repeats)
+        latency.append({"n_trees": n, "roc_auc": n_auc, "auc_delta": n_auc - full_auc, **timings})
+    by_n = {p["n_trees"]: p for p in latency}
+
+    report = {
+        "max_auc_drop": max_auc_drop,
+        "latency_rows": len(rows),
+        "full": by_n[n_full],
+        "compact": by_n[n_keep],
+        "auc_delta": by_n[n_keep]["auc_delta"],
+        "single_row_speedup": by_n[n_full]["single_row_p50_ms"] / by_n[n_keep]["single_row_p50_ms"],
+        "batch_speedup": by_n[n_full]["batch_p50_ms"] / by_n[n_keep]["batch_p50_ms"],
+        "latency_vs_auc": latency,
+        "curve": curve,
+    }
+    return compact, report
+
+
+def log_compaction(model_name: str, version: int, report: dict[str, Any], compacted_from: str = "") -> None:
+    """Attach the compaction report to a registered version: JSON artifact + metrics on its
+    run, and n_trees / auc_delta / speedup tags on the version for promotion reviews."""
+    from mlflow import MlflowClient
+
+    client = MlflowClient()
+    run_id = client.get_model_version(model_name, str(version)).run_id
+    client.log_dict(run_id, report, "compaction/report.json")
+    compact = report["compact"]
+    for key in ("roc_auc", "auc_delta", "single_row_p50_ms", "batch_p50_ms"):
+        client.log_metric(run_id, f"compact_{key}", float(compact[key]))
+    tags = {
+        "compacted": "true",
+        "n_trees": str(compact["n_trees"]),
+        "full_n_trees": str(report["full"]["n_trees"]),
+        "auc_delta": f"{report['auc_delta']:.5f}",
+        "single_row_speedup": f"{report['single_row_speedup']:.2f}",
+        "batch_speedup": f"{report['batch_speedup']:.2f}",
+    }
+    if compacted_from:
+        tags["compacted_from"] = compacted_from
+    for k, v in tags.items():
+        client.set_model_version_tag(model_name, str(version), k, v)
+
+
+def log_serving_artifact(pipe: Pipeline, artifact_path: str = "serving") -> None:
+    """Log the serving artifact of `pipe` to the active MLflow run, next to the pickled model."""
+    with tempfile.TemporaryDirectory() as tmp:
+        export_serving_artifact(pipe, CHURN_SPEC, tmp)
+        mlflow.log_artifacts(tmp, artifact_path=artifact_path)
 
 
 def log_and_register(
@@ -85,17 +272,25 @@ def log_and_register(
     X_example: pd.DataFrame,
     model_name: str,
     alias: Optional[str] = None,
+    timer: Optional[StageTimer] = None,
 ) -> int:
+    """Log `pipe` to a new MLflow run and register it. If `timer` is enabled, its
+    stages (including this one, "mlflow_log") are logged as run metrics."""
+    timer = timer or StageTimer(enabled=False)
     signature = infer_signature(X_example, pipe.predict_proba(X_example)[:, 1])
 
     with mlflow.start_run():
-        res = mlflow.sklearn.log_model(
-            sk_model=pipe,
-            artifact_path="model",
-            registered_model_name=model_name,
-            signature=signature,
-            input_example=X_example.head(5),
-        )
+        with timer.stage("mlflow_log"):
+            res = mlflow.sklearn.log_model(
+                sk_model=pipe,
+                artifact_path="model",
+                registered_model_name=model_name,
+                signature=signature,
+                input_example=X_example.head(5),
+            )
+            log_serving_artifact(pipe)
+        if timer.stages:
+            mlflow.log_metrics(timer.as_metrics())
 
         from mlflow import MlflowClient
         client = MlflowClient()
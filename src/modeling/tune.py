@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Optional, Sequence
+
+import mlflow
+import numpy as np
+import xgboost as xgb
+from sklearn.metrics import roc_auc_score
+from xgboost import XGBClassifier
+
+from src.features.cache import FeatureMatrixCache
+from src.features.preprocess import EncodedSplit
+
+# Loaded once per worker process by _init_worker; the arrays are memory-mapped from
+# the feature cache, so all workers share the same page-cache copy.
+_SPLIT: Optional[EncodedSplit] = None
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class TrialResult:
+    trial: int
+    params: dict[str, Any]
+    best_iteration: int
+    val_logloss: float
+    val_roc_auc: float
+    fit_seconds: float
+    pruned: bool
+    curve: list[float] = field(repr=False)
+
+
+def plan_workers(cpu_budget: int, threads_per_trial: int) -> tuple[int, int]:
+    """(n_workers, threads_per_worker) such that n_workers * threads <= cpu_budget."""
+    budget = cpu_budget if cpu_budget > 0 else (os.cpu_count() or 1)
+    threads = max(1, min(threads_per_trial, budget))
+    return max(1, budget // threads), threads
+
+
+def sample_candidates(space: dict[str, Sequence[Any]], n_trials: int, seed: int = 42) -> list[dict[str, Any]]:
+    """Random search over a discrete grid; duplicate draws are skipped."""
+    rng = np.random.default_rng(seed)
+    keys = sorted(space)
+    n_grid = int(np.prod([len(space[k]) for k in keys])) if keys else 0
+    seen: set[tuple[Any, ...]] = set()
+    out: list[dict[str, Any]] = []
+    while len(out) < min(n_trials, n_grid):
+        cand = {k: space[k][int(rng.integers(len(space[k])))] for k in keys}
+        sig = tuple(cand[k] for k in keys)
+        if sig in seen:
+            continue
+        seen.add(sig)
+        out.append(cand)
+    return out
+
+
+class CurvePruner(xgb.callback.TrainingCallback):
+    """Stop a trial whose validation loss trails the best trial's curve at the same round.
+
+    Checked every `check_every` rounds after `warmup` rounds; `margin` is relative.
+    """
+
+    def __init__(self, reference: Sequence[float], margin: float = 0.02, warmup: int = 50, check_every: int = 25):
+        self.reference = list(reference)
+        self.margin = margin
+        self.warmup = warmup
+        self.check_every = check_every
+        self.pruned = False
+
+    def after_iteration(self, model, epoch: int, evals_log) -> bool:
+        if epoch < self.warmup or epoch % self.check_every or epoch >= len(self.reference):
+            return False
+        loss = evals_log["validation_0"]["logloss"][-1]
+        if loss > self.reference[epoch] * (1 + self.margin):
+            self.pruned = True
+            return True
+        return False
+
+
+def _init_worker(cache_root: str, key: str) -> None:
+    global _SPLIT
+    _SPLIT = FeatureMatrixCache(cache_root).load(key)
+    if _SPLIT is None:
+        raise RuntimeError(f"feature cache entry {key} not found under {cache_root}")
+
+
+def _run_trial(
+    trial: int,
+    params: dict[str, Any],
+    threads: int,
+    max_rounds: int,
+    early_stopping_rounds: int,
+    reference_curve: Sequence[float],
+    seed: int,
+) -> TrialResult:
+    split = _SPLIT
+    assert split is not None
+    pruner = CurvePruner(reference_curve)
+    clf = XGBClassifier(
+        **params,
+        n_estimators=max_rounds,
+        early_stopping_rounds=early_stopping_rounds,
+        callbacks=[pruner],
+        objective="binary:logistic",
+        eval_metric="logloss",
+        tree_method="hist",
+        n_jobs=threads,
+        random_state=seed,
+    )
+    t0 = time.perf_counter()
+    clf.fit(split.X_train, split.y_train, eval_set=[(split.X_val, split.y_val)], verbose=False)
+    fit_seconds = time.perf_counter() - t0
+
+    curve = [float(v) for v in clf.evals_result()["validation_0"]["logloss"]]
+    best = int(clf.best_iteration)
+    proba = clf.predict_proba(split.X_val, iteration_range=(0, best + 1))[:, 1]
+    return TrialResult(
+        trial=trial,
+        params=dict(params),
+        best_iteration=best,
+        val_logloss=curve[best],
+        val_roc_auc=float(roc_auc_score(split.y_val, proba)),
+        fit_seconds=fit_seconds,
+        pruned=pruner.pruned,
+        curve=curve,
+    )
+
+
+def run_search(
+    cache: FeatureMatrixCache,
+    key: str,
+    candidates: Sequence[dict[str, Any]],
+    cpu_budget: int = 0,
+    threads_per_trial: int = 2,
+    max_rounds: int = 1000,
+    early_stopping_rounds: int = 30,
+    seed: int = 42,
+) -> list[TrialResult]:
+    """Run `candidates` across a process pool, logging each as a nested MLflow run.
+
+    Must be called inside an active MLflow run. Trials are submitted lazily (at most
+    one per worker in flight) so each new trial is pruned against the best curve so far.
+    """
+    n_workers, threads = plan_workers(cpu_budget, threads_per_trial)
+    logger.info("tuning %d trials on %d workers x %d threads", len(candidates), n_workers, threads)
+
+    results: list[TrialResult] = []
+    best: Optional[TrialResult] = None
+    pending = list(enumerate(candidates))
+    with ProcessPoolExecutor(
+        max_workers=n_workers, initializer=_init_worker, initargs=(str(cache.root), key)
+    ) as ex:
+        inflight: set[Future[TrialResult]] = set()
+        while pending or inflight:
+            while pending and len(inflight) < n_workers:
+                i, params = pending.pop(0)
+                ref = best.curve if best is not None else []
+                inflight.add(ex.submit(_run_trial, i, params, threads, max_rounds, early_stopping_rounds, ref, seed))
+
+            done, inflight = wait(inflight, return_when=FIRST_COMPLETED)
+            for fut in done:
+                res = fut.result()
+                results.append(res)
+                if best is None or res.val_logloss < best.val_logloss:
+                    best = res
+                with mlflow.start_run(run_name=f"trial-{res.trial:03d}", nested=True):
+                    mlflow.log_params({**res.params, "threads": threads})
+                    mlflow.log_metrics(
+                        {
+                            "val_logloss": res.val_logloss,
+                            "val_roc_auc": res.val_roc_auc,
+                            "best_iteration": res.best_iteration,
+                            "fit_seconds": res.fit_seconds,
+                            "pruned": float(res.pruned),
+                        }
+                    )
+                logger.info(
+                    "trial %03d: logloss=%.5f auc=%.4f rounds=%d%s %.1fs",
+                    res.trial,
+                    res.val_logloss,
+                    res.val_roc_auc,
+                    res.best_iteration + 1,
+                    " (pruned)" if res.pruned else "",
+                    res.fit_seconds,
+                )
+
+    return sorted(results, key=lambda r: r.val_logloss)
+
+
+def best_model_params(result: TrialResult) -> dict[str, Any]:
+    """params.yaml `model:` section for the winning trial."""
+    return {**result.params, "n_estimators": result.best_iteration + 1}
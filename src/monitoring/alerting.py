@@ -1,79 +1,92 @@
 from __future__ import annotations
 
-import os
-import smtplib
-from email.message import EmailMessage
-from typing import Iterable, Optional
+from typing import Any, Optional
 
-import requests
+from src.monitoring.dispatcher import Alert, AlertDispatcher, channels_from_env
 
 
-def _split_recipients(s: str) -> list[str]:
-    # supports comma/semicolon separated
-    parts = [p.strip() for p in s.replace(";", ",").split(",")]
-    return [p for p in parts if p]
+def evaluate_drift_alert(report: dict[str, Any], threshold: float = 0.25) -> dict[str, Any]:
+    """Worst numeric PSI vs threshold. Accepts a drift report (`psi_numeric` at top level)
+    or a monitoring snapshot (`drift.psi_numeric`)."""
+    psi_map = report.get("psi_numeric") or report.get("drift", {}).get("psi_numeric") or {}
 
+    worst_feature = None
+    worst_val = -1.0
+    drifting: dict[str, float] = {}
+    for k, v in psi_map.items():
+        try:
+            fv = float(v)
+        except Exception:
+            continue
+        if fv >= threshold:
+            drifting[k] = fv
+        if fv > worst_val:
+            worst_val = fv
+            worst_feature = k
 
-def send_slack(webhook: str, text: str) -> None:
-    try:
-        requests.post(webhook, json={"text": text}, timeout=10).raise_for_status()
-    except Exception:
-        # do not crash monitoring runs because Slack failed
-        return
+    return {
+        "threshold": threshold,
+        "worst_feature": worst_feature,
+        "worst_psi": worst_val,
+        "drifting_features": dict(sorted(drifting.items(), key=lambda kv: -kv[1])),
+        "alert": bool(worst_val >= threshold),
+    }
 
 
-def send_email_smtp(
-    subject: str,
-    body: str,
-    to_addrs: Iterable[str],
-    from_addr: str,
-    host: str,
-    port: int,
-    username: Optional[str] = None,
-    password: Optional[str] = None,
-    use_starttls: bool = True,
-) -> None:
-    msg = EmailMessage()
-    msg["Subject"] = subject
-    msg["From"] = from_addr
-    msg["To"] = ", ".join(list(to_addrs))
-    msg.set_content(body)
+def notify_drift_alert(
+    alert: dict[str, Any],
+    email: bool = False,
+    slack: bool = False,
+    model_version: str = "",
+    dispatcher: Optional[AlertDispatcher] = None,
+    queue_path: str = ".cache/alerts.db",
+    suppress_hours: float = 6.0,
+    wait_seconds: float = 0.0,
+) -> Optional[str]:
+    """Queue one alert per drifting feature; returns the summary message, or None if no alert.
 
-    with smtplib.SMTP(host=host, port=port, timeout=20) as server:
-        server.ehlo()
-        if use_starttls:
-            server.starttls()
-            server.ehlo()
-        if username and password:
-            server.login(username, password)
-        server.send_message(msg)
-
-
-def send_email_from_env(subject: str, body: str) -> bool:
-    """Send email using SMTP config from environment variables.
-    Returns True if attempted with required config present, False otherwise.
+    Alerts go through an `AlertDispatcher`: a feature that already alerted for the same
+    model version within `suppress_hours` is not re-sent, and the rest are delivered as
+    one digest per channel. Without a `dispatcher`, the alerts are only written to the
+    queue at `queue_path` and this returns at once; a long-lived dispatcher on the same
+    queue (scripts/deliver_alerts.py) or the next run delivers them. `wait_seconds` > 0
+    opts into delivering here, for at most that long.
     """
-    host = os.getenv("SMTP_HOST", "")
-    to_s = os.getenv("ALERT_EMAIL_TO", "")
-    from_addr = os.getenv("ALERT_EMAIL_FROM", "")
-    if not host or not to_s or not from_addr:
-        return False
-
-    port = int(os.getenv("SMTP_PORT", "587"))
-    username = os.getenv("SMTP_USERNAME", "") or None
-    password = os.getenv("SMTP_PASSWORD", "") or None
-    use_starttls = os.getenv("SMTP_STARTTLS", "true").lower() in ("1", "true", "yes", "y")
+    if not alert["alert"]:
+        return None
 
-    to_addrs = _split_recipients(to_s)
-    send_email_smtp(
-        subject=subject,
-        body=body,
-        to_addrs=to_addrs,
-        from_addr=from_addr,
-        host=host,
-        port=port,
-        username=username,
-        password=password,
-        use_starttls=use_starttls,
+    msg = (
+        f"Drift alert: PSI={alert['worst_psi']:.3f} on feature '{alert['worst_feature']}' "
+        f"(threshold {alert['threshold']})"
     )
-    return True
+    if not (email or slack):
+        return msg
+
+    owned = dispatcher is None
+    if dispatcher is None:
+        channels = channels_from_env(email=email, slack=slack)
+        if email and not any(ch.name == "email" for ch in channels):
+            print("Email not sent: missing SMTP_HOST / ALERT_EMAIL_TO / ALERT_EMAIL_FROM")
+        if not channels:
+            return msg
+        dispatcher = AlertDispatcher(
+            queue_path, channels=channels, suppress_seconds=suppress_hours * 3600, digest_seconds=0, start=False
+        )
+
+    drifting = alert.get("drifting_features") or {alert["worst_feature"]: alert["worst_psi"]}
+    suffix = f" [model v{model_version}]" if model_version else ""
+    for feature, value in drifting.items():
+        dispatcher.submit(
+            Alert(
+                alert_type="drift",
+                feature=str(feature),
+                model_version=str(model_version or ""),
+                message=f"🚨 PSI={float(value):.3f} on feature '{feature}' (threshold {alert['threshold']}){suffix}",
+            )
+        )
+    if owned:
+        if wait_seconds > 0:
+            dispatcher.start()
+            dispatcher.flush(timeout=wait_seconds)
+        dispatcher.close(timeout=0)
+    return msg
@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Optional, Sequence
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.fs as pafs
+import pyarrow.parquet as pq
+from sqlalchemy import bindparam, text
+
+from src.modeling.schema import CHURN_SPEC
+from src.monitoring.db import get_engine
+
+# Columns stored as-is from the predictions table; request_json is flattened into
+# one typed column per CHURN_SPEC feature.
+BASE_COLUMNS = [
+    "id",
+    "created_at",
+    "churn_probability",
+    "churn_label",
+    "model_uri",
+    "model_version",
+    "has_feedback",
+    "actual_churn",
+]
+FEATURE_COLUMNS = list(CHURN_SPEC.numeric) + list(CHURN_SPEC.categorical)
+
+_DICT = pa.dictionary(pa.int32(), pa.string())
+ARCHIVE_SCHEMA = pa.schema(
+    [
+        ("id", pa.int64()),
+        ("created_at", pa.timestamp("us", tz="UTC")),
+        ("churn_probability", pa.float64()),
+        ("churn_label", pa.int8()),
+        ("model_uri", _DICT),
+        ("model_version", _DICT),
+        ("has_feedback", pa.bool_()),
+        ("actual_churn", pa.int8()),
+    ]
+    + [(c, pa.float64()) for c in CHURN_SPEC.numeric]
+    + [(c, _DICT) for c in CHURN_SPEC.categorical]
+)
+_PARTITIONING = ds.partitioning(pa.schema([("date", pa.string())]), flavor="hive")
+
+
+def rows_to_frame(rows: Sequence[Sequence[Any]], columns: Sequence[str]) -> pd.DataFrame:
+    """Build a predictions frame from DB rows, expanding request_json into feature columns."""
+    df = pd.DataFrame(rows, columns=list(columns))
+    if "request_json" in df.columns:
+        feats = pd.DataFrame([json.loads(s) for s in df["request_json"]], index=df.index)
+        df = pd.concat([df.drop(columns=["request_json"]), feats.reindex(columns=FEATURE_COLUMNS)], axis=1)
+    if "created_at" in df.columns:
+        df["created_at"] = pd.to_datetime(df["created_at"], utc=True)
+    return df
+
+
+def _to_table(df: pd.DataFrame) -> pa.Table:
+    df = df.copy()
+    df["has_feedback"] = df["has_feedback"].astype(bool)
+    df["actual_churn"] = pd.array(df["actual_churn"], dtype="Int8")
+    return pa.Table.from_pandas(df[ARCHIVE_SCHEMA.names], schema=ARCHIVE_SCHEMA, preserve_index=False)
+
+
+def _fsync(path: Path) -> None:
+    """Flush a file or directory entry to stable storage."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def archive_predictions(
+    db_url: str,
+    archive_dir: str | Path,
+    cutoff: datetime,
+    batch_size: int = 50_000,
+    dry_run: bool = False,
+) -> dict[str, Any]:
+    """Move predictions older than `cutoff` to date-partitioned parquet, then delete them.
+
+    Each batch's files and their partition directories are fsynced before the
+    matching ids are deleted, so an interrupted run never loses rows; at worst a
+    batch is archived twice and reads dedupe on `id`.
+    """
+    archive_dir = Path(archive_dir)
+    engine = get_engine(db_url)
+    select_q = text(
+        "SELECT id, created_at, churn_probability, churn_label, model_uri, model_version, "
+        "has_feedback, actual_churn, request_json FROM predictions "
+        "WHERE created_at < :cutoff AND id > :after ORDER BY id LIMIT :n"
+    )
+    delete_q = text("DELETE FROM predictions WHERE id IN :ids").bindparams(bindparam("ids", expanding=True))
+
+    n_archived = 0
+    files: list[str] = []
+    after = 0
+    while True:
+        with engine.connect() as conn:
+            rows = conn.execute(select_q, {"cutoff": cutoff, "after": after, "n": batch_size}).fetchall()
+        if not rows:
+            break
+
+        df = rows_to_frame(rows, BASE_COLUMNS + ["request_json"])
+        after = int(df["id"].max())
+        n_archived += len(df)
+        if dry_run:
+            continue
+
+        for day, part in df.groupby(df["created_at"].dt.strftime("%Y-%m-%d"), sort=True):
+            out = archive_dir / f"date={day}" / f"part-{int(part['id'].min())}-{int(part['id'].max())}.parquet"
+            out.parent.mkdir(parents=True, exist_ok=True)
+            pq.write_table(_to_table(part), out, compression="zstd")
+            _fsync(out)
+            _fsync(out.parent)
+            files.append(str(out))
+        _fsync(archive_dir)
+
+        ids = [int(i) for i in df["id"]]
+        with engine.begin() as conn:
+            for i in range(0, len(ids), 1000):
+                conn.execute(delete_q, {"ids": ids[i : i + 1000]})
+
+    return {"cutoff": cutoff.isoformat(), "n_archived": n_archived, "files": files, "dry_run": dry_run}
+
+
+def read_archive(
+    archive_dir: str | Path,
+    columns: Optional[Sequence[str]] = None,
+    since: Optional[datetime] = None,
+    feedback_only: bool = False,
+) -> pd.DataFrame:
+    """Read archived predictions with memory-mapped IO and column projection.
+
+    `since` prunes whole date partitions before any file is opened.
+    """
+    archive_dir = Path(archive_dir)
+    if not archive_dir.exists():
+        return pd.DataFrame(columns=list(columns or ARCHIVE_SCHEMA.names))
+
+    dataset = ds.dataset(
+        str(archive_dir),
+        format="parquet",
+        schema=ARCHIVE_SCHEMA.append(pa.field("date", pa.string())),
+        partitioning=_PARTITIONING,
+        filesystem=pafs.LocalFileSystem(use_mmap=True),
+    )
+
+    flt = None
+    if since is not None:
+        since = since if since.tzinfo else since.replace(tzinfo=timezone.utc)
+        ts = pa.scalar(since, ARCHIVE_SCHEMA.field("created_at").type)
+        flt = (ds.field("date") >= since.strftime("%Y-%m-%d")) & (ds.field("created_at") >= ts)
+    if feedback_only:
+        fb = ds.field("has_feedback") & ds.field("actual_churn").is_valid()
+        flt = fb if flt is None else flt & fb
+
+    cols = list(columns or ARCHIVE_SCHEMA.names)
+    proj = cols if "id" in cols else cols + ["id"]
+    df = dataset.to_table(columns=proj, filter=flt).to_pandas()
+    df = df.drop_duplicates("id")
+    return df[cols]
+
+
+def load_predictions(
+    db_url: str,
+    columns: Sequence[str],
+    since: Optional[datetime] = None,
+    archive_dir: Optional[str | Path] = None,
+    feedback_only: bool = False,
+) -> pd.DataFrame:
+    """Predictions from the live table, plus the parquet archive when `archive_dir` is set.
+
+    `columns` may mix base columns and CHURN_SPEC feature names; request_json is only
+    fetched (and parsed) when a feature column is requested.
+    """
+    cols = list(columns)
+    base = ["id"] + [c for c in cols if c in BASE_COLUMNS and c != "id"]
+    need_features = any(c in FEATURE_COLUMNS for c in cols)
+    select_cols = base + (["request_json"] if need_features else [])
+
+    where = []
+    params: dict[str, Any] = {}
+    if since is not None:
+        where.append("created_at >= :since")
+        params["since"] = since
+    if feedback_only:
+        where.append("has_feedback = true AND actual_churn IS NOT NULL")
+    q = f"SELECT {', '.join(select_cols)} FROM predictions"
+    if where:
+        q += " WHERE " + " AND ".join(where)
+
+    with get_engine(db_url).connect() as conn:
+        rows = conn.execute(text(q), params).fetchall()
+    live = rows_to_frame(rows, select_cols)
+
+    if archive_dir is None:
+        return live[cols]
+
+    archived = read_archive(
+        archive_dir, columns=base + [c for c in cols if c not in base], since=since, feedback_only=feedback_only
+    )
+    # a batch interrupted between write and delete can exist in both tiers
+    both = pd.concat([archived, live], ignore_index=True) if not archived.empty else live
+    return both.drop_duplicates("id", keep="last")[cols].reset_index(drop=True)
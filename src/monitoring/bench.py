@@ -0,0 +1,179 @@
+"""Synthetic monitoring DB and per-query timing for benchmarking the monitoring jobs.
+
+`populate_predictions` fills the `predictions` table the way the API and `/feedback`
+would over `days` of traffic. Rows come from `generate_churn`, with a labeled
+fraction once the feedback lag has passed. During the last `drift_days`, the
+`drift_regions` segments are drifted: their inputs shift and their scores lose
+signal. `QueryTimer` records every statement SQLAlchemy sends while it is active.
+"""
+from __future__ import annotations
+
+import re
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Iterator, Optional
+
+import numpy as np
+from sqlalchemy import event, func, insert, select
+from sqlalchemy.engine import Engine
+
+from src.data.synthetic import chunk_rng, generate_churn
+from src.modeling.schema import CHURN_SPEC
+from src.monitoring.db import Base, Prediction, get_engine
+
+FEATURE_ORDER = list(CHURN_SPEC.numeric) + list(CHURN_SPEC.categorical)
+
+
+@dataclass(frozen=True)
+class SyntheticTraffic:
+    days: float = 30.0
+    feedback_rate: float = 0.3
+    feedback_lag_days: float = 7.0
+    drift_days: float = 14.0  # longer than the feedback lag, so some drifted rows are labeled
+    drift_regions: tuple[str, ...] = ("SW",)
+    model_versions: tuple[str, ...] = ("1", "2")  # equal consecutive spans of the window
+    model_uri: str = "models:/xgb_churn@champion"
+
+
+def _chunk(
+    n: int, start: int, total: int, traffic: SyntheticTraffic, end: datetime, rng: np.random.Generator
+) -> list[dict[str, Any]]:
+    df = generate_churn(n, rng)
+    span = timedelta(days=traffic.days)
+    # ids increase with created_at, as in the live table
+    frac = (np.arange(start, start + n) + 0.5) / total
+    created = [end - span + span * float(f) for f in frac]
+    age_days = (1.0 - frac) * traffic.days
+
+    drifted = (age_days < traffic.drift_days) & df["region"].isin(traffic.drift_regions).to_numpy()
+    nd = int(drifted.sum())
+    if nd:
+        df.loc[drifted, "tenure_months"] = (df.loc[drifted, "tenure_months"] * 0.85).round()
+        df.loc[drifted, "tickets_90d"] += rng.poisson(0.8, nd)
+        df.loc[drifted, "monthly_charges"] *= 1.1
+
+    # scores separate the classes about as well as the trained model (AUC ~0.75);
+    # in drifted segments they are mostly noise
+    churn = df["churn"].to_numpy()
+    signal = np.where(drifted, 0.03, 0.15)
+    proba = np.clip(rng.beta(2, 5, n) + signal * churn, 0, 1)
+
+    labeled = (age_days > traffic.feedback_lag_days) & (rng.random(n) < traffic.feedback_rate)
+    version_idx = np.minimum((frac * len(traffic.model_versions)).astype(int), len(traffic.model_versions) - 1)
+    requests = df[FEATURE_ORDER].to_json(orient="records", lines=True).splitlines()
+
+    return [
+        {
+            "created_at": created[i],
+            "request_json": requests[i],
+            "churn_probability": float(proba[i]),
+            "churn_label": int(proba[i] >= 0.5),
+            "model_uri": traffic.model_uri,
+            "model_version": traffic.model_versions[version_idx[i]],
+            "has_feedback": bool(labeled[i]),
+            "actual_churn": int(churn[i]) if labeled[i] else None,
+        }
+        for i in range(n)
+    ]
+
+
+def populate_predictions(
+    db_url: str,
+    n_predictions: int,
+    traffic: Optional[SyntheticTraffic] = None,
+    chunk_rows: int = 100_000,
+    seed: int = 42,
+    end: Optional[datetime] = None,
+    progress: Optional[Callable[[int], None]] = None,
+) -> dict[str, Any]:
+    """Create the monitoring tables and insert `n_predictions` synthetic rows in chunks."""
+    traffic = traffic or SyntheticTraffic()
+    end = end or datetime.now(timezone.utc)
+    engine = get_engine(db_url)
+    Base.metadata.create_all(engine)
+
+    t0 = time.perf_counter()
+    for i, start in enumerate(range(0, n_predictions, chunk_rows)):
+        n = min(chunk_rows, n_predictions - start)
+        rows = _chunk(n, start, n_predictions, traffic, end, chunk_rng(seed, i))
+        with engine.begin() as conn:
+            conn.execute(insert(Prediction), rows)
+        if progress:
+            progress(start + n)
+    seconds = time.perf_counter() - t0
+
+    with engine.connect() as conn:
+        n_rows, n_feedback = conn.execute(
+            select(func.count(), func.count(Prediction.actual_churn)).select_from(Prediction)
+        ).one()
+    return {
+        "n_predictions": int(n_rows),
+        "n_feedback": int(n_feedback),
+        "seconds": seconds,
+        "rows_per_s": n_predictions / seconds if seconds else None,
+        "end": end.isoformat(),
+    }
+
+
+def normalize_statement(statement: str, max_len: int = 160) -> str:
+    """One-line statement text (expanded IN lists collapsed) used as the grouping key."""
+    s = re.sub(r"\s+", " ", statement).strip()
+    s = re.sub(r"\((?:\?|%\(\w+\)s|:\w+)(?:, ?(?:\?|%\(\w+\)s|:\w+))+\)", "(...)", s)
+    return s if len(s) <= max_len else s[: max_len - 3] + "..."
+
+
+@dataclass
+class QueryStats:
+    statement: str
+    calls: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    rows: int = 0  # driver rowcount; SELECTs on most drivers report -1 and add nothing
+
+
+@dataclass
+class QueryTimer:
+    """Per-statement call count and driver execute time for every Engine in the process.
+
+    Time runs from before_cursor_execute to after_cursor_execute. psycopg2 buffers the
+    whole result inside execute, so on Postgres this covers the query and the transfer.
+    sqlite3 only steps to the first row, so on SQLite a large SELECT's fetch lands in
+    the job's Python time instead.
+    """
+
+    stats: dict[str, QueryStats] = field(default_factory=dict)
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info.setdefault("query_t0", []).append(time.perf_counter())
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        dt = time.perf_counter() - conn.info["query_t0"].pop()
+        key = normalize_statement(statement)
+        s = self.stats.setdefault(key, QueryStats(key))
+        s.calls += 1
+        s.total_seconds += dt
+        s.max_seconds = max(s.max_seconds, dt)
+        if cursor.rowcount and cursor.rowcount > 0:
+            s.rows += cursor.rowcount
+
+    @contextmanager
+    def active(self) -> Iterator[QueryTimer]:
+        event.listen(Engine, "before_cursor_execute", self._before)
+        event.listen(Engine, "after_cursor_execute", self._after)
+        try:
+            yield self
+        finally:
+            event.remove(Engine, "before_cursor_execute", self._before)
+            event.remove(Engine, "after_cursor_execute", self._after)
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(s.total_seconds for s in self.stats.values())
+
+    def to_list(self) -> list[dict[str, Any]]:
+        """Statements, slowest total first."""
+        ranked = sorted(self.stats.values(), key=lambda s: s.total_seconds, reverse=True)
+        return [vars(s).copy() for s in ranked]
+
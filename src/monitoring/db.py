@@ -2,9 +2,10 @@ from __future__ import annotations
 
 import json
 from datetime import datetime, timezone
-from typing import Any, Optional
+from functools import lru_cache
+from typing import Any, Iterable, Optional
 
-from sqlalchemy import Boolean, DateTime, Float, Integer, Text, create_engine
+from sqlalchemy import Boolean, DateTime, Float, Integer, Text, create_engine, delete, insert
 from sqlalchemy.orm import DeclarativeBase, Mapped, Session, mapped_column
 
 
@@ -16,7 +17,9 @@ class Prediction(Base):
     __tablename__ = "predictions"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), index=True
+    )
 
     request_json: Mapped[str] = mapped_column(Text)
     churn_probability: Mapped[float] = mapped_column(Float)
@@ -62,12 +65,65 @@ class SegmentMetric(Base):
     brier: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
 
 
+class HourlyMetric(Base):
+    __tablename__ = "hourly_metrics"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    hour: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
+    model_version: Mapped[str] = mapped_column(Text, default="")
+    region: Mapped[str] = mapped_column(Text, default="")
+
+    n_predictions: Mapped[int] = mapped_column(Integer)
+    n_predicted_churn: Mapped[int] = mapped_column(Integer)
+    mean_churn_probability: Mapped[float] = mapped_column(Float)
+    n_feedback: Mapped[int] = mapped_column(Integer)
+    n_actual_churn: Mapped[int] = mapped_column(Integer)
+
+
+class HourlyScoreBucket(Base):
+    __tablename__ = "hourly_score_buckets"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    hour: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
+    model_version: Mapped[str] = mapped_column(Text, default="")
+    region: Mapped[str] = mapped_column(Text, default="")
+
+    bucket: Mapped[int] = mapped_column(Integer)  # 0..n_buckets-1, lower edge = bucket / n_buckets
+    n: Mapped[int] = mapped_column(Integer)
+
+
+class HourlyFeatureMean(Base):
+    __tablename__ = "hourly_feature_means"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    hour: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
+    model_version: Mapped[str] = mapped_column(Text, default="")
+    region: Mapped[str] = mapped_column(Text, default="")
+
+    feature: Mapped[str] = mapped_column(Text)
+    mean: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+
+
+class CustomerScore(Base):
+    """Nightly precomputed churn scores, one row per customer (primary-key lookup)."""
+
+    __tablename__ = "customer_scores"
+
+    customer_id: Mapped[str] = mapped_column(Text, primary_key=True)
+    feature_hash: Mapped[str] = mapped_column(Text)
+    churn_probability: Mapped[float] = mapped_column(Float)
+    model_version: Mapped[str] = mapped_column(Text, default="")
+    scored_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+
 def init_db(db_url: str) -> None:
     engine = create_engine(db_url, pool_pre_ping=True)
     Base.metadata.create_all(engine)
 
 
+@lru_cache(maxsize=8)
 def get_engine(db_url: str):
+    # one engine (and connection pool) per URL per process, instead of one per call
     return create_engine(db_url, pool_pre_ping=True)
 
 
@@ -150,3 +206,46 @@ def insert_segment_metrics(
                 brier=brier,
             ))
         sess.commit()
+
+
+def replace_hourly_rollups(
+    db_url: str,
+    since: datetime,
+    metrics: list[dict[str, Any]],
+    buckets: list[dict[str, Any]],
+    feature_means: list[dict[str, Any]],
+) -> None:
+    """Atomically replace every rollup row with hour >= since.
+
+    Rollups are recomputed per hour rather than accumulated, so re-running the job
+    over the same window is idempotent and late feedback is picked up.
+    """
+    engine = get_engine(db_url)
+    with Session(engine) as sess, sess.begin():
+        for model in (HourlyMetric, HourlyScoreBucket, HourlyFeatureMean):
+            sess.execute(delete(model).where(model.hour >= since))
+        sess.add_all(HourlyMetric(**r) for r in metrics)
+        sess.add_all(HourlyScoreBucket(**r) for r in buckets)
+        sess.add_all(HourlyFeatureMean(**r) for r in feature_means)
+
+
+def replace_customer_scores(db_url: str, chunks: Iterable[list[dict[str, Any]]]) -> int:
+    """Atomically replace the whole customer_scores table with the rows in `chunks`.
+
+    Readers keep seeing the previous night's scores until the transaction commits.
+    """
+    engine = get_engine(db_url)
+    n = 0
+    with Session(engine) as sess, sess.begin():
+        sess.execute(delete(CustomerScore))
+        for rows in chunks:
+            if rows:
+                sess.execute(insert(CustomerScore), rows)
+                n += len(rows)
+    return n
+
+
+def get_customer_score(db_url: str, customer_id: str) -> Optional[CustomerScore]:
+    engine = get_engine(db_url)
+    with Session(engine, expire_on_commit=False) as sess:
+        return sess.get(CustomerScore, customer_id)
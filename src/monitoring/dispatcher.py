@@ -0,0 +1,348 @@
+from __future__ import annotations
+
+import logging
+import os
+import smtplib
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from email.message import EmailMessage
+from pathlib import Path
+from typing import Optional, Protocol, Sequence
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS alert_queue (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    alert_key TEXT NOT NULL,
+    alert_type TEXT NOT NULL,
+    feature TEXT NOT NULL,
+    model_version TEXT NOT NULL,
+    message TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',  -- pending | sent | suppressed
+    attempts INTEGER NOT NULL DEFAULT 0,
+    sent_at REAL,
+    sent_channels TEXT NOT NULL DEFAULT ''  -- comma-separated channel names already delivered to
+);
+CREATE INDEX IF NOT EXISTS ix_alert_queue_status ON alert_queue (status);
+CREATE INDEX IF NOT EXISTS ix_alert_queue_key ON alert_queue (alert_key, created_at);
+"""
+
+
+@dataclass(frozen=True)
+class Alert:
+    alert_type: str  # e.g. "drift", "performance"
+    message: str
+    feature: str = ""
+    model_version: str = ""
+
+    @property
+    def key(self) -> str:
+        return f"{self.alert_type}|{self.feature}|{self.model_version}"
+
+
+def split_recipients(s: str) -> list[str]:
+    # supports comma/semicolon separated
+    parts = [p.strip() for p in s.replace(";", ",").split(",")]
+    return [p for p in parts if p]
+
+
+class Channel(Protocol):
+    name: str
+
+    def send(self, subject: str, body: str) -> None: ...
+
+    def close(self) -> None: ...
+
+
+class SlackChannel:
+    """Slack incoming webhook over one pooled keep-alive `requests.Session`."""
+
+    name = "slack"
+
+    def __init__(self, webhook: str, timeout: float = 10):
+        self.webhook = webhook
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def send(self, subject: str, body: str) -> None:
+        self.session.post(self.webhook, json={"text": f"{subject}\n{body}"}, timeout=self.timeout).raise_for_status()
+
+    def close(self) -> None:
+        self.session.close()
+
+
+class EmailChannel:
+    """SMTP with one connection (STARTTLS + login once) reused across digests.
+
+    The connection is checked with NOOP before reuse and reopened if the server
+    dropped it.
+    """
+
+    name = "email"
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        from_addr: str,
+        to_addrs: Sequence[str],
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        use_starttls: bool = True,
+        timeout: float = 20,
+    ):
+        self.host = host
+        self.port = port
+        self.from_addr = from_addr
+        self.to_addrs = list(to_addrs)
+        self.username = username
+        self.password = password
+        self.use_starttls = use_starttls
+        self.timeout = timeout
+        self._conn: Optional[smtplib.SMTP] = None
+
+    def _connection(self) -> smtplib.SMTP:
+        if self._conn is not None:
+            try:
+                if self._conn.noop()[0] == 250:
+                    return self._conn
+            except smtplib.SMTPException:
+                pass
+            except OSError:
+                pass
+            self._conn = None
+        conn = smtplib.SMTP(host=self.host, port=self.port, timeout=self.timeout)
+        conn.ehlo()
+        if self.use_starttls:
+            conn.starttls()
+            conn.ehlo()
+        if self.username and self.password:
+            conn.login(self.username, self.password)
+        self._conn = conn
+        return conn
+
+    def send(self, subject: str, body: str) -> None:
+        msg = EmailMessage()
+        msg["Subject"] = subject
+        msg["From"] = self.from_addr
+        msg["To"] = ", ".join(self.to_addrs)
+        msg.set_content(body)
+        self._connection().send_message(msg)
+
+    def close(self) -> None:
+        if self._conn is not None:
+            try:
+                self._conn.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._conn = None
+
+
+def channels_from_env(email: bool = True, slack: bool = True) -> list[Channel]:
+    """Channels configured by SLACK_WEBHOOK_URL and the SMTP_* / ALERT_EMAIL_* variables."""
+    out: list[Channel] = []
+    webhook = os.getenv("SLACK_WEBHOOK_URL", "")
+    if slack and webhook:
+        out.append(SlackChannel(webhook))
+    host = os.getenv("SMTP_HOST", "")
+    to_s = os.getenv("ALERT_EMAIL_TO", "")
+    from_addr = os.getenv("ALERT_EMAIL_FROM", "")
+    if email and host and to_s and from_addr:
+        out.append(
+            EmailChannel(
+                host=host,
+                port=int(os.getenv("SMTP_PORT", "587")),
+                from_addr=from_addr,
+                to_addrs=split_recipients(to_s),
+                username=os.getenv("SMTP_USERNAME", "") or None,
+                password=os.getenv("SMTP_PASSWORD", "") or None,
+                use_starttls=os.getenv("SMTP_STARTTLS", "true").lower() in ("1", "true", "yes", "y"),
+            )
+        )
+    return out
+
+
+class AlertDispatcher:
+    """Persistent, deduplicating, batching alert delivery on a background thread.
+
+    `submit` only writes to a local sqlite queue and returns immediately. Alerts whose
+    (type, feature, model_version) key was queued or sent within `suppress_seconds`
+    are recorded as suppressed. The worker waits `digest_seconds` after the first
+    pending alert so bursts go out as one digest per channel. Undelivered alerts stay
+    pending on disk and are retried, on the channels that missed them only, by this
+    or the next dispatcher using the same queue.
+    """
+
+    def __init__(
+        self,
+        queue_path: str | Path = ".cache/alerts.db",
+        channels: Optional[Sequence[Channel]] = None,
+        suppress_seconds: float = 6 * 3600,
+        digest_seconds: float = 5.0,
+        max_batch: int = 50,
+        retry_seconds: float = 30.0,
+        start: bool = True,
+    ):
+        self.queue_path = Path(queue_path)
+        self.queue_path.parent.mkdir(parents=True, exist_ok=True)
+        self.channels = list(channels) if channels is not None else channels_from_env()
+        self.suppress_seconds = suppress_seconds
+        self.digest_seconds = digest_seconds
+        self.max_batch = max_batch
+        self.retry_seconds = retry_seconds
+
+        self._db_lock = threading.Lock()
+        self._db = sqlite3.connect(self.queue_path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        columns = {r[1] for r in self._db.execute("PRAGMA table_info(alert_queue)")}
+        if "sent_channels" not in columns:  # queue files created before per-channel tracking
+            self._db.execute("ALTER TABLE alert_queue ADD COLUMN sent_channels TEXT NOT NULL DEFAULT ''")
+
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._idle = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        if start:
+            self.start()
+
+    # --- producer side -------------------------------------------------------------
+
+    def submit(self, alert: Alert) -> bool:
+        """Queue `alert`; False if it was suppressed as a duplicate."""
+        now = time.time()
+        with self._db_lock:
+            recent = self._db.execute(
+                "SELECT 1 FROM alert_queue WHERE alert_key = ? AND status != 'suppressed' AND created_at >= ? LIMIT 1",
+                (alert.key, now - self.suppress_seconds),
+            ).fetchone()
+            status = "suppressed" if recent else "pending"
+            self._db.execute(
+                "INSERT INTO alert_queue (alert_key, alert_type, feature, model_version, message, created_at, status) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (alert.key, alert.alert_type, alert.feature, alert.model_version, alert.message, now, status),
+            )
+        if recent:
+            logger.info("alert suppressed (sent within %.0fs): %s", self.suppress_seconds, alert.key)
+            return False
+        self._idle.clear()
+        self._wake.set()
+        return True
+
+    def pending(self) -> int:
+        with self._db_lock:
+            return int(self._db.execute("SELECT COUNT(*) FROM alert_queue WHERE status = 'pending'").fetchone()[0])
+
+    # --- delivery side -------------------------------------------------------------
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="alert-dispatcher", daemon=True)
+            self._thread.start()
+            self._wake.set()  # deliver anything left pending by a previous run
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(timeout=self.retry_seconds)
+            self._wake.clear()
+            if not self.pending():
+                self._idle.set()
+                continue
+            # let a burst accumulate into one digest, unless we are shutting down
+            self._stop.wait(timeout=self.digest_seconds)
+            while self.pending() and self.deliver_once():
+                pass
+            if not self.pending():
+                self._idle.set()
+        self.deliver_once()
+
+    def deliver_once(self) -> bool:
+        """Send one digest of up to `max_batch` pending alerts per channel; True if every channel got it.
+
+        Delivery is tracked per channel: when one channel fails, the alerts stay pending
+        and the retry only goes to the channels that have not received them yet.
+        """
+        with self._db_lock:
+            rows = self._db.execute(
+                "SELECT id, alert_type, feature, model_version, message, sent_channels FROM alert_queue "
+                "WHERE status = 'pending' ORDER BY id LIMIT ?",
+                (self.max_batch,),
+            ).fetchall()
+        if not rows:
+            return True
+        sent = {r[0]: {c for c in r[5].split(",") if c} for r in rows}
+
+        ok = True
+        for ch in self.channels:
+            todo = [r for r in rows if ch.name not in sent[r[0]]]
+            if not todo:
+                continue
+            subject, body = self.digest([Alert(r[1], r[4], r[2], r[3]) for r in todo])
+            try:
+                ch.send(subject, body)
+            except Exception:
+                ok = False
+                logger.exception("alert delivery via %s failed", ch.name)
+                continue
+            for r in todo:
+                sent[r[0]].add(ch.name)
+            # recorded right away, so a crash before the next channel cannot resend this one
+            with self._db_lock:
+                self._db.executemany(
+                    "UPDATE alert_queue SET sent_channels = ? WHERE id = ?",
+                    [(",".join(sorted(sent[r[0]])), r[0]) for r in todo],
+                )
+
+        names = {ch.name for ch in self.channels}
+        done = [i for i, chs in sent.items() if names <= chs]
+        retry = [i for i in sent if i not in done]
+        with self._db_lock:
+            if done:
+                marks = ",".join("?" * len(done))
+                self._db.execute(
+                    f"UPDATE alert_queue SET status = 'sent', sent_at = ?, attempts = attempts + 1 WHERE id IN ({marks})",
+                    (time.time(), *done),
+                )
+            if retry:
+                marks = ",".join("?" * len(retry))
+                self._db.execute(f"UPDATE alert_queue SET attempts = attempts + 1 WHERE id IN ({marks})", retry)
+        return ok
+
+    @staticmethod
+    def digest(alerts: Sequence[Alert]) -> tuple[str, str]:
+        if len(alerts) == 1:
+            return f"MLOps {alerts[0].alert_type} alert", alerts[0].message
+        lines = [f"- [{a.alert_type}] {a.message}" for a in alerts]
+        return f"MLOps alert digest ({len(alerts)} alerts)", "\n".join(lines)
+
+    def flush(self, timeout: float = 30.0) -> bool:
+        """Wait until the queue is drained (or `timeout`); True if nothing is pending."""
+        deadline = time.monotonic() + timeout
+        while self.pending():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            self._wake.set()
+            self._idle.wait(timeout=min(remaining, 0.1))
+        return True
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Stop the worker after a final delivery attempt, waiting at most `timeout`.
+
+        Anything still pending stays in the queue file for the next run.
+        """
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+        if self._thread is None or not self._thread.is_alive():
+            for ch in self.channels:
+                ch.close()
+            with self._db_lock:
+                self._db.close()
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Optional
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import average_precision_score, brier_score_loss, roc_auc_score
+from sqlalchemy import text
+
+from src.modeling.schema import CHURN_SPEC
+from src.monitoring.db import get_engine, insert_daily_metrics, insert_segment_metrics
+
+SegmentRow = tuple[str, int, Optional[float], Optional[float], Optional[float]]
+
+
+def expected_calibration_error(y: np.ndarray, p: np.ndarray, n_bins: int = 10) -> float:
+    bins = np.linspace(0.0, 1.0, n_bins + 1)
+    ece = 0.0
+    for i in range(n_bins):
+        lo, hi = bins[i], bins[i + 1]
+        mask = (p >= lo) & (p < hi) if i < n_bins - 1 else (p >= lo) & (p <= hi)
+        if mask.sum() == 0:
+            continue
+        acc = y[mask].mean()
+        conf = p[mask].mean()
+        ece += (mask.sum() / len(y)) * abs(acc - conf)
+    return float(ece)
+
+
+def psi(expected: np.ndarray, actual: np.ndarray, bins: int = 10) -> float:
+    expected = expected.astype(float)
+    actual = actual.astype(float)
+
+    quantiles = np.quantile(expected, np.linspace(0, 1, bins + 1))
+    quantiles = np.unique(quantiles)
+    if len(quantiles) < 3:
+        return 0.0
+
+    e_counts, _ = np.histogram(expected, bins=quantiles)
+    a_counts, _ = np.histogram(actual, bins=quantiles)
+
+    e_perc = e_counts / max(e_counts.sum(), 1)
+    a_perc = a_counts / max(a_counts.sum(), 1)
+
+    eps = 1e-6
+    e_perc = np.clip(e_perc, eps, 1)
+    a_perc = np.clip(a_perc, eps, 1)
+
+    return float(np.sum((a_perc - e_perc) * np.log(a_perc / e_perc)))
+
+
+def safe_auc(y: np.ndarray, p: np.ndarray) -> tuple[Optional[float], Optional[float]]:
+    if len(np.unique(y)) < 2:
+        return None, None
+    return float(roc_auc_score(y, p)), float(average_precision_score(y, p))
+
+
+def db_watermark(db_url: str) -> str:
+    """Changes whenever a prediction is logged or receives feedback."""
+    q = text(
+        "SELECT COUNT(*), COALESCE(MAX(id), 0), "
+        "COALESCE(SUM(CASE WHEN has_feedback = true THEN 1 ELSE 0 END), 0) FROM predictions"
+    )
+    with get_engine(db_url).connect() as conn:
+        n, max_id, n_fb = conn.execute(q).one()
+    return f"{int(n)}-{int(max_id)}-{int(n_fb)}"
+
+
+def count_predictions(db_url: str) -> tuple[int, int]:
+    """(n_predictions, n_feedback)"""
+    with get_engine(db_url).connect() as conn:
+        n_predictions = int(conn.execute(text("SELECT COUNT(*) FROM predictions")).scalar() or 0)
+        n_feedback = int(conn.execute(text("SELECT COUNT(*) FROM predictions WHERE has_feedback = true")).scalar() or 0)
+    return n_predictions, n_feedback
+
+
+def load_feedback(db_url: str) -> pd.DataFrame:
+    """Request features plus churn_probability and actual_churn for every labeled prediction."""
+    q = text(
+        "SELECT request_json, churn_probability, actual_churn FROM predictions "
+        "WHERE has_feedback = true AND actual_churn IS NOT NULL"
+    )
+    with get_engine(db_url).connect() as conn:
+        rows = conn.execute(q).fetchall()
+    df = pd.DataFrame([json.loads(r[0]) for r in rows])
+    df["churn_probability"] = np.array([float(r[1]) for r in rows])
+    df["actual_churn"] = np.array([int(r[2]) for r in rows], dtype=int)
+    return df
+
+
+def load_recent_requests(db_url: str, n: int) -> pd.DataFrame:
+    q = text("SELECT request_json FROM predictions ORDER BY id DESC LIMIT :n")
+    with get_engine(db_url).connect() as conn:
+        rows = conn.execute(q, {"n": n}).fetchall()
+    return pd.DataFrame([json.loads(r[0]) for r in rows])
+
+
+def performance_metrics(feedback: pd.DataFrame) -> dict[str, Optional[float]]:
+    if feedback.empty:
+        return {"roc_auc": None, "pr_auc": None, "brier": None, "ece": None}
+    probs = feedback["churn_probability"].to_numpy(dtype=float)
+    y = feedback["actual_churn"].to_numpy(dtype=int)
+    roc_auc, pr_auc = safe_auc(y, probs)
+    return {
+        "roc_auc": roc_auc,
+        "pr_auc": pr_auc,
+        "brier": float(brier_score_loss(y, probs)),
+        "ece": expected_calibration_error(y, probs, n_bins=10),
+    }
+
+
+def drift_metrics(baseline: pd.DataFrame, current: pd.DataFrame) -> dict[str, Any]:
+    psi_numeric: dict[str, float] = {}
+    worst_feature = worst_psi = None
+    if not current.empty:
+        for col in CHURN_SPEC.numeric:
+            psi_numeric[col] = psi(baseline[col].to_numpy(), current[col].to_numpy(), bins=10)
+        worst_feature, worst_psi = max(psi_numeric.items(), key=lambda kv: kv[1])
+    return {"psi_numeric": psi_numeric, "worst_feature": worst_feature, "worst_psi": worst_psi}
+
+
+def segment_metrics(feedback: pd.DataFrame, min_seg_n: int = 200) -> dict[str, list[SegmentRow]]:
+    """Per categorical segment: (value, n, roc_auc, pr_auc, brier) for segments with >= min_seg_n rows."""
+    out: dict[str, list[SegmentRow]] = {}
+    if feedback.empty:
+        return out
+    for seg in CHURN_SPEC.categorical:
+        agg_rows: list[SegmentRow] = []
+        for val, g in feedback.groupby(seg):
+            if len(g) < min_seg_n:
+                continue
+            y = g["actual_churn"].to_numpy(dtype=int)
+            p = g["churn_probability"].to_numpy(dtype=float)
+            ra, pa = safe_auc(y, p)
+            agg_rows.append((str(val), int(len(g)), ra, pa, float(brier_score_loss(y, p))))
+        if agg_rows:
+            out[seg] = agg_rows
+    return out
+
+
+def materialize_snapshot(
+    db_url: str,
+    counts: tuple[int, int],
+    performance: dict[str, Optional[float]],
+    drift: dict[str, Any],
+    segments: dict[str, list[SegmentRow]],
+) -> dict[str, Any]:
+    """Write daily + segment metric rows (the tables Grafana reads) and return the snapshot dict."""
+    n_predictions, n_feedback = counts
+    insert_daily_metrics(
+        db_url,
+        n_predictions=n_predictions,
+        n_feedback=n_feedback,
+        worst_feature=drift["worst_feature"],
+        worst_psi=drift["worst_psi"],
+        **performance,
+    )
+    for seg, rows in segments.items():
+        insert_segment_metrics(db_url, seg, rows)
+
+    return {
+        "n_predictions": n_predictions,
+        "n_feedback": n_feedback,
+        "performance": performance,
+        "drift": drift,
+        "segments": {
+            seg: [{"value": v, "n": n, "roc_auc": ra, "pr_auc": pa, "brier": br} for (v, n, ra, pa, br) in rows]
+            for seg, rows in segments.items()
+        },
+        "notes": "AUC metrics require feedback labels. Drift uses recent logged predictions vs baseline train.",
+    }
+
+
+def build_snapshot(db_url: str, baseline_path: str, recent_n: int = 10000, min_seg_n: int = 200) -> dict[str, Any]:
+    """Sequential version of the daily monitoring flow (used by scripts/materialize_metrics.py)."""
+    feedback = load_feedback(db_url)
+    baseline = pd.read_parquet(baseline_path, columns=list(CHURN_SPEC.numeric))
+    return materialize_snapshot(
+        db_url,
+        count_predictions(db_url),
+        performance_metrics(feedback),
+        drift_metrics(baseline, load_recent_requests(db_url, recent_n)),
+        segment_metrics(feedback, min_seg_n),
+    )
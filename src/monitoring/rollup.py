@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from src.modeling.schema import CHURN_SPEC
+from src.monitoring.db import get_engine, replace_hourly_rollups
+
+N_SCORE_BUCKETS = 10
+GROUP_KEYS = ["hour", "model_version", "region"]
+
+
+def floor_hour(ts: datetime) -> datetime:
+    return ts.replace(minute=0, second=0, microsecond=0)
+
+
+def load_predictions_since(db_url: str, since: datetime) -> pd.DataFrame:
+    engine = get_engine(db_url)
+    q = text(
+        "SELECT created_at, request_json, churn_probability, churn_label, model_version, actual_churn "
+        "FROM predictions WHERE created_at >= :since"
+    )
+    with engine.connect() as conn:
+        rows = conn.execute(q, {"since": since}).fetchall()
+
+    cols = ["created_at", "request_json", "churn_probability", "churn_label", "model_version", "actual_churn"]
+    return pd.DataFrame(rows, columns=cols)
+
+
+def compute_hourly_rollups(
+    df: pd.DataFrame, n_buckets: int = N_SCORE_BUCKETS
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]], list[dict[str, Any]]]:
+    """Aggregate raw prediction rows into (metrics, score buckets, feature means) per
+    (hour, model_version, region)."""
+    if df.empty:
+        return [], [], []
+
+    feats = pd.DataFrame([json.loads(s) for s in df["request_json"]])
+    out = pd.DataFrame(
+        {
+            "hour": pd.to_datetime(df["created_at"], utc=True).dt.floor("h"),
+            "model_version": df["model_version"].fillna("").astype(str),
+            "region": feats["region"].fillna("unknown").astype(str) if "region" in feats else "unknown",
+            "p": df["churn_probability"].astype(float),
+            "label": df["churn_label"].astype(int),
+            "actual": pd.to_numeric(df["actual_churn"], errors="coerce"),
+        }
+    )
+    out["bucket"] = np.minimum((out["p"] * n_buckets).astype(int), n_buckets - 1)
+
+    g = out.groupby(GROUP_KEYS, sort=False)
+    metrics_df = g.agg(
+        n_predictions=("p", "size"),
+        n_predicted_churn=("label", "sum"),
+        mean_churn_probability=("p", "mean"),
+        n_feedback=("actual", "count"),
+        n_actual_churn=("actual", "sum"),
+    ).reset_index()
+    metrics_df["n_actual_churn"] = metrics_df["n_actual_churn"].astype(int)
+
+    buckets_df = out.groupby(GROUP_KEYS + ["bucket"], sort=False).size().rename("n").reset_index()
+
+    numeric = [c for c in CHURN_SPEC.numeric if c in feats]
+    means = pd.concat([out[GROUP_KEYS], feats[numeric].apply(pd.to_numeric, errors="coerce")], axis=1)
+    feature_df = (
+        means.groupby(GROUP_KEYS, sort=False)[numeric]
+        .mean()
+        .reset_index()
+        .melt(id_vars=GROUP_KEYS, var_name="feature", value_name="mean")
+    )
+    feature_df["mean"] = feature_df["mean"].astype(object).where(feature_df["mean"].notna(), None)
+
+    def records(frame: pd.DataFrame) -> list[dict[str, Any]]:
+        frame = frame.copy()
+        frame["hour"] = frame["hour"].dt.to_pydatetime()
+        return frame.to_dict("records")
+
+    return records(metrics_df), records(buckets_df), records(feature_df)
+
+
+def refresh_hourly_rollups(db_url: str, lookback_hours: int = 48, now: datetime | None = None) -> dict[str, Any]:
+    """Recompute rollups for the trailing `lookback_hours` whole hours.
+
+    The lookback only needs to cover the window in which feedback can still arrive;
+    older hours are left untouched, so each run scans a bounded slice of `predictions`.
+    """
+    now = now or datetime.now(timezone.utc)
+    since = floor_hour(now - timedelta(hours=lookback_hours))
+
+    df = load_predictions_since(db_url, since)
+    metrics, buckets, feature_means = compute_hourly_rollups(df)
+    replace_hourly_rollups(db_url, since, metrics, buckets, feature_means)
+
+    return {
+        "since": since.isoformat(),
+        "n_rows_scanned": int(len(df)),
+        "n_hourly_metrics": len(metrics),
+        "n_score_buckets": len(buckets),
+        "n_feature_means": len(feature_means),
+    }
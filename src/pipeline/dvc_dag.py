@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import json
+import os
+import posixpath
+import shutil
+import subprocess
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path, PurePosixPath
+from typing import Any, Optional
+
+import yaml
+
+# DVC takes a repo-wide lock for status/commit; calls from parallel stage tasks are
+# serialized here instead of failing with "Unable to acquire lock".
+DVC_LOCK = threading.Lock()
+
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS")
+
+
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    cmd: str
+    deps: tuple[str, ...] = ()
+    outs: tuple[str, ...] = ()  # relative to wdir, like deps
+    wdir: str = "."  # resolved against the dvc.yaml directory
+    persist: tuple[str, ...] = ()  # outs marked `persist: true`, kept across runs
+    upstream: frozenset[str] = field(default_factory=frozenset)
+
+
+def _paths(entries: Optional[list[Any]]) -> tuple[str, ...]:
+    # entries are either "path" or {"path": {cache: false, ...}}
+    out: list[str] = []
+    for e in entries or []:
+        out.extend([e] if isinstance(e, str) else list(e))
+    return tuple(str(PurePosixPath(p)) for p in out)
+
+
+def _persisted(entries: Optional[list[Any]]) -> tuple[str, ...]:
+    return tuple(
+        str(PurePosixPath(p))
+        for e in entries or []
+        if isinstance(e, dict)
+        for p, opts in e.items()
+        if (opts or {}).get("persist")
+    )
+
+
+def _under(path: str, root: str) -> bool:
+    return path == root or path.startswith(root.rstrip("/") + "/") or root.startswith(path.rstrip("/") + "/")
+
+
+def load_stages(dvc_yaml: str | Path = "dvc.yaml") -> dict[str, Stage]:
+    """Stages of dvc.yaml with `upstream` = stages producing (a parent/child of) any dep."""
+    dvc_yaml = Path(dvc_yaml)
+    spec = yaml.safe_load(dvc_yaml.read_text(encoding="utf-8"))["stages"]
+    raw = {
+        name: dict(
+            cmd=s["cmd"] if isinstance(s["cmd"], str) else " && ".join(s["cmd"]),
+            deps=_paths(s.get("deps")),
+            outs=_paths(s.get("outs")) + _paths(s.get("metrics")) + _paths(s.get("plots")),
+            wdir=str(dvc_yaml.parent / s.get("wdir", ".")),
+            persist=_persisted(s.get("outs")) + _persisted(s.get("metrics")) + _persisted(s.get("plots")),
+        )
+        for name, s in spec.items()
+    }
+    # deps/outs are relative to each stage's wdir; compare them relative to dvc.yaml
+    rel = {
+        name: {
+            k: [posixpath.normpath(posixpath.join(s.get("wdir", "."), p)) for p in raw[name][k]]
+            for k in ("deps", "outs")
+        }
+        for name, s in spec.items()
+    }
+    stages: dict[str, Stage] = {}
+    for name, s in raw.items():
+        upstream = {
+            other
+            for other, o in rel.items()
+            if other != name and any(_under(d, out) for d in rel[name]["deps"] for out in o["outs"])
+        }
+        stages[name] = Stage(name=name, upstream=frozenset(upstream), **s)
+    return stages
+
+
+def stage_levels(stages: dict[str, Stage]) -> list[list[str]]:
+    """Topological levels: every stage in a level depends only on earlier levels."""
+    done: set[str] = set()
+    levels: list[list[str]] = []
+    while len(done) < len(stages):
+        ready = sorted(n for n, s in stages.items() if n not in done and s.upstream <= done)
+        if not ready:
+            raise ValueError(f"cycle in dvc.yaml among {sorted(set(stages) - done)}")
+        levels.append(ready)
+        done.update(ready)
+    return levels
+
+
+def threads_per_stage(cpu_budget: int, n_parallel: int) -> int:
+    budget = cpu_budget if cpu_budget > 0 else (os.cpu_count() or 1)
+    return max(1, budget // max(n_parallel, 1))
+
+
+def stage_changed(name: str) -> bool:
+    """True if `dvc status` reports changed deps/outs/cmd for this stage alone."""
+    with DVC_LOCK:
+        res = subprocess.run(["dvc", "status", "--json", name], check=True, capture_output=True, text=True)
+    return bool(json.loads(res.stdout or "{}"))
+
+
+def commit_stage(name: str) -> None:
+    """Save the stage's outs to the DVC cache and record hashes in dvc.lock."""
+    with DVC_LOCK:
+        subprocess.run(["dvc", "commit", "--force", name], check=True, capture_output=True, text=True)
+
+
+def remove_outs(stage: Stage) -> None:
+    """Delete the stage's outs before it runs, as `dvc repro` does, except `persist` ones."""
+    for out in stage.outs:
+        if out in stage.persist:
+            continue
+        path = Path(stage.wdir) / out
+        if path.is_dir() and not path.is_symlink():
+            shutil.rmtree(path)
+        else:
+            path.unlink(missing_ok=True)
+
+
+def run_stage(stage: Stage, threads: int, force: bool = False) -> dict[str, Any]:
+    """Run one stage's cmd (skipped if up to date) with BLAS/OpenMP pools capped at `threads`.
+
+    XGBoost's n_jobs=-1 resolves to omp_get_max_threads(), so OMP_NUM_THREADS bounds it.
+    """
+    if not force and not stage_changed(stage.name):
+        return {"stage": stage.name, "status": "up-to-date", "threads": threads, "wall_seconds": 0.0}
+
+    remove_outs(stage)
+
+    env = {**os.environ, **{v: str(threads) for v in THREAD_ENV_VARS}}
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(stage.cmd, shell=True, cwd=stage.wdir, env=env)
+    # wait4 gives this child's own rusage (RUSAGE_CHILDREN would mix parallel stages)
+    _, status, ru = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    wall = time.perf_counter() - t0
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, stage.cmd)
+
+    commit_stage(stage.name)
+    return {
+        "stage": stage.name,
+        "status": "ran",
+        "threads": threads,
+        "wall_seconds": wall,
+        "cpu_seconds": ru.ru_utime + ru.ru_stime,
+        "max_rss_mb": ru.ru_maxrss / 1024,
+    }
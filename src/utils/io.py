@@ -18,3 +18,12 @@ def write_json(path: str | Path, obj: Any) -> None:
 
 def read_json(path: str | Path) -> Any:
     return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def read_parquet_head(path: str | Path, n: int) -> Any:
+    """First `n` rows of a parquet file as a DataFrame, reading only the first batch."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    batch = next(pq.ParquetFile(path).iter_batches(batch_size=n), None)
+    return pa.Table.from_batches([batch]).to_pandas() if batch is not None else pq.read_table(path).to_pandas()
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import resource
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Iterator, Optional
+
+
+@dataclass(frozen=True)
+class StageStats:
+    stage: str
+    wall_seconds: float
+    cpu_seconds: float
+    peak_rss_mb: float
+
+
+def _vm_hwm_mb() -> Optional[float]:
+    try:
+        for line in Path("/proc/self/status").read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def _reset_peak_rss() -> bool:
+    """Reset the kernel's RSS high-water mark (Linux >= 4.0); False if unsupported."""
+    try:
+        Path("/proc/self/clear_refs").write_text("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_mb() -> float:
+    hwm = _vm_hwm_mb()
+    if hwm is not None:
+        return hwm
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, KiB on Linux
+    return maxrss / 1024**2 if sys.platform == "darwin" else maxrss / 1024
+
+
+class StageTimer:
+    """Per-stage wall time, process CPU time and peak RSS.
+
+    CPU time is process-wide, so it includes XGBoost/BLAS worker threads
+    (cpu_seconds / wall_seconds ~ effective cores used). Peak RSS is per stage where
+    /proc/self/clear_refs is writable; otherwise it is the process high-water mark
+    at the end of the stage. A disabled timer records nothing.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.stages: list[StageStats] = []
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        if not self.enabled:
+            yield
+            return
+        _reset_peak_rss()
+        w0, c0 = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            self.stages.append(
+                StageStats(
+                    stage=name,
+                    wall_seconds=time.perf_counter() - w0,
+                    cpu_seconds=time.process_time() - c0,
+                    peak_rss_mb=peak_rss_mb(),
+                )
+            )
+
+    def to_dict(self) -> list[dict[str, float | str]]:
+        return [asdict(s) for s in self.stages]
+
+    def as_metrics(self, prefix: str = "profile") -> dict[str, float]:
+        """Flat `{prefix}_{stage}_{field}` dict for mlflow.log_metrics."""
+        out: dict[str, float] = {}
+        for s in self.stages:
+            out[f"{prefix}_{s.stage}_wall_seconds"] = s.wall_seconds
+            out[f"{prefix}_{s.stage}_cpu_seconds"] = s.cpu_seconds
+            out[f"{prefix}_{s.stage}_peak_rss_mb"] = s.peak_rss_mb
+        return out
+
+    def table(self) -> str:
+        rows = ["| stage | wall s | cpu s | peak RSS MB |", "|---|---|---|---|"]
+        rows += [
+            f"| {s.stage} | {s.wall_seconds:.2f} | {s.cpu_seconds:.2f} | {s.peak_rss_mb:.0f} |" for s in self.stages
+        ]
+        return "\n".join(rows)
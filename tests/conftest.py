@@ -0,0 +1,53 @@
+from pathlib import Path
+from typing import Any, NamedTuple
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.modeling.artifact import export_serving_artifact
+from src.modeling.schema import CHURN_SPEC
+from src.modeling.train import fit_model
+
+
+def _frame(n: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "tenure_months": rng.integers(0, 72, n).astype(float),
+            "monthly_charges": rng.normal(75, 25, n),
+            "total_charges": rng.normal(2000, 500, n),
+            "tickets_90d": rng.poisson(1.2, n).astype(float),
+            "contract_type": rng.choice(["month-to-month", "one-year"], n),
+            "payment_method": rng.choice(["cash", "paypal"], n),
+            "internet_service": rng.choice(["fiber", "dsl"], n),
+            "region": rng.choice(["NE", "SE"], n),
+            "churn": rng.integers(0, 2, n),
+        }
+    )
+
+
+@pytest.fixture
+def churn_frame():
+    """Factory for small synthetic frames shaped like data/processed/train.parquet."""
+    return _frame
+
+
+class ServedModel(NamedTuple):
+    pipe: Any
+    path: Path
+    frame: pd.DataFrame
+
+
+@pytest.fixture(scope="session")
+def serving_model(tmp_path_factory) -> ServedModel:
+    """A small pipeline fitted once per session, its serving artifact and its training frame.
+
+    Shared across tests: build a `ServingModel(path)` per test and deepcopy `pipe` before
+    changing its parameters.
+    """
+    df = _frame(1500, 0)
+    df["monthly_charges"] = df["monthly_charges"].abs()  # PredictRequest rejects negatives
+    pipe, _ = fit_model(df, {"n_estimators": 20, "max_depth": 3})
+    path = export_serving_artifact(pipe, CHURN_SPEC, tmp_path_factory.mktemp("serving"))
+    return ServedModel(pipe, path, df)
@@ -0,0 +1,90 @@
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from src.api.admission import AdmissionController, TokenBucket
+
+
+def _app(delay: float, **kwargs) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/predict")
+    def predict():  # sync, so it runs on the threadpool like the real endpoint
+        time.sleep(delay)
+        return {"ok": True}
+
+    @app.get("/health")
+    def health():
+        return {"status": "ok"}
+
+    app.add_middleware(AdmissionController, **kwargs)
+    return app
+
+
+async def _burst(app: FastAPI, n: int, health_during: bool = False):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        tasks = [asyncio.create_task(client.post("/predict")) for _ in range(n)]
+        health = None
+        if health_during:
+            await asyncio.sleep(0.05)
+            health = await client.get("/health")
+        return await asyncio.gather(*tasks), health
+
+
+def test_bounded_queue_sheds_with_retry_after_and_spares_health():
+    app = _app(0.2, max_concurrency=1, max_queue=2, deadline=5.0)
+    responses, health = asyncio.run(_burst(app, 6, health_during=True))
+    codes = sorted(r.status_code for r in responses)
+    assert codes == [200, 200, 200, 503, 503, 503]
+    shed = next(r for r in responses if r.status_code == 503)
+    assert int(shed.headers["retry-after"]) >= 1
+    assert health.status_code == 200
+
+
+def test_expected_wait_past_deadline_is_shed_immediately():
+    app = _app(0.3, max_concurrency=1, max_queue=10, deadline=0.2)
+    controller = app.build_middleware_stack()  # outermost is the admission layer
+    while not isinstance(controller, AdmissionController):
+        controller = controller.app
+    controller.service_time = 0.3  # learned from earlier traffic
+
+    async def run():
+        transport = httpx.ASGITransport(app=controller)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = asyncio.create_task(client.post("/predict"))
+            await asyncio.sleep(0.05)
+            t0 = time.perf_counter()
+            second = await client.post("/predict")
+            waited = time.perf_counter() - t0
+            return (await first).status_code, second, waited
+
+    first, second, waited = asyncio.run(run())
+    assert first == 200 and second.status_code == 503
+    assert waited < 0.1  # rejected up front, not after queueing
+
+
+def test_token_bucket_per_client():
+    bucket = TokenBucket(rate=1.0, burst=2)
+    assert bucket.take("a", now=0.0) == 0 and bucket.take("a", now=0.0) == 0
+    assert bucket.take("a", now=0.0) == 1.0
+    assert bucket.take("b", now=0.0) == 0  # other clients are independent
+    assert bucket.take("a", now=1.0) == 0  # refilled
+
+
+def test_rate_limited_clients_get_429():
+    app = _app(0.0, max_concurrency=4, max_queue=4, rate_limiter=TokenBucket(rate=0.5, burst=1))
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            a1 = await client.post("/predict", headers={"X-API-Key": "a"})
+            a2 = await client.post("/predict", headers={"X-API-Key": "a"})
+            b1 = await client.post("/predict", headers={"X-API-Key": "b"})
+            return a1, a2, b1
+
+    a1, a2, b1 = asyncio.run(run())
+    assert (a1.status_code, a2.status_code, b1.status_code) == (200, 429, 200)
+    assert a2.headers["retry-after"] == "2"
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import json
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from src.monitoring.alerting import evaluate_drift_alert, notify_drift_alert
+from src.monitoring.dispatcher import Alert, AlertDispatcher, EmailChannel, SlackChannel
+
+
+class _SlackStub(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so connection reuse is observable
+    posts: list[dict] = []
+    connections: set = set()
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        type(self).posts.append(json.loads(body))
+        type(self).connections.add(self.client_address)
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+
+class _SMTPStub(socketserver.StreamRequestHandler):
+    """Just enough SMTP for smtplib without STARTTLS/AUTH."""
+
+    messages: list[str] = []
+    connections = 0
+
+    def handle(self):
+        type(self).connections += 1
+        self.wfile.write(b"220 stub\r\n")
+        while line := self.rfile.readline():
+            cmd = line.decode().strip().upper()
+            if cmd.startswith(("EHLO", "HELO")):
+                self.wfile.write(b"250 stub\r\n")
+            elif cmd == "DATA":
+                self.wfile.write(b"354 go\r\n")
+                data = []
+                while (ln := self.rfile.readline()) not in (b".\r\n", b""):
+                    data.append(ln.decode())
+                type(self).messages.append("".join(data))
+                self.wfile.write(b"250 queued\r\n")
+            elif cmd == "QUIT":
+                self.wfile.write(b"221 bye\r\n")
+                return
+            else:  # MAIL, RCPT, NOOP, RSET
+                self.wfile.write(b"250 ok\r\n")
+
+
+@pytest.fixture()
+def stubs():
+    _SlackStub.posts, _SlackStub.connections = [], set()
+    _SMTPStub.messages, _SMTPStub.connections = [], 0
+    http = HTTPServer(("127.0.0.1", 0), _SlackStub)
+    smtp = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _SMTPStub)
+    smtp.daemon_threads = True
+    for srv in (http, smtp):
+        threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield http.server_address[1], smtp.server_address[1]
+    http.shutdown()
+    smtp.shutdown()
+    smtp.server_close()
+
+
+def _channels(http_port: int, smtp_port: int):
+    return [
+        SlackChannel(f"http://127.0.0.1:{http_port}/hook"),
+        EmailChannel("127.0.0.1", smtp_port, "mlops@example.com", ["oncall@example.com"], use_starttls=False),
+    ]
+
+
+def test_digest_suppression_and_connection_reuse(tmp_path, stubs):
+    d = AlertDispatcher(tmp_path / "q.db", channels=_channels(*stubs), digest_seconds=0.3)
+    assert d.submit(Alert("drift", "PSI high on tenure", feature="tenure_months", model_version="3"))
+    assert d.submit(Alert("drift", "PSI high on charges", feature="monthly_charges", model_version="3"))
+    assert not d.submit(Alert("drift", "PSI high on tenure again", feature="tenure_months", model_version="3"))
+    assert d.submit(Alert("drift", "PSI high on tenure, new model", feature="tenure_months", model_version="4"))
+    assert d.flush(timeout=10)
+
+    # three alerts in one digest per channel
+    assert len(_SlackStub.posts) == 1
+    assert "3 alerts" in _SlackStub.posts[0]["text"]
+    assert len(_SMTPStub.messages) == 1 and "3 alerts" in _SMTPStub.messages[0]
+
+    d.submit(Alert("performance", "ROC-AUC below floor", model_version="4"))
+    assert d.flush(timeout=10)
+    d.close()
+    assert len(_SlackStub.posts) == 2 and len(_SMTPStub.messages) == 2
+    assert len(_SlackStub.connections) == 1
+    assert _SMTPStub.connections == 1
+
+
+def test_undelivered_alerts_persist_for_next_run(tmp_path, stubs):
+    queue = tmp_path / "q.db"
+    d = AlertDispatcher(queue, channels=[SlackChannel("http://127.0.0.1:9/unreachable", timeout=0.5)], digest_seconds=0)
+    d.submit(Alert("drift", "PSI high", feature="tenure_months"))
+    d.close(timeout=5)
+    assert _SlackStub.posts == []
+
+    d = AlertDispatcher(queue, channels=_channels(*stubs), digest_seconds=0)
+    assert d.pending() == 1
+    assert d.flush(timeout=10)
+    d.close()
+    assert len(_SlackStub.posts) == 1 and "PSI high" in _SlackStub.posts[0]["text"]
+
+
+def test_notify_drift_alert_suppresses_repeat_runs(tmp_path, stubs):
+    report = {"psi_numeric": {"tenure_months": 0.4, "monthly_charges": 0.3, "num_support_tickets": 0.01}}
+    alert = evaluate_drift_alert(report, threshold=0.25)
+    assert list(alert["drifting_features"]) == ["tenure_months", "monthly_charges"]
+
+    for _ in range(2):  # the second run sees the same drift and stays quiet
+        d = AlertDispatcher(tmp_path / "q.db", channels=_channels(*stubs), digest_seconds=5)
+        assert notify_drift_alert(alert, slack=True, model_version="3", dispatcher=d)
+        d.close()  # does not wait out the digest window
+    assert len(_SlackStub.posts) == 1
+    assert "tenure_months" in _SlackStub.posts[0]["text"] and "monthly_charges" in _SlackStub.posts[0]["text"]
+
+
+def test_notify_without_dispatcher_only_queues(tmp_path, stubs, monkeypatch):
+    monkeypatch.setenv("SLACK_WEBHOOK_URL", f"http://127.0.0.1:{stubs[0]}/hook")
+    alert = evaluate_drift_alert({"psi_numeric": {"tenure_months": 0.4}}, threshold=0.25)
+    queue = tmp_path / "q.db"
+    t0 = time.monotonic()
+    assert notify_drift_alert(alert, slack=True, queue_path=str(queue))
+    assert time.monotonic() - t0 < 1.0 and _SlackStub.posts == []
+
+    d = AlertDispatcher(queue, channels=_channels(*stubs), digest_seconds=0)  # e.g. scripts/deliver_alerts.py
+    assert d.flush(timeout=10)
+    d.close()
+    assert len(_SlackStub.posts) == 1 and "tenure_months" in _SlackStub.posts[0]["text"]
+
+
+class _FlakyChannel:
+    name = "email"
+
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.sent: list[str] = []
+
+    def send(self, subject, body):
+        if self.failures:
+            self.failures -= 1
+            raise OSError("smtp down")
+        self.sent.append(body)
+
+    def close(self):
+        pass
+
+
+def test_retry_only_resends_to_failed_channel(tmp_path, stubs):
+    flaky = _FlakyChannel(failures=1)
+    channels = [SlackChannel(f"http://127.0.0.1:{stubs[0]}/hook"), flaky]
+    d = AlertDispatcher(tmp_path / "q.db", channels=channels, digest_seconds=0, retry_seconds=0.1)
+    d.submit(Alert("drift", "PSI high", feature="tenure_months"))
+    assert d.flush(timeout=10)
+    d.close()
+    assert len(_SlackStub.posts) == 1  # not sent again when email was retried
+    assert len(flaky.sent) == 1 and "PSI high" in flaky.sent[0]
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from src.api.profiling import RequestProfiler, profiled, register_profiling_routes
+
+
+class Payload(BaseModel):
+    n: int
+
+
+def _busy(seconds: float) -> int:
+    end, i = time.perf_counter() + seconds, 0
+    while time.perf_counter() < end:
+        i += 1
+    return i
+
+
+def _app(profiler):
+    app = FastAPI()
+
+    @app.post("/work")
+    @profiled(profiler, "/work")
+    def work(req: Payload):
+        return {"iters": _busy(req.n / 1000)}
+
+    if profiler is not None:
+        register_profiling_routes(app, profiler)
+    return app, work
+
+
+def test_disabled_is_a_no_op():
+    app, work = _app(None)
+    assert not hasattr(work, "__wrapped__")
+    assert all(not r.path.startswith("/admin") for r in app.routes)
+
+
+def test_request_sampling_keeps_slowest(monkeypatch):
+    monkeypatch.setenv("ADMIN_TOKEN", "s3cret")
+    profiler = RequestProfiler(sample_rate=1.0, keep=2, interval=0.001)
+    client = TestClient(_app(profiler)[0])
+    for ms in (30, 5, 60, 10):
+        assert client.post("/work", json={"n": ms}).status_code == 200
+
+    assert client.get("/admin/profile/requests").status_code == 403
+    headers = {"X-Admin-Token": "s3cret"}
+    profiles = client.get("/admin/profile/requests", headers=headers).json()["profiles"]
+    assert len(profiles) == 2
+    assert profiles[0]["duration_ms"] >= 60 and profiles[1]["duration_ms"] >= 30
+    assert profiles[0]["n_samples"] > 0
+
+    stacks = client.get(f"/admin/profile/requests/{profiles[0]['id']}", headers=headers).text
+    assert "_busy" in stacks  # sampled on the threadpool thread that ran the endpoint
+    doc = client.get(f"/admin/profile/requests/{profiles[0]['id']}?format=speedscope", headers=headers).json()
+    assert doc["profiles"][0]["type"] == "sampled"
+    assert any(f["name"] == "_busy" for f in doc["shared"]["frames"])
+
+
+def test_process_profile_sees_threadpool_work(monkeypatch):
+    import threading
+
+    monkeypatch.setenv("ADMIN_TOKEN", "s3cret")
+    client = TestClient(_app(RequestProfiler(sample_rate=0.0))[0])
+    t = threading.Thread(target=lambda: client.post("/work", json={"n": 400}))
+    t.start()
+    out = client.post("/admin/profile?seconds=0.2&interval_ms=2", headers={"X-Admin-Token": "s3cret"}).text
+    t.join()
+    assert "_busy" in out
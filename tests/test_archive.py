@@ -0,0 +1,72 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import text
+
+import src.monitoring.archive as archive
+from src.monitoring.archive import archive_predictions, load_predictions
+from src.monitoring.db import add_feedback, get_engine, init_db, insert_prediction
+
+REQ = {
+    "tenure_months": 12.0,
+    "monthly_charges": 70.0,
+    "total_charges": 840.0,
+    "tickets_90d": 0.0,
+    "contract_type": "one-year",
+    "payment_method": "paypal",
+    "internet_service": "dsl",
+    "region": "MW",
+}
+
+
+def test_archive_moves_old_rows_and_reads_across_tiers(tmp_path):
+    db_url = f"sqlite:///{tmp_path / 'monitoring.db'}"
+    archive_dir = tmp_path / "archive"
+    init_db(db_url)
+    ids = [insert_prediction(db_url, REQ, 0.1 * (i + 1), 0, "m", "1") for i in range(4)]
+    add_feedback(db_url, ids[0], 1)
+    add_feedback(db_url, ids[3], 0)
+
+    old = datetime.now(timezone.utc) - timedelta(days=120)
+    with get_engine(db_url).begin() as conn:
+        conn.execute(text("UPDATE predictions SET created_at = :t WHERE id <= :i"), {"t": old, "i": ids[1]})
+
+    summary = archive_predictions(db_url, archive_dir, cutoff=old + timedelta(days=1), batch_size=1)
+    assert summary["n_archived"] == 2
+    assert all(f"date={old:%Y-%m-%d}" in f for f in summary["files"])
+
+    with get_engine(db_url).connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM predictions")).scalar() == 2
+
+    everything = load_predictions(db_url, ["id", "region", "churn_probability"], archive_dir=archive_dir)
+    assert sorted(everything["id"]) == ids
+    assert set(everything["region"].astype(str)) == {"MW"}
+
+    feedback = load_predictions(db_url, ["id", "actual_churn"], archive_dir=archive_dir, feedback_only=True)
+    assert sorted(feedback["id"]) == [ids[0], ids[3]]
+
+    recent = load_predictions(
+        db_url, ["id"], archive_dir=archive_dir, since=datetime.now(timezone.utc) - timedelta(days=1)
+    )
+    assert sorted(recent["id"]) == ids[2:]
+
+
+def test_archive_fsyncs_files_before_deleting_rows(tmp_path, monkeypatch):
+    db_url = f"sqlite:///{tmp_path / 'monitoring.db'}"
+    archive_dir = tmp_path / "archive"
+    init_db(db_url)
+    insert_prediction(db_url, REQ, 0.5, 1, "m", "1")
+
+    synced: list = []
+    real_fsync = archive._fsync
+
+    def spy(path):
+        with get_engine(db_url).connect() as conn:
+            synced.append((path, conn.execute(text("SELECT COUNT(*) FROM predictions")).scalar()))
+        real_fsync(path)
+
+    monkeypatch.setattr(archive, "_fsync", spy)
+    summary = archive_predictions(db_url, archive_dir, cutoff=datetime.now(timezone.utc) + timedelta(days=1))
+
+    paths = [str(p) for p, _ in synced]
+    assert summary["files"][0] in paths and str(archive_dir) in paths
+    assert all(n == 1 for _, n in synced)  # every fsync happened while the row was still there
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from src.modeling.artifact import ServingModel
+from src.modeling.batch_scoring import feature_hash, feature_hashes, score_customers
+from src.monitoring.db import get_customer_score, init_db
+
+
+@pytest.fixture
+def scored(serving_model, tmp_path):
+    model = ServingModel(serving_model.path)
+
+    customers = serving_model.frame.drop(columns=["churn"]).head(500)
+    customers.insert(0, "customer_id", [f"C{i:05d}" for i in range(len(customers))])
+    customers.to_parquet(tmp_path / "customers.parquet")
+    db_url = f"sqlite:///{tmp_path / 'scores.db'}"
+    init_db(db_url)
+    stats = score_customers(model, tmp_path / "customers.parquet", db_url, "3", batch_rows=128)
+    return model, customers, db_url, stats
+
+
+def test_batch_hash_matches_row_hash(churn_frame):
+    df = churn_frame(50, 1).drop(columns=["churn"])
+    rows = df.to_dict(orient="records")
+    assert feature_hashes(df) == [feature_hash(r) for r in rows]
+    # ints from a JSON request hash like the float64 parquet column
+    assert feature_hash({**rows[0], "tenure_months": int(rows[0]["tenure_months"])}) == feature_hash(rows[0])
+
+
+def test_score_customers_writes_lookup_rows(scored):
+    model, customers, db_url, stats = scored
+    assert stats["rows"] == 500
+    row = get_customer_score(db_url, "C00042")
+    features = customers.drop(columns=["customer_id"]).iloc[42]
+    assert row.model_version == "3"
+    assert row.feature_hash == feature_hash(features.to_dict())
+    assert row.churn_probability == pytest.approx(float(model.predict_proba([features.to_dict()])[0]), abs=1e-6)
+
+
+def test_score_endpoint_serves_precomputed_or_falls_back(scored, monkeypatch):
+    import src.api.main as api
+
+    model, customers, db_url, _ = scored
+    monkeypatch.setenv("SCORE_DB_URL", db_url)
+    monkeypatch.delenv("MONITORING_DB_URL", raising=False)
+    version = {"v": "3"}
+    monkeypatch.setattr(api, "get_model", lambda: (model, "local:test", version["v"]))
+    client = TestClient(api.app)
+
+    features = customers.drop(columns=["customer_id"]).iloc[7].to_dict()
+    stored = get_customer_score(db_url, "C00007").churn_probability
+
+    r = client.post("/score/C00007", json=features).json()
+    assert r["source"] == "precomputed" and r["churn_probability"] == stored
+
+    changed = {**features, "tickets_90d": features["tickets_90d"] + 3}
+    r = client.post("/score/C00007", json=changed).json()
+    assert r["source"] == "live"
+    assert np.isclose(r["churn_probability"], model.predict_proba([changed])[0])
+
+    assert client.post("/score/NOPE", json=features).json()["source"] == "live"
+    version["v"] = "4"  # champion moved: nightly scores are stale
+    assert client.post("/score/C00007", json=features).json()["source"] == "live"
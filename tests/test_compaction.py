@@ -0,0 +1,33 @@
+import numpy as np
+import xgboost as xgb
+
+from src.modeling.train import compact_model, fit_model
+
+
+def _with_signal(df, seed):
+    rng = np.random.default_rng(seed)
+    logit = 0.8 * df["tickets_90d"] - 0.04 * df["tenure_months"] + (df["contract_type"] == "month-to-month") + rng.normal(0, 1, len(df))
+    return df.assign(churn=(logit > 0.5).astype(int))
+
+
+def test_compaction_keeps_leading_trees_within_auc_tolerance(churn_frame):
+    pipe, _ = fit_model(_with_signal(churn_frame(3000, 0), 0), {"n_estimators": 80, "max_depth": 3, "learning_rate": 0.3})
+    val = _with_signal(churn_frame(1500, 1), 1)
+    X_val, y_val = val.drop(columns=["churn"]), val["churn"].to_numpy()
+
+    compact, report = compact_model(pipe, X_val, y_val, max_auc_drop=0.005, step=5, latency_rows=200, latency_repeats=20)
+    n = report["compact"]["n_trees"]
+    assert n < 80 and report["full"]["n_trees"] == 80
+    assert report["auc_delta"] >= -0.005
+    # smallest candidate within tolerance: the one before it falls outside
+    smaller = [c for c in report["curve"] if c["n_trees"] < n]
+    assert all(c["roc_auc"] < report["full"]["roc_auc"] - 0.005 for c in smaller)
+
+    booster = pipe.named_steps["model"].get_booster()
+    expected = booster.predict(xgb.DMatrix(pipe.named_steps["preprocess"].transform(X_val)), iteration_range=(0, n))
+    np.testing.assert_allclose(compact.predict_proba(X_val)[:, 1], expected, rtol=1e-6)
+    assert compact.named_steps["model"].get_booster().num_boosted_rounds() == n
+
+    sizes = [p["n_trees"] for p in report["latency_vs_auc"]]
+    assert n in sizes and 80 in sizes
+    assert all(p["single_row_p50_ms"] > 0 and p["batch_p50_ms"] > 0 for p in report["latency_vs_auc"])
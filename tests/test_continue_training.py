@@ -0,0 +1,22 @@
+import numpy as np
+import xgboost as xgb
+
+from src.modeling.train import continue_training, fit_model
+
+
+def test_continue_training_appends_rounds_and_reuses_preprocessor(churn_frame):
+    base, _ = fit_model(churn_frame(1000, 0), {"n_estimators": 10, "max_depth": 3})
+    fresh = churn_frame(500, 1)
+
+    pipe = continue_training(base, fresh, extra_rounds=5)
+    booster = pipe.named_steps["model"].get_booster()
+    assert booster.num_boosted_rounds() == 15
+    assert base.named_steps["model"].get_booster().num_boosted_rounds() == 10  # champion untouched
+    assert pipe.named_steps["preprocess"] is base.named_steps["preprocess"]
+
+    # the first 10 trees are the champion's
+    X = fresh.drop(columns=["churn"])
+    dm = xgb.DMatrix(base.named_steps["preprocess"].transform(X))
+    head = booster.predict(dm, iteration_range=(0, 10), output_margin=True)
+    np.testing.assert_allclose(head, base.named_steps["model"].get_booster().predict(dm, output_margin=True), rtol=1e-6)
+    assert not np.allclose(pipe.predict_proba(X)[:, 1], base.predict_proba(X)[:, 1])
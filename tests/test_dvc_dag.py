@@ -0,0 +1,51 @@
+from pathlib import Path
+
+from src.pipeline.dvc_dag import load_stages, remove_outs, stage_levels, threads_per_stage
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_repo_pipeline_runs_train_and_drift_report_in_parallel():
+    stages = load_stages(ROOT / "dvc.yaml")
+    assert stages["preprocess"].upstream == {"make_data"}
+    # data/processed/train.parquet is under the preprocess out data/processed
+    assert stages["drift_report"].upstream == {"preprocess"}
+    assert stage_levels(stages) == [["make_data"], ["preprocess"], ["drift_report", "train_local"]]
+
+
+def test_wdir_is_relative_to_dvc_yaml_and_persist_outs_survive(tmp_path):
+    (tmp_path / "dvc.yaml").write_text(
+        """
+stages:
+  make:
+    cmd: python make.py
+    wdir: sub
+    outs:
+      - ../data/raw
+      - cache.db:
+          persist: true
+  use:
+    cmd: python use.py
+    deps:
+      - data/raw/x.csv
+    outs:
+      - out.txt
+"""
+    )
+    stages = load_stages(tmp_path / "dvc.yaml")
+    assert Path(stages["make"].wdir) == tmp_path / "sub"
+    assert stages["use"].upstream == {"make"}
+    assert stages["make"].persist == ("cache.db",)
+
+    (tmp_path / "data" / "raw").mkdir(parents=True)
+    (tmp_path / "data" / "raw" / "x.csv").write_text("stale")
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "cache.db").write_text("kept")
+    remove_outs(stages["make"])
+    assert not (tmp_path / "data" / "raw").exists()
+    assert (tmp_path / "sub" / "cache.db").read_text() == "kept"
+
+
+def test_threads_split_budget_without_oversubscribing():
+    assert threads_per_stage(8, 2) == 4
+    assert threads_per_stage(3, 4) == 1
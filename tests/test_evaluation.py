@@ -0,0 +1,43 @@
+import numpy as np
+from sklearn.metrics import roc_auc_score
+
+from src.modeling.evaluation import compare_to_champion, weighted_auc
+from src.modeling.retrain import choose_promotion
+
+
+def test_weighted_auc_matches_sklearn_on_resampled_rows_with_ties():
+    rng = np.random.default_rng(0)
+    y = rng.integers(0, 2, 500)
+    p = np.round(rng.random(500) * 0.6 + 0.3 * y, 1)  # heavy ties
+    w = rng.poisson(1.0, size=(3, 500))
+
+    got = weighted_auc(p, y, w.astype(float))
+    for b in range(3):
+        idx = np.repeat(np.arange(500), w[b])
+        assert np.isclose(got[b], roc_auc_score(y[idx], p[idx]))
+
+
+def test_compare_to_champion_reports_paired_delta_ci():
+    rng = np.random.default_rng(1)
+    y = rng.integers(0, 2, 2000)
+    champ = rng.random(2000) * 0.5 + 0.3 * y
+    better = champ + 0.2 * y
+
+    report = compare_to_champion(y, {"champion": champ, "better": better}, n_boot=200)
+    assert report["better"]["delta_roc_auc"] > 0
+    assert 0 < report["better"]["delta_ci_low"] <= report["better"]["delta_roc_auc"] <= report["better"]["delta_ci_high"]
+
+
+def test_choose_promotion_picks_best_significant_challenger():
+    comparison = {
+        "champion": {"roc_auc": 0.70},
+        "new": {"roc_auc": 0.71, "delta_roc_auc": 0.01, "delta_ci_low": -0.002},
+        "models:/m/3": {"roc_auc": 0.74, "delta_roc_auc": 0.04, "delta_ci_low": 0.01},
+        "models:/m/4": {"roc_auc": 0.75, "delta_roc_auc": 0.05, "delta_ci_low": -0.01},  # best but not significant
+    }
+    candidates = ["new", "models:/m/3", "models:/m/4"]
+    assert choose_promotion(comparison, candidates, True, promote_delta=0.002) == "models:/m/3"
+    assert choose_promotion(comparison, ["new", "models:/m/4"], True, promote_delta=0.002) == "new"
+    assert choose_promotion(comparison, ["new", "models:/m/4"], True, promote_delta=0.002, require_ci=True) is None
+    assert choose_promotion(comparison, candidates, True, promote_delta=0.05) is None
+    assert choose_promotion(comparison, candidates, False, promote_delta=0.002) == "new"
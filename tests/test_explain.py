@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from src.modeling.artifact import ServingModel, export_serving_artifact
+from src.modeling.explain import Explainer, explainer_for
+from src.modeling.schema import CHURN_SPEC
+from src.modeling.train import fit_model
+
+FEATURES = list(CHURN_SPEC.numeric) + list(CHURN_SPEC.categorical)
+
+
+@pytest.mark.parametrize("encoding", ["onehot", "native"])
+def test_contributions_sum_to_margin_per_original_feature(churn_frame, tmp_path, encoding):
+    df = churn_frame(2000, 0)
+    pipe, _ = fit_model(df, {"n_estimators": 20, "max_depth": 3}, encoding=encoding)
+    model = ServingModel(export_serving_artifact(pipe, CHURN_SPEC, tmp_path))
+    rows = df.drop(columns=["churn"]).head(50).to_dict(orient="records")
+
+    ex = Explainer(model, model_version="1")
+    contrib = ex.contributions(rows)
+    assert contrib.shape == (50, len(FEATURES) + 1)
+    margin = contrib.sum(axis=1)
+    np.testing.assert_allclose(1 / (1 + np.exp(-margin)), model.predict_proba(rows), atol=1e-5)
+
+    out = ex.explain(rows[:2], top_k=3)
+    assert [len(o["top_features"]) for o in out] == [3, 3]
+    assert {f["feature"] for o in out for f in o["top_features"]} <= set(FEATURES)
+    mags = [abs(f["contribution"]) for f in out[0]["top_features"]]
+    assert mags == sorted(mags, reverse=True)
+
+
+def test_cache_by_model_version_and_input(serving_model):
+    ex = explainer_for(serving_model.pipe, model_version="7")  # pickled pipeline is converted once
+    rows = serving_model.frame.drop(columns=["churn"]).head(20).to_dict(orient="records")
+
+    first = ex.contributions(rows)
+    assert (ex.hits, ex.misses) == (0, 20)
+    again = ex.contributions(rows[:5] + [{**rows[0], "tickets_90d": rows[0]["tickets_90d"] + 1}])
+    assert (ex.hits, ex.misses) == (5, 21)
+    np.testing.assert_array_equal(again[:5], first[:5])
+
+    artifact_dir = ex.model.path
+    assert artifact_dir.exists()
+    ex.close()
+    assert not artifact_dir.exists()
+
+
+def test_explain_endpoints(serving_model, monkeypatch):
+    import src.api.main as api
+
+    df = serving_model.frame
+    model = ServingModel(serving_model.path)
+    monkeypatch.setattr(api, "get_model", lambda: (model, "local:test", "5"))
+    monkeypatch.setattr(api, "_explainer", None)
+    client = TestClient(api.app)
+    rows = df.drop(columns=["churn"]).head(3).to_dict(orient="records")
+
+    single = client.post("/explain?top_k=2", json=rows[0]).json()
+    assert single["model_version"] == "5" and len(single["explanations"][0]["top_features"]) == 2
+    assert single["explanations"][0]["churn_probability"] == pytest.approx(float(model.predict_proba(rows[:1])[0]), abs=1e-5)
+
+    batch = client.post("/explain/batch", json={"rows": rows, "top_k": 4}).json()
+    assert len(batch["explanations"]) == 3
+    assert batch["explanations"][0]["top_features"][:2] == single["explanations"][0]["top_features"]
@@ -0,0 +1,71 @@
+import argparse
+import os
+import time
+
+import numpy as np
+
+from src.features.cache import FeatureMatrixCache, add_cache_args, cache_from_args
+from src.modeling.schema import CHURN_SPEC
+
+
+def test_cache_hit_matches_encoding_and_evicts_lru(tmp_path, churn_frame):
+    paths = []
+    for i in range(2):
+        p = tmp_path / f"train_{i}.parquet"
+        churn_frame(400, seed=i).to_parquet(p, index=False)
+        paths.append(p)
+
+    cache = FeatureMatrixCache(tmp_path / "cache")
+    first = cache.get_or_encode(paths[0], CHURN_SPEC)
+    again = cache.get_or_encode(paths[0], CHURN_SPEC)
+    assert isinstance(again.X_train, np.memmap)
+    np.testing.assert_array_equal(np.asarray(first.X_train), np.asarray(again.X_train))
+    np.testing.assert_array_equal(first.y_val, again.y_val)
+
+    entry_bytes = sum(f.stat().st_size for f in (tmp_path / "cache").rglob("*") if f.is_file())
+    cache.max_bytes = int(entry_bytes * 1.5)
+    cache.get_or_encode(paths[1], CHURN_SPEC)
+    keys = {p.name for p in (tmp_path / "cache").iterdir() if p.is_dir()}
+    assert keys == {cache.key(paths[1], CHURN_SPEC)}
+
+
+def test_evict_sweeps_orphaned_tmp_dirs(tmp_path):
+    cache = FeatureMatrixCache(tmp_path)
+    orphan, inflight = tmp_path / ".tmp-dead-0000", tmp_path / ".tmp-live-0000"
+    for d in (orphan, inflight):
+        d.mkdir()
+        (d / "X_train.npy").write_bytes(b"x")
+    old = time.time() - 2 * 3600
+    os.utime(orphan, (old, old))
+
+    cache.evict()
+    assert not orphan.exists() and inflight.exists()
+
+
+def test_cache_from_args_honours_disable_and_budget():
+    ap = argparse.ArgumentParser()
+    add_cache_args(ap)
+    assert cache_from_args(ap.parse_args(["--feature-cache", ""])) is None
+    cache = cache_from_args(ap.parse_args(["--feature-cache", "c", "--feature-cache-max-gb", "0.5"]))
+    assert str(cache.root) == "c" and cache.max_bytes == 512 * 1024**2
+
+
+def test_hit_reads_and_hashes_no_parquet(tmp_path, churn_frame, monkeypatch):
+    import src.features.cache as cache_mod
+
+    data = tmp_path / "train.parquet"
+    churn_frame(300, 0).to_parquet(data, index=False)
+    cache = FeatureMatrixCache(tmp_path / "cache")
+    cache.get_or_encode(data, CHURN_SPEC)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("input reread on a cache hit")
+
+    monkeypatch.setattr(cache_mod, "file_sha256", fail)
+    monkeypatch.setattr(cache_mod.pd, "read_parquet", fail)
+    assert cache.get_or_encode(data, CHURN_SPEC) is not None
+    monkeypatch.undo()
+
+    key = cache.key(data, CHURN_SPEC)
+    churn_frame(300, 1).to_parquet(data, index=False)  # rewritten: size/mtime change, so it is rehashed
+    assert cache.key(data, CHURN_SPEC) != key
@@ -0,0 +1,130 @@
+import asyncio
+import json
+import time
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api.executor import ProcessInferenceExecutor
+from src.modeling.artifact import ServingModel
+
+
+@pytest.fixture
+def served(serving_model):
+    rows = serving_model.frame.drop(columns=["churn"]).to_dict(orient="records")
+    return ServingModel(serving_model.path), rows
+
+
+@pytest.fixture
+def executor(served):
+    model, _ = served
+    ex = ProcessInferenceExecutor(model.path, workers=2, slot_rows=64, slots=3)
+    assert ex.warm() == 2
+    yield ex
+    ex.close()
+
+
+def _wait_free(ex, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while len(ex._free) < ex.slots and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert sorted(ex._free) == list(range(ex.slots))
+
+
+def test_worker_results_match_in_process(served, executor):
+    model, rows = served
+
+    async def run():
+        return await asyncio.gather(executor.predict_proba(rows[:1]), executor.predict_proba(rows[:1000]))
+
+    one, many = asyncio.run(run())
+    np.testing.assert_allclose(one, model.predict_proba(rows[:1]), rtol=1e-6)
+    np.testing.assert_allclose(many, model.predict_proba(rows[:1000]), rtol=1e-6)  # 16 chunks over 3 slots
+    _wait_free(executor)
+
+
+def test_cancelled_batch_returns_its_slots(served, executor):
+    model, rows = served
+
+    async def run():
+        task = asyncio.ensure_future(executor.predict_proba(rows * 4))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    _wait_free(executor)
+    np.testing.assert_allclose(asyncio.run(executor.predict_proba(rows[:10])), model.predict_proba(rows[:10]), rtol=1e-6)
+
+
+def test_encoding_does_not_block_the_event_loop(served, executor, monkeypatch):
+    model, rows = served
+    encode = executor.encoder.encode
+
+    def slow_encode(batch):
+        time.sleep(0.3)
+        return encode(batch)
+
+    monkeypatch.setattr(executor.encoder, "encode", slow_encode)
+
+    async def run():
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker = asyncio.ensure_future(tick())
+        out = await executor.predict_proba(rows[:10])
+        ticker.cancel()
+        return out, ticks
+
+    out, ticks = asyncio.run(run())
+    assert ticks >= 10
+    np.testing.assert_allclose(out, model.predict_proba(rows[:10]), rtol=1e-6)
+
+
+def test_process_mode_endpoints_and_disconnect(served, monkeypatch):
+    import src.api.main as api
+
+    model, rows = served
+    monkeypatch.setattr(api, "get_model", lambda: (model, "local:test", "9"))
+    monkeypatch.setattr(api, "INFERENCE", {"workers": 1, "slot_rows": 64})
+    monkeypatch.setattr(api, "_executor", None)
+    monkeypatch.delenv("MONITORING_DB_URL", raising=False)
+    try:
+        client = TestClient(api.app)
+        r = client.post("/predict", json=rows[0]).json()
+        assert r["model_version"] == "9"
+        assert r["churn_probability"] == pytest.approx(float(model.predict_proba(rows[:1])[0]), rel=1e-6)
+        batch = client.post("/predict/batch", json={"rows": rows[:300]}).json()
+        np.testing.assert_allclose(batch["churn_probability"], model.predict_proba(rows[:300]), rtol=1e-6)
+
+        # the client hangs up right after sending the body
+        body = json.dumps({"rows": rows * 4}).encode()
+        sent = []
+
+        async def receive():
+            if not sent and not getattr(receive, "done", False):
+                receive.done = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST", "scheme": "http",
+            "path": "/predict/batch", "raw_path": b"/predict/batch", "query_string": b"", "root_path": "",
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+            "client": ("127.0.0.1", 1), "server": ("testserver", 80),
+        }
+        asyncio.run(api.app(scope, receive, send))
+        assert sent[0]["status"] == 499
+        _wait_free(api._executor[1])
+    finally:
+        api.on_shutdown()
@@ -0,0 +1,124 @@
+import threading
+import time
+
+import pytest
+from prometheus_client import REGISTRY
+
+from src.api.registry import LoadedModel, ModelRegistry
+
+
+class _Const:
+    def __init__(self, p: float):
+        self.p = p
+
+    def predict_proba(self, rows):
+        return [self.p] * len(rows)
+
+
+def _loader(sizes: dict[str, int], calls: list[str], delay: float = 0.0):
+    def load(name: str, alias: str) -> LoadedModel:
+        calls.append(name)
+        time.sleep(delay)
+        if name not in sizes:
+            raise LookupError(f"no registered model {name!r} with alias {alias!r}")
+        return LoadedModel(name, _Const(0.25), f"models:/{name}@{alias}", "1", sizes[name], time.time())
+
+    return load
+
+
+def test_lru_eviction_under_budget():
+    calls: list[str] = []
+    reg = ModelRegistry(budget_bytes=250, loader=_loader({"a": 100, "b": 100, "c": 100}, calls))
+    before = REGISTRY.get_sample_value("model_evictions_total", {"model": "b"}) or 0.0
+
+    reg.get("a")
+    reg.get("b")
+    reg.get("a")  # a is now most recently used
+    reg.get("c")  # 300 > 250: evicts b
+    assert [m["name"] for m in reg.loaded()] == ["a", "c"]
+    assert REGISTRY.get_sample_value("model_evictions_total", {"model": "b"}) == before + 1
+
+    reg.get("b")
+    assert calls == ["a", "b", "c", "b"]
+    assert [m["name"] for m in reg.loaded()] == ["c", "b"]
+
+
+def test_oversized_model_is_kept_alone():
+    reg = ModelRegistry(budget_bytes=50, loader=_loader({"a": 10, "big": 500}, []))
+    reg.get("a")
+    reg.get("big")
+    assert [m["name"] for m in reg.loaded()] == ["big"]
+
+
+def test_concurrent_loads_are_deduplicated():
+    calls: list[str] = []
+    reg = ModelRegistry(budget_bytes=10**9, loader=_loader({"a": 1}, calls, delay=0.2))
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(reg.get("a"))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert calls == ["a"]
+    assert len({id(r) for r in results}) == 1
+
+
+def test_failed_load_is_not_cached():
+    calls: list[str] = []
+    reg = ModelRegistry(budget_bytes=100, loader=_loader({}, calls))
+    for _ in range(2):
+        with pytest.raises(LookupError):
+            reg.get("missing")
+    assert calls == ["missing", "missing"] and reg.loaded() == []
+
+
+def test_moved_alias_is_reloaded_after_ttl():
+    versions = {"a": "1"}
+    calls: list[str] = []
+
+    def load(name: str, alias: str) -> LoadedModel:
+        calls.append(name)
+        v = versions[name]
+        return LoadedModel(name, _Const(float(v)), f"models:/{name}@{alias}", v, 10, time.time())
+
+    reg = ModelRegistry(budget_bytes=100, loader=load, alias_ttl_seconds=0.2, resolver=lambda name, alias: versions[name])
+    assert reg.get("a").model_version == "1"
+    versions["a"] = "2"
+    assert reg.get("a").model_version == "1"  # within the TTL
+    time.sleep(0.25)
+    assert reg.get("a").model_version == "2"
+    assert reg.get("a").predict_proba([{}]) == [2.0]
+    assert calls == ["a", "a"] and [m["model_version"] for m in reg.loaded()] == ["2"]
+
+    def down(name: str, alias: str) -> str:
+        raise ConnectionError("registry unreachable")
+
+    reg._resolver = down
+    time.sleep(0.25)
+    assert reg.get("a").model_version == "2"  # keeps serving what it has
+
+
+def test_named_predict_route(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    import src.api.main as api
+
+    monkeypatch.setattr(api, "MODELS", ModelRegistry(budget_bytes=10**6, loader=_loader({"retail": 10}, [])))
+    monkeypatch.setattr(api, "MODEL_NAMES", set())
+    monkeypatch.delenv("MONITORING_DB_URL", raising=False)
+    client = TestClient(api.app)
+    row = {
+        "tenure_months": 10,
+        "monthly_charges": 80,
+        "total_charges": 800,
+        "tickets_90d": 1,
+        "contract_type": "month-to-month",
+        "payment_method": "credit_card",
+        "internet_service": "fiber",
+        "region": "NE",
+    }
+    r = client.post("/models/retail/predict", json=row)
+    assert r.status_code == 200
+    assert r.json()["churn_probability"] == 0.25 and r.json()["model_uri"] == "models:/retail@champion"
+    assert client.post("/models/unknown/predict", json=row).status_code == 404
+    assert client.get("/models").json()["loaded"][0]["name"] == "retail"
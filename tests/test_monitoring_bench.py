@@ -0,0 +1,47 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from src.data.synthetic import generate_churn
+from src.monitoring.archive import load_predictions
+from src.monitoring.bench import (
+    QueryTimer,
+    SyntheticTraffic,
+    normalize_statement,
+    populate_predictions,
+)
+from src.monitoring.metrics import count_predictions, psi
+
+
+def test_synthetic_traffic_has_feedback_lag_and_drifted_segment(tmp_path):
+    db = f"sqlite:///{tmp_path / 'mon.db'}"
+    end = datetime(2026, 1, 31, tzinfo=timezone.utc)
+    traffic = SyntheticTraffic(days=30, feedback_rate=0.5, feedback_lag_days=7, drift_days=14, drift_regions=("SW",))
+    summary = populate_predictions(db, 6000, traffic, chunk_rows=2500, end=end)
+    assert summary["n_predictions"] == 6000 and 0.3 < summary["n_feedback"] / 6000 < 0.5
+
+    df = load_predictions(db, ["created_at", "model_version", "has_feedback", "tenure_months", "region"])
+    assert df["created_at"].is_monotonic_increasing  # in id order
+    assert not df.loc[df["created_at"] > end - timedelta(days=7), "has_feedback"].any()
+    assert set(df["model_version"]) == {"1", "2"}
+
+    baseline = generate_churn(5000, np.random.default_rng(0))["tenure_months"].to_numpy()
+    recent = df[df["created_at"] > end - timedelta(days=14)]
+    drifted = psi(baseline, recent.loc[recent["region"] == "SW", "tenure_months"].to_numpy())
+    stable = psi(baseline, recent.loc[recent["region"] == "NE", "tenure_months"].to_numpy())
+    assert drifted > 0.25 > stable
+
+
+def test_query_timer_groups_statements(tmp_path):
+    db = f"sqlite:///{tmp_path / 'mon.db'}"
+    populate_predictions(db, 500)
+    timer = QueryTimer()
+    with timer.active():
+        count_predictions(db)
+        count_predictions(db)
+    count_predictions(db)  # listener removed
+
+    stats = {q["statement"]: q for q in timer.to_list()}
+    assert stats["SELECT COUNT(*) FROM predictions"]["calls"] == 2
+    assert len(stats) == 2 and timer.total_seconds > 0
+    assert normalize_statement("DELETE FROM t\n WHERE id IN (?, ?, ?)") == "DELETE FROM t WHERE id IN (...)"
@@ -0,0 +1,35 @@
+import numpy as np
+
+from src.monitoring.alerting import evaluate_drift_alert
+from src.monitoring.metrics import performance_metrics, segment_metrics
+
+
+def test_drift_alert_reads_monitoring_snapshot_shape():
+    snapshot = {"drift": {"psi_numeric": {"tenure_months": 0.31, "tickets_90d": 0.02}}}
+    alert = evaluate_drift_alert(snapshot, threshold=0.25)
+    assert alert["alert"] and alert["worst_feature"] == "tenure_months"
+    assert evaluate_drift_alert({"psi_numeric": {"tenure_months": 0.1}})["alert"] is False
+
+
+def test_performance_and_segment_metrics_share_feedback_frame(churn_frame):
+    fb = churn_frame(1000, 0).rename(columns={"churn": "actual_churn"})
+    fb["churn_probability"] = np.clip(fb["actual_churn"] * 0.6 + 0.2, 0, 1)
+
+    perf = performance_metrics(fb)
+    assert perf["roc_auc"] == 1.0 and perf["brier"] is not None
+    segs = segment_metrics(fb, min_seg_n=200)
+    assert set(segs) == {"contract_type", "payment_method", "internet_service", "region"}
+    assert sum(n for _, n, *_ in segs["region"]) == 1000
+
+
+def test_flow_cache_key_covers_settings_but_not_frames(churn_frame):
+    from types import SimpleNamespace
+
+    from flows.monitoring_flow import _by_run_key
+
+    ctx = SimpleNamespace(task=SimpleNamespace(name="drift_alert"))
+    params = {"snapshot": {"drift": {}}, "threshold": 0.25, "model_version": "3", "out": "a.json", "key": "k"}
+    base = _by_run_key(ctx, {**params, "frame": churn_frame(10, 0)})
+    assert _by_run_key(ctx, {**params, "frame": churn_frame(10, 1)}) == base
+    for change in ({"threshold": 0.1}, {"model_version": "4"}, {"out": "b.json"}, {"key": "k2"}):
+        assert _by_run_key(ctx, {**params, **change}) != base
@@ -0,0 +1,83 @@
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from src.api.prefork import WARMUP_ROW
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="pre-fork serving needs os.fork")
+
+REPO = Path(__file__).resolve().parents[1]
+
+
+def _children(pid: int) -> set[int]:
+    return {int(p) for t in Path(f"/proc/{pid}/task").iterdir() for p in (t / "children").read_text().split()}
+
+
+def _wait(cond, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if cond():
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise TimeoutError
+
+
+@pytest.mark.skipif(not Path("/proc/self/task").exists(), reason="needs /proc")
+def test_workers_share_warm_model_and_roll_on_hup(serving_model, tmp_path):
+    expected = float(serving_model.pipe.predict_proba(pd.DataFrame([WARMUP_ROW]))[0, 1])
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    env = {**os.environ, "PYTHONPATH": str(REPO), "SERVING_ARTIFACT_DIR": str(serving_model.path), "OTEL_SDK_DISABLED": "true"}
+    env.pop("MONITORING_DB_URL", None)
+    env.pop("MODEL_URI", None)
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "src.api.prefork", "--host", "127.0.0.1", "--port", str(port), "--workers", "2", "--ready-seconds", "0.5"],
+        cwd=tmp_path,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        _wait(lambda: len(_children(proc.pid)) == 2)
+
+        def predict():
+            req = urllib.request.Request(
+                f"http://127.0.0.1:{port}/predict", data=json.dumps(WARMUP_ROW).encode(), headers={"Content-Type": "application/json"}
+            )
+            return json.loads(urllib.request.urlopen(req, timeout=10).read())
+
+        _wait(lambda: predict() is not None)
+        assert predict()["churn_probability"] == pytest.approx(expected, abs=1e-6)
+        for _ in range(6):
+            predict()
+        # every worker's requests are in the scrape, whichever worker answers it
+        metrics = urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=10).read().decode()
+        served = sum(
+            float(line.rsplit(" ", 1)[1])
+            for line in metrics.splitlines()
+            if line.startswith("http_requests_total{") and 'handler="/predict"' in line
+        )
+        assert served >= 8
+
+        before = _children(proc.pid)
+        proc.send_signal(signal.SIGHUP)  # forced rolling reload
+        _wait(lambda: len(_children(proc.pid)) == 2 and not (_children(proc.pid) & before))
+        assert predict()["churn_probability"] == pytest.approx(expected, abs=1e-6)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=60)
+    assert proc.returncode == 0
@@ -0,0 +1,13 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.features.preprocess import CategoricalCaster
+
+
+@pytest.mark.filterwarnings("error")
+def test_native_caster_maps_unseen_and_missing_to_nan():
+    caster = CategoricalCaster([], ["region"]).fit(pd.DataFrame({"region": ["NE", "SE", None]}))
+    out = caster.transform(pd.DataFrame({"region": ["SE", "XX", None, np.nan]}))
+    assert list(out["region"].cat.categories) == ["NE", "SE"]
+    assert out["region"].cat.codes.tolist() == [1, -1, -1, -1]
@@ -0,0 +1,19 @@
+from src.modeling.train import train_model
+from src.utils.profiling import StageTimer
+
+
+def test_train_model_records_each_stage(churn_frame, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    timer = StageTimer()
+    train_model(churn_frame(2000, 0), model_params={"n_estimators": 10, "max_depth": 3}, timer=timer)
+
+    assert [s.stage for s in timer.stages] == ["split", "preprocess_fit", "xgb_fit", "val_score", "save", "export_serving"]
+    assert all(s.wall_seconds >= 0 and s.peak_rss_mb > 0 for s in timer.stages)
+    assert "profile_xgb_fit_wall_seconds" in timer.as_metrics()
+
+
+def test_disabled_timer_records_nothing():
+    timer = StageTimer(enabled=False)
+    with timer.stage("noop"):
+        pass
+    assert timer.stages == []
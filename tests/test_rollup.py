@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import text
+
+from src.monitoring.db import add_feedback, get_engine, init_db, insert_prediction
+from src.monitoring.rollup import refresh_hourly_rollups
+
+
+def _req(region: str, tenure: float) -> dict:
+    return {
+        "tenure_months": tenure,
+        "monthly_charges": 80.0,
+        "total_charges": 800.0,
+        "tickets_90d": 1.0,
+        "contract_type": "month-to-month",
+        "payment_method": "credit_card",
+        "internet_service": "fiber",
+        "region": region,
+    }
+
+
+def test_hourly_rollups_are_idempotent_and_pick_up_feedback(tmp_path):
+    db_url = f"sqlite:///{tmp_path / 'monitoring.db'}"
+    init_db(db_url)
+    ids = [
+        insert_prediction(db_url, _req("NE", 10), 0.05, 0, "m", "1"),
+        insert_prediction(db_url, _req("NE", 20), 0.95, 1, "m", "1"),
+        insert_prediction(db_url, _req("SE", 30), 0.55, 1, "m", "1"),
+    ]
+    now = datetime.now(timezone.utc) + timedelta(minutes=1)
+
+    refresh_hourly_rollups(db_url, lookback_hours=2, now=now)
+    add_feedback(db_url, ids[1], 1)
+    summary = refresh_hourly_rollups(db_url, lookback_hours=2, now=now)
+    assert summary["n_rows_scanned"] == 3
+
+    with get_engine(db_url).connect() as conn:
+        rows = conn.execute(
+            text(
+                "SELECT region, n_predictions, n_predicted_churn, n_feedback, n_actual_churn "
+                "FROM hourly_metrics ORDER BY region"
+            )
+        ).fetchall()
+        buckets = conn.execute(text("SELECT bucket, n FROM hourly_score_buckets WHERE region = 'NE' ORDER BY bucket")).fetchall()
+        tenure = conn.execute(
+            text("SELECT mean FROM hourly_feature_means WHERE region = 'NE' AND feature = 'tenure_months'")
+        ).scalar()
+
+    assert [tuple(r) for r in rows] == [("NE", 2, 1, 1, 1), ("SE", 1, 1, 0, 0)]
+    assert [tuple(b) for b in buckets] == [(0, 1), (9, 1)]
+    assert tenure == 15.0
@@ -0,0 +1,58 @@
+import time
+
+import numpy as np
+import pytest
+
+from src.modeling.artifact import ArtifactChecksumError, ServingModel, export_serving_artifact
+from src.modeling.schema import CHURN_SPEC
+from src.modeling.train import fit_model
+
+
+@pytest.mark.parametrize("encoding", ["onehot", "native"])
+def test_serving_model_matches_pipeline(churn_frame, tmp_path, encoding):
+    df = churn_frame(2000, 0)
+    pipe, _ = fit_model(df, {"n_estimators": 20, "max_depth": 3}, encoding=encoding)
+    export_serving_artifact(pipe, CHURN_SPEC, tmp_path)
+
+    X = df.drop(columns=["churn"]).head(100).copy()
+    X.loc[0, "region"] = "unseen"
+    np.testing.assert_allclose(ServingModel(tmp_path).predict_proba(X), pipe.predict_proba(X)[:, 1], atol=1e-6)
+
+
+def test_serving_model_rejects_corrupt_booster(churn_frame, tmp_path):
+    pipe, _ = fit_model(churn_frame(500, 0), {"n_estimators": 5, "max_depth": 2})
+    export_serving_artifact(pipe, CHURN_SPEC, tmp_path)
+    with open(tmp_path / "model.ubj", "ab") as f:
+        f.write(b"\0")
+    with pytest.raises(ArtifactChecksumError):
+        ServingModel(tmp_path)
+
+
+def test_default_model_follows_alias_after_ttl(monkeypatch):
+    import src.api.main as api
+
+    versions = {"v": "1"}
+    loaded: list[str] = []
+
+    class _Model:
+        def __init__(self, uri):
+            self.uri = uri
+
+    def load(uri):
+        loaded.append(uri)
+        return _Model(uri)
+
+    monkeypatch.setenv("MODEL_URI", "models:/churn@champion")
+    monkeypatch.delenv("SERVING_ARTIFACT_DIR", raising=False)
+    monkeypatch.setattr(api, "resolve_model_version", lambda uri: versions["v"])
+    monkeypatch.setattr(api, "load_model_uri", load)
+    holder = api.ModelHolder(alias_ttl_seconds=0.2)
+
+    model, uri, version = holder()
+    assert (model.uri, uri, version) == ("models:/churn/1", "models:/churn@champion", "1")
+    versions["v"] = "2"
+    assert holder()[2] == "1"  # within the TTL
+    time.sleep(0.25)
+    assert holder()[0].uri == "models:/churn/2"
+    time.sleep(0.25)
+    assert holder()[2] == "2" and loaded == ["models:/churn/1", "models:/churn/2"]  # unchanged: no reload
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import src.features.stream as stream
+from src.modeling.schema import CHURN_SPEC
+
+
+def test_stream_preprocess_fills_nulls_and_split_is_batch_independent(churn_frame, tmp_path):
+    df = churn_frame(3000, 0)
+    df.loc[::7, "region"] = np.nan
+    src = tmp_path / "raw.csv"
+    df.to_csv(src, index=False)
+
+    a = stream.preprocess_stream(src, tmp_path / "a", CHURN_SPEC, batch_rows=500, row_group_rows=400)
+    stream.preprocess_stream(src, tmp_path / "b", CHURN_SPEC, batch_rows=100_000)
+
+    assert a["rows_in"] == a["rows_train"] + a["rows_val"] == 3000
+    assert a["nulls_filled"]["region"] == len(df.loc[::7])
+
+    train = pd.read_parquet(tmp_path / "a" / "train.parquet")
+    assert isinstance(train["region"].dtype, pd.CategoricalDtype)
+    assert "unknown" in set(train["region"]) and "nan" not in set(train["region"].astype(str))
+    for split in ("train", "val"):
+        pd.testing.assert_frame_equal(
+            pd.read_parquet(tmp_path / "a" / f"{split}.parquet").astype({c: str for c in CHURN_SPEC.categorical}),
+            pd.read_parquet(tmp_path / "b" / f"{split}.parquet").astype({c: str for c in CHURN_SPEC.categorical}),
+        )
+
+
+def test_failed_stream_publishes_nothing(churn_frame, tmp_path, monkeypatch):
+    src = tmp_path / "raw.csv"
+    churn_frame(3000, 0).to_csv(src, index=False)
+    clean = stream.clean_batch
+    calls = []
+
+    def failing(*args):
+        calls.append(1)
+        if len(calls) == 3:
+            raise RuntimeError("boom")
+        return clean(*args)
+
+    monkeypatch.setattr(stream, "clean_batch", failing)
+    with pytest.raises(RuntimeError):
+        stream.preprocess_stream(src, tmp_path / "out", CHURN_SPEC, batch_rows=500, row_group_rows=400)
+    assert list((tmp_path / "out").iterdir()) == []
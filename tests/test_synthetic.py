@@ -0,0 +1,19 @@
+import pandas as pd
+
+from src.data.synthetic import generate_parquet
+
+
+def test_parquet_output_is_independent_of_worker_count(tmp_path):
+    a = generate_parquet(tmp_path / "a", n_rows=2500, chunk_rows=1000, seed=7, workers=1)
+    b = generate_parquet(tmp_path / "b", n_rows=2500, chunk_rows=1000, seed=7, workers=3)
+
+    assert [p.name for p in a] == ["part-00000.parquet", "part-00001.parquet", "part-00002.parquet"]
+    df_a = pd.concat([pd.read_parquet(p) for p in a], ignore_index=True)
+    df_b = pd.concat([pd.read_parquet(p) for p in b], ignore_index=True)
+    assert len(df_a) == 2500
+    pd.testing.assert_frame_equal(df_a, df_b)
+
+
+def test_zero_rows_writes_no_parts(tmp_path):
+    assert generate_parquet(tmp_path, n_rows=0, workers=4) == []
+    assert not list(tmp_path.glob("part-*"))
@@ -0,0 +1,92 @@
+import copy
+import json
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api.registry import PipelineScorer
+from src.api.threads import ThreadBudget, cgroup_cpu_limit
+from src.modeling.artifact import ServingModel
+
+
+def _nthread(booster) -> str:
+    return json.loads(booster.save_config())["learner"]["generic_param"]["nthread"]
+
+
+def test_cgroup_quota_v2_v1_and_nested(tmp_path):
+    (tmp_path / "cpu.max").write_text("max 100000\n")
+    assert cgroup_cpu_limit(tmp_path, tmp_path / "none") is None
+
+    (tmp_path / "ecs" / "task").mkdir(parents=True)
+    (tmp_path / "ecs" / "task" / "cpu.max").write_text("150000 100000\n")
+    (tmp_path / "self_cgroup").write_text("0::/ecs/task\n")
+    assert cgroup_cpu_limit(tmp_path, tmp_path / "self_cgroup") == (1.5, "cgroup v2")
+
+    v1 = tmp_path / "v1"
+    (v1 / "cpu").mkdir(parents=True)
+    (v1 / "cpu" / "cpu.cfs_quota_us").write_text("400000\n")
+    (v1 / "cpu" / "cpu.cfs_period_us").write_text("100000\n")
+    assert cgroup_cpu_limit(v1, tmp_path / "none") == (4.0, "cgroup v1")
+    (v1 / "cpu" / "cpu.cfs_quota_us").write_text("-1\n")
+    assert cgroup_cpu_limit(v1, tmp_path / "none") is None
+
+
+def test_cgroup_quota_takes_tightest_ancestor(tmp_path):
+    (tmp_path / "cpu.max").write_text("max 100000\n")
+    (tmp_path / "kubepods" / "pod" / "ctr").mkdir(parents=True)
+    (tmp_path / "kubepods" / "pod" / "ctr" / "cpu.max").write_text("max 100000\n")
+    (tmp_path / "kubepods" / "pod" / "cpu.max").write_text("50000 100000\n")
+    (tmp_path / "kubepods" / "cpu.max").write_text("200000 100000\n")
+    (tmp_path / "self_cgroup").write_text("0::/kubepods/pod/ctr\n")
+    assert cgroup_cpu_limit(tmp_path, tmp_path / "self_cgroup") == (0.5, "cgroup v2")
+
+    v1 = tmp_path / "v1"
+    (v1 / "cpu" / "docker" / "abc").mkdir(parents=True)
+    (v1 / "cpu" / "docker" / "abc" / "cpu.cfs_quota_us").write_text("-1\n")
+    (v1 / "cpu" / "docker" / "cpu.cfs_quota_us").write_text("300000\n")
+    (v1 / "cpu" / "docker" / "cpu.cfs_period_us").write_text("100000\n")
+    (tmp_path / "v1_cgroup").write_text("4:cpu,cpuacct:/docker/abc\n")
+    assert cgroup_cpu_limit(v1, tmp_path / "v1_cgroup") == (3.0, "cgroup v1")
+
+
+@pytest.mark.parametrize(
+    "env, per_process",
+    [
+        ({"CPU_LIMIT": "4"}, 4),
+        ({"CPU_LIMIT": "4", "WEB_CONCURRENCY": "2"}, 2),
+        ({"CPU_LIMIT": "4", "WEB_CONCURRENCY": "2", "INFERENCE_EXECUTOR": "process", "INFERENCE_WORKERS": "2"}, 1),
+        ({"CPU_LIMIT": "0.5", "WEB_CONCURRENCY": "2"}, 1),
+    ],
+)
+def test_budget_splits_cpus_over_serving_processes(monkeypatch, env, per_process):
+    for var in ("WEB_CONCURRENCY", "INFERENCE_EXECUTOR", "INFERENCE_WORKERS", "INFERENCE_THREADS"):
+        monkeypatch.delenv(var, raising=False)
+    for k, v in env.items():
+        monkeypatch.setenv(k, v)
+    budget = ThreadBudget.from_env()
+    assert (budget.threads_per_process, budget.small_batch_threads, budget.large_batch_threads) == (per_process, 1, per_process)
+
+
+def test_models_use_small_and_large_batch_threads(serving_model):
+    pipe = copy.deepcopy(serving_model.pipe)  # set_threads changes its n_jobs
+    rows = serving_model.frame.drop(columns=["churn"]).head(1000).to_dict(orient="records")
+    budget = ThreadBudget(4.0, "env", 1, 4, 1, 4, large_batch_rows=100)
+
+    model = budget.configure(ServingModel(serving_model.path))
+    assert _nthread(model.booster_for(1)) == "1"
+    assert _nthread(model.booster_for(100)) == "4"
+    np.testing.assert_allclose(model.predict_proba(rows[:300])[:5], model.predict_proba(rows[:5]), rtol=1e-6)
+
+    scorer = budget.configure(PipelineScorer(pipe))
+    assert _nthread(scorer.pipe.named_steps["model"].get_booster()) == "1"  # pickled n_jobs=-1 overridden
+    np.testing.assert_allclose(scorer.predict_proba(rows[:300]), model.predict_proba(rows[:300]), rtol=1e-5)
+
+
+def test_budget_on_metrics():
+    import src.api.main as api
+
+    text = TestClient(api.app).get("/metrics").text
+    assert "inference_threads_info{" in text
+    assert 'inference_thread_budget{batch="small"} 1.0' in text
+    assert "inference_cpu_limit " in text
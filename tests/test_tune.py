@@ -0,0 +1,64 @@
+import mlflow
+import pytest
+
+from src.features.cache import FeatureMatrixCache
+from src.modeling.schema import CHURN_SPEC
+from src.modeling.tune import (
+    CurvePruner,
+    best_model_params,
+    plan_workers,
+    run_search,
+    sample_candidates,
+)
+
+
+def test_plan_workers_stays_within_cpu_budget():
+    assert plan_workers(8, 2) == (4, 2)
+    assert plan_workers(3, 2) == (1, 2)
+    assert plan_workers(2, 8) == (1, 2)  # a trial never gets more threads than the budget
+    assert plan_workers(1, 0) == (1, 1)
+    n, threads = plan_workers(0, 1)  # 0: all visible cores
+    assert n >= 1 and threads == 1
+
+
+def test_sample_candidates_are_unique_and_capped_by_grid():
+    space = {"max_depth": [3, 4, 5], "learning_rate": [0.05, 0.1]}
+    picks = sample_candidates(space, 4, seed=0)
+    assert len(picks) == 4 and len({tuple(sorted(p.items())) for p in picks}) == 4
+    assert picks == sample_candidates(space, 4, seed=0)
+    assert len(sample_candidates(space, 50)) == 6
+    assert sample_candidates({}, 5) == []
+
+
+def test_curve_pruner_stops_only_on_checked_rounds_behind_reference():
+    reference = [1.0] * 100
+    pruner = CurvePruner(reference, margin=0.1, warmup=10, check_every=5)
+    log = lambda loss: {"validation_0": {"logloss": [loss]}}  # noqa: E731
+    assert not pruner.after_iteration(None, 5, log(2.0))  # warmup
+    assert not pruner.after_iteration(None, 12, log(2.0))  # not a check round
+    assert not pruner.after_iteration(None, 15, log(1.05))  # within margin
+    assert not pruner.after_iteration(None, 150, log(2.0))  # past the reference curve
+    assert not pruner.pruned
+    assert pruner.after_iteration(None, 20, log(1.2)) and pruner.pruned
+    assert not CurvePruner([]).after_iteration(None, 100, log(9.0))
+
+
+def test_run_search_logs_nested_trials_and_ranks_by_logloss(tmp_path, churn_frame, monkeypatch):
+    data = tmp_path / "train.parquet"
+    churn_frame(600, 0).to_parquet(data, index=False)
+    cache = FeatureMatrixCache(tmp_path / "cache")
+    cache.get_or_encode(data, CHURN_SPEC)
+    key = cache.key(data, CHURN_SPEC)
+    candidates = [{"max_depth": 2, "learning_rate": 0.3}, {"max_depth": 4, "learning_rate": 0.1}]
+
+    monkeypatch.setenv("MLFLOW_TRACKING_URI", f"sqlite:///{tmp_path / 'mlflow.db'}")
+    with mlflow.start_run() as parent:
+        results = run_search(cache, key, candidates, cpu_budget=1, threads_per_trial=1, max_rounds=20, early_stopping_rounds=5)
+    children = mlflow.search_runs(filter_string=f"tags.mlflow.parentRunId = '{parent.info.run_id}'")
+
+    assert sorted(r.trial for r in results) == [0, 1]
+    assert results[0].val_logloss <= results[1].val_logloss
+    assert all(r.best_iteration < 20 and len(r.curve) <= 20 for r in results)
+    assert results[0].val_logloss == pytest.approx(results[0].curve[results[0].best_iteration])
+    assert set(children["tags.mlflow.runName"]) == {"trial-000", "trial-001"}
+    assert best_model_params(results[0])["n_estimators"] == results[0].best_iteration + 1